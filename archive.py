@@ -0,0 +1,294 @@
+# ------------------------------------------------------------
+# Description: Moves cold log entries into gzip-compressed monthly
+#              archive buckets (data/archive/) with a small index, and
+#              reads them back when a query reaches that far.
+# ------------------------------------------------------------
+
+import argparse
+import copy
+import csv
+import glob
+import gzip
+import io
+import json
+import os
+from datetime import date, timedelta
+
+import catalog_ids
+import helpers
+import storage
+import stores
+from records import RecordBatch, SCHEMAS, to_day
+
+ARCHIVE_DIR = os.path.join(helpers.DATA_DIR, "archive")
+INDEX_FILE = os.path.join(ARCHIVE_DIR, "index.json")
+DEFAULT_HORIZON_DAYS = 180
+
+# Cached copy of the index, reloaded when INDEX_FILE changes on disk
+_cache = {"stamp": None, "buckets": {}}
+
+
+# ---------------- Index ----------------
+
+def load_index():
+    """
+    {bucket file name: entry} for every archive bucket. Each entry records
+    the source it came from ("source", and "user" for the shared tracker
+    JSON files), the kind, the column mapping of its rows, the first/last
+    day, the committed byte size, a generation bumped on every write (a
+    rewrite can recompress to the same size) and running totals (rows, per
+    value field and per name).
+    """
+    stamp = storage.file_stamp(INDEX_FILE)
+    if stamp != _cache["stamp"]:
+        _cache["buckets"] = storage.load_json(INDEX_FILE, {}).get("buckets", {})
+        _cache["stamp"] = stamp
+    return _cache["buckets"]
+
+
+def _write_json(path, data):
+    storage.atomic_write(path, lambda f: json.dump(data, f, indent=2))
+
+
+def _save_index(buckets):
+    _write_json(INDEX_FILE, {"buckets": buckets})
+    _cache["stamp"] = None
+
+
+def user_buckets(kind, username, start_day=None, end_day=None):
+    """(name, entry) of the user's buckets of a kind that overlap [start_day, end_day]."""
+    sources = set(stores.sources(kind, username))
+    found = []
+    for name, entry in sorted(load_index().items()):
+        if entry["kind"] != kind or entry["source"] not in sources:
+            continue
+        if entry.get("user") not in (None, username):
+            continue
+        if start_day is not None and entry["end"] < start_day:
+            continue
+        if end_day is not None and entry["start"] > end_day:
+            continue
+        found.append((name, entry))
+    return found
+
+
+def generation(entry):
+    """Version of a bucket's contents (0 for buckets indexed before generations were kept)."""
+    return entry.get("generation", 0)
+
+
+def hot_start(kind, username):
+    """First day after the user's newest archived bucket (None if nothing is archived)."""
+    buckets = user_buckets(kind, username)
+    return max(entry["end"] for _, entry in buckets) + 1 if buckets else None
+
+
+def summary(kind, username):
+    """All-time {"rows", "totals", "by_name"} of the user's archived records, from the index alone."""
+    rows, totals, by_name = 0, {f: 0.0 for f in SCHEMAS[kind][1]}, {}
+    for _, entry in user_buckets(kind, username):
+        rows += entry["rows"]
+        for field, value in entry["totals"].items():
+            totals[field] += value
+        for item, value in entry["by_name"].items():
+            by_name[item] = by_name.get(item, 0.0) + value
+    return {"rows": rows, "totals": totals, "by_name": by_name}
+
+
+def read_bucket(name, entry):
+    """Read one bucket (up to its committed size) as a RecordBatch."""
+    with open(os.path.join(ARCHIVE_DIR, name), "rb") as f:
+        data = gzip.decompress(f.read(entry["size"]))
+    kind, columns = entry["kind"], entry["columns"]
+    df = catalog_ids.read_log(io.BytesIO(data), columns[SCHEMAS[kind][0]])
+    return RecordBatch.from_frame(kind, df, columns, catalog_ids.get_names())
+
+
+# ---------------- Archiving ----------------
+
+def _value_field(kind):
+    return "calories" if kind == "nutrition" else "calories_burned"
+
+
+def _append_rows(buckets, prefix, source, user, kind, columns, fieldnames, rows):
+    """Append rows to their monthly buckets and update the index entries in memory."""
+    fields = SCHEMAS[kind][1]
+    by_month = {}
+    for row in rows:
+        by_month.setdefault(row[columns["date"]][:7], []).append(row)
+
+    for month, month_rows in sorted(by_month.items()):
+        name = f"{prefix}_{month}.csv.gz"
+        path = os.path.join(ARCHIVE_DIR, name)
+        entry = buckets.get(name) or {
+            "source": source, "user": user, "kind": kind, "columns": columns,
+            "start": None, "end": None, "size": 0, "generation": 0, "rows": 0,
+            "totals": {f: 0.0 for f in fields}, "by_name": {},
+        }
+        # Drop anything past the committed size left over by an interrupted run
+        if os.path.exists(path) and os.path.getsize(path) != entry["size"]:
+            os.truncate(path, entry["size"])
+        # Each run adds one gzip member; readers decompress the concatenation
+        with gzip.open(path, "at", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            if entry["size"] == 0:
+                writer.writeheader()
+            writer.writerows(month_rows)
+
+        days = [to_day(r[columns["date"]]) for r in month_rows]
+        entry["start"] = min(days + ([entry["start"]] if entry["start"] is not None else []))
+        entry["end"] = max(days + ([entry["end"]] if entry["end"] is not None else []))
+        entry["size"] = os.path.getsize(path)
+        entry["generation"] = generation(entry) + 1
+        _add_totals(entry, month_rows)
+        buckets[name] = entry
+
+
+def _add_totals(entry, rows):
+    """Add rows to an index entry's row count, field totals and per-name totals."""
+    kind, columns = entry["kind"], entry["columns"]
+    name_field, fields = SCHEMAS[kind]
+    entry["rows"] += len(rows)
+    for row in rows:
+        for f in fields:
+            entry["totals"][f] = round(entry["totals"][f] + float(row.get(columns[f]) or 0), 2)
+        item = str(row.get(columns[name_field]) or "")
+        value = float(row.get(columns[_value_field(kind)]) or 0)
+        entry["by_name"][item] = round(entry["by_name"].get(item, 0.0) + value, 2)
+
+
+def _archive_csv(path, kind, cutoff, buckets):
+    """
+    Move rows of one CSV log dated before `cutoff` (ISO date) into buckets.
+    Called with the log locked, so no entry can be saved in between.
+    """
+    columns = stores.csv_columns(kind)
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    old = [r for r in rows if (r.get(columns["date"]) or "9")[:10] < cutoff]
+    if not old:
+        return 0
+
+    staged = copy.deepcopy(buckets)
+    # Prefixes carry the store type, so a log and a tracker user can never share a bucket
+    prefix = f"csv_{os.path.splitext(os.path.basename(path))[0]}"
+    _append_rows(staged, prefix, path, None, kind, columns, fieldnames, old)
+    _save_index(staged)
+    buckets.update(staged)
+
+    keep = [r for r in rows if (r.get(columns["date"]) or "9")[:10] >= cutoff]
+
+    def write(out):
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(keep)
+    storage.atomic_write(path, write, newline="")
+    return len(old)
+
+
+def _archive_json(path, kind, cutoff, buckets):
+    """Move tracker JSON records dated before `cutoff` into per-user buckets (file locked by the caller)."""
+    name_field, fields = SCHEMAS[kind]
+    fieldnames = ["date", name_field, *fields]
+    columns = {f: f for f in fieldnames}
+    data = storage.load_json(path, {})
+
+    staged = copy.deepcopy(buckets)
+    moved = {}
+    for user, records in data.items():
+        old = [r for r in records if str(r.get("date", "9"))[:10] < cutoff]
+        if old:
+            prefix = f"json_{os.path.splitext(os.path.basename(path))[0]}_{user}"
+            _append_rows(staged, prefix, path, user, kind, columns, fieldnames,
+                         [{k: r.get(k) for k in fieldnames} for r in old])
+            moved[user] = len(old)
+    if not moved:
+        return 0
+    _save_index(staged)
+    buckets.update(staged)
+
+    for user in moved:
+        data[user] = [r for r in data[user] if str(r.get("date", "9"))[:10] >= cutoff]
+    _write_json(path, data)
+    return sum(moved.values())
+
+
+def archive_sources():
+    """(path, kind) of every store that can be archived."""
+    sources = [(stores.NUTRI_FILE, "nutrition"), (stores.EXER_FILE, "exercise")]
+    sources += [(p, "nutrition") for p in sorted(glob.glob(os.path.join(helpers.DATA_DIR, "*_nutrition.csv")))]
+    sources += [(p, "exercise") for p in sorted(glob.glob(os.path.join(helpers.DATA_DIR, "*_exercise.csv")))]
+    return [(p, kind) for p, kind in sources if os.path.exists(p)]
+
+
+def archive_old(horizon_days=DEFAULT_HORIZON_DAYS, today=None):
+    """
+    Move every entry older than `horizon_days` into the archive.
+
+    Rows are appended to their monthly bucket and the index is saved before
+    the hot file is rewritten atomically, so an interrupted run can at worst
+    leave rows in both places, never in neither. Each store is locked from
+    its read to its rewrite, so entries saved meanwhile wait rather than
+    being lost; the index stays locked for the whole run. Returns {path: rows moved}.
+    """
+    cutoff = ((today or date.today()) - timedelta(days=horizon_days)).isoformat()
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    moved = {}
+    with storage.locked(INDEX_FILE):
+        buckets = dict(storage.load_json(INDEX_FILE, {}).get("buckets", {}))
+        for path, kind in archive_sources():
+            archive = _archive_json if path.endswith(".json") else _archive_csv
+            with storage.locked(path):
+                moved[path] = archive(path, kind, cutoff, buckets)
+    return moved
+
+
+def rewrite_buckets(update):
+    """
+    Edit archived rows in place. `update(entry, rows)` changes the row dicts
+    of one bucket and returns how many it changed; changed buckets are
+    recompressed as one gzip member and their index totals recomputed.
+    Returns {bucket name: rows changed}.
+    """
+    changed = {}
+    with storage.locked(INDEX_FILE):
+        buckets = copy.deepcopy(storage.load_json(INDEX_FILE, {}).get("buckets", {}))
+        for name, entry in sorted(buckets.items()):
+            path = os.path.join(ARCHIVE_DIR, name)
+            with open(path, "rb") as f:
+                text = gzip.decompress(f.read(entry["size"])).decode("utf-8")
+            reader = csv.DictReader(io.StringIO(text, newline=""))
+            rows = list(reader)
+            count = update(entry, rows)
+            if not count:
+                continue
+
+            out = io.StringIO(newline="")
+            writer = csv.DictWriter(out, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+            data = gzip.compress(out.getvalue().encode("utf-8"))
+            storage.atomic_write(path, lambda f: f.write(data), mode="wb")
+            entry.update(size=len(data), generation=generation(entry) + 1,
+                         rows=0, totals={f: 0.0 for f in entry["totals"]}, by_name={})
+            _add_totals(entry, rows)
+            changed[name] = count
+        if changed:
+            _save_index(buckets)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old nutrition/exercise entries into data/archive/.")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON_DAYS,
+                        help="keep this many days of entries in the live files")
+    args = parser.parse_args()
+
+    for path, rows in archive_old(args.horizon).items():
+        print(f"{path}: {rows} entries archived")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,141 @@
 """
 Calorie calculator module for the Fitness Tracker.
 """
-import streamlit as st
+import numpy as np
 
+KCAL_PER_KG = 7700          # energy in one kilogram of body weight
+MIN_WEIGHT_KG = 1.0
+
+# Harris-Benedict (revised) coefficients: constant, weight, height, age
+HARRIS_BENEDICT = {
+    "Male": (88.362, 13.397, 4.799, 5.677),
+    "Female": (447.593, 9.247, 3.098, 4.330),
+}
+
+ACTIVITY_MULTIPLIERS = {
+    "Sedentary (little or no exercise)": 1.2,
+    "Lightly active (1-3 days/week)": 1.375,
+    "Moderately active (3-5 days/week)": 1.55,
+    "Very active (6-7 days/week)": 1.725,
+    "Extremely active (physical job)": 1.9
+}
+
+# Daily calorie deficits shown on the projection chart (negative = surplus)
+PROJECTION_SCENARIOS = {
+    "-1000 kcal/day": 1000,
+    "-500 kcal/day": 500,
+    "-250 kcal/day": 250,
+    "Maintain": 0,
+    "+500 kcal/day": -500,
+}
+
+
+# ---------------- Energy Model ----------------
+# Every argument may be a scalar or an array; arrays broadcast with NumPy rules
+
+def bmr(age, sex, weight, height):
+    """Basal metabolic rate (kcal/day) by the Harris-Benedict equation; sex is "Male" or "Female"."""
+    male = np.asarray(sex) == "Male"
+    base, per_kg, per_cm, per_year = (np.where(male, m, f)
+                                      for f, m in zip(HARRIS_BENEDICT["Female"], HARRIS_BENEDICT["Male"]))
+    return (base + per_kg * np.asarray(weight, dtype=np.float64)
+            + per_cm * np.asarray(height, dtype=np.float64) - per_year * np.asarray(age, dtype=np.float64))
+
+
+def activity_multiplier(activity):
+    """Multipliers for activity level names (or numbers, which pass through)."""
+    activity = np.asarray(activity)
+    if activity.dtype.kind not in "USO":
+        return activity.astype(np.float64)
+    levels, inverse = np.unique(activity, return_inverse=True)
+    unknown = set(levels.tolist()) - set(ACTIVITY_MULTIPLIERS)
+    if unknown:
+        raise ValueError(f"Unknown activity level: {sorted(unknown)[0]}")
+    return np.array([ACTIVITY_MULTIPLIERS[level] for level in levels.tolist()])[inverse].reshape(activity.shape)
+
+
+def tdee(age, sex, weight, height, activity):
+    """Total daily energy expenditure (kcal/day): BMR times the activity multiplier."""
+    return bmr(age, sex, weight, height) * activity_multiplier(activity)
+
+
+def project_weight(age, sex, weight, height, activity, deficit, weeks=12):
+    """
+    Weekly weight trajectories for people who keep eating `deficit` kcal/day
+    below their starting TDEE. As weight falls so does TDEE, so the loss
+    slows down over time.
+
+    The inputs broadcast together (e.g. a cohort of shape (n, 1) against
+    deficits of shape (s,) simulates every person under every scenario);
+    the result has shape (weeks + 1,) + that broadcast shape, starting with
+    the current weight. Only the weeks are stepped in Python.
+    """
+    age, sex, weight, height, activity, deficit = np.broadcast_arrays(
+        np.asarray(age, dtype=np.float64), np.asarray(sex), np.asarray(weight, dtype=np.float64),
+        np.asarray(height, dtype=np.float64), activity_multiplier(activity), np.asarray(deficit, dtype=np.float64))
+    intake = tdee(age, sex, weight, height, activity) - deficit
+
+    path = np.empty((weeks + 1,) + weight.shape)
+    path[0] = weight
+    for week in range(weeks):
+        # The person ages too slowly to matter over a projection
+        balance = intake - tdee(age, sex, path[week], height, activity)
+        path[week + 1] = np.maximum(path[week] + 7 * balance / KCAL_PER_KG, MIN_WEIGHT_KG)
+    return path
+
+
+# ---------------- Calculator Page ----------------
 
 def show_calorie_calculator():
     """
     Display a calorie calculator in Streamlit.
     Allows users to calculate daily caloric needs based on various factors.
     """
+    import streamlit as st
+    import pandas as pd
+
     st.title("🔢 Calorie Calculator")
-    
+
     st.markdown("""
     This calculator helps estimate your daily caloric needs based on the **Harris-Benedict equation**.
     """)
-    
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         age = st.number_input("Age (years)", min_value=1, max_value=120, value=30)
         gender = st.radio("Gender", ["Male", "Female"])
         weight = st.number_input("Weight (kg)", min_value=1.0, max_value=500.0, value=70.0)
-    
+
     with col2:
         height = st.number_input("Height (cm)", min_value=50.0, max_value=300.0, value=170.0)
-        activity = st.selectbox(
-            "Activity Level",
-            ["Sedentary (little or no exercise)", 
-             "Lightly active (1-3 days/week)",
-             "Moderately active (3-5 days/week)",
-             "Very active (6-7 days/week)",
-             "Extremely active (physical job)"]
-        )
-    
-    # Calculate BMR (Basal Metabolic Rate) using Harris-Benedict equation
-    if gender == "Male":
-        bmr = 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
-    else:
-        bmr = 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
-    
-    # Activity multipliers
-    activity_multipliers = {
-        "Sedentary (little or no exercise)": 1.2,
-        "Lightly active (1-3 days/week)": 1.375,
-        "Moderately active (3-5 days/week)": 1.55,
-        "Very active (6-7 days/week)": 1.725,
-        "Extremely active (physical job)": 1.9
-    }
-    
-    tdee = bmr * activity_multipliers[activity]
-    
+        activity = st.selectbox("Activity Level", list(ACTIVITY_MULTIPLIERS))
+
+    basal = float(bmr(age, gender, weight, height))
+    daily = float(tdee(age, gender, weight, height, activity))
+
     st.divider()
-    
+
     col_result1, col_result2 = st.columns(2)
-    
+
     with col_result1:
-        st.metric("Basal Metabolic Rate (BMR)", f"{bmr:.0f} kcal/day")
-    
+        st.metric("Basal Metabolic Rate (BMR)", f"{basal:.0f} kcal/day")
+
     with col_result2:
-        st.metric("Total Daily Energy Expenditure (TDEE)", f"{tdee:.0f} kcal/day")
-    
+        st.metric("Total Daily Energy Expenditure (TDEE)", f"{daily:.0f} kcal/day")
+
     st.info(f"""
     **Your Results:**
-    - To **lose weight**: Consume ~{tdee - 500:.0f} kcal/day (500 kcal deficit)
-    - To **maintain weight**: Consume ~{tdee:.0f} kcal/day
-    - To **gain weight**: Consume ~{tdee + 500:.0f} kcal/day (500 kcal surplus)
+    - To **lose weight**: Consume ~{daily - 500:.0f} kcal/day (500 kcal deficit)
+    - To **maintain weight**: Consume ~{daily:.0f} kcal/day
+    - To **gain weight**: Consume ~{daily + 500:.0f} kcal/day (500 kcal surplus)
     """)
+
+    st.subheader("📉 Weight Projection")
+    weeks = st.slider("Weeks", min_value=4, max_value=52, value=12, key="projection_weeks")
+    path = project_weight(age, gender, weight, height, activity,
+                          list(PROJECTION_SCENARIOS.values()), weeks=weeks)
+    st.line_chart(pd.DataFrame(path, columns=list(PROJECTION_SCENARIOS),
+                               index=pd.RangeIndex(weeks + 1, name="Week")))
+    st.caption("Weight (kg) when eating a fixed amount relative to today's TDEE; "
+               "the change slows as the body's needs adjust to the new weight.")
@@ -0,0 +1,150 @@
+# ------------------------------------------------------------
+# Description: Stable id dictionary for food and exercise names,
+#              shared by the catalogs and every log reader/writer.
+# ------------------------------------------------------------
+
+import json
+import os
+
+import pandas as pd
+
+import storage
+
+DATA_DIR = "data"
+ID_FILE = os.path.join(DATA_DIR, "name_ids.json")
+
+# Cached copy of the dictionary, reloaded when ID_FILE changes on disk
+_cache = {"stamp": None, "names": [], "lookup": {}, "dtype": None}
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _catalogs():
+    """Yield (catalog path, function returning its names) for the food and exercise catalogs."""
+    import nutrition
+    import exercise
+
+    def food_names():
+        food_df = nutrition.load_food_data()
+        return food_df['Food'].dropna().astype(str).tolist() if 'Food' in food_df.columns else []
+
+    food_path = nutrition.get_food_file_path()
+    if food_path:
+        yield food_path, food_names
+    if os.path.exists(exercise.DATASET_PATH):
+        yield exercise.DATASET_PATH, exercise.get_activity_list
+
+
+def _read():
+    data = storage.load_json(ID_FILE, default={})
+    return {"names": data.get("names", []), "catalogs": data.get("catalogs", {})}
+
+
+def _extend(names, new):
+    known = set(names)
+    for name in new:
+        if name not in known:
+            names.append(name)
+            known.add(name)
+
+
+def _update(change):
+    """
+    Apply `change(data)` to the stored dictionary and return the result.
+    The file is re-read under its lock first, so names registered by another
+    process in the meantime are kept and ids are only ever appended.
+    """
+    with storage.locked(ID_FILE):
+        data = _read()
+        change(data)
+        storage.atomic_write(ID_FILE, lambda f: json.dump(data, f, indent=2))
+        _set_cache(data["names"])
+    return data
+
+
+def _load():
+    """Load the dictionary, appending names from catalogs that changed since last time."""
+    data = _read()
+    stale = [(path, names) for path, names in _catalogs()
+             if data["catalogs"].get(path) != list(_stamp(path) or [])]
+    if not stale:
+        _set_cache(data["names"])
+        return
+
+    def merge(data):
+        for path, names in stale:
+            _extend(data["names"], names())
+            data["catalogs"][path] = list(_stamp(path) or [])
+    _update(merge)
+
+
+def _set_cache(names):
+    _cache["names"] = names
+    _cache["lookup"] = {name: i for i, name in enumerate(names)}
+    _cache["dtype"] = None
+    _cache["stamp"] = _stamp(ID_FILE)
+
+
+def get_names():
+    """Return the list of known names; a name's id is its position in the list."""
+    if _cache["stamp"] is None or _cache["stamp"] != _stamp(ID_FILE):
+        _load()
+    return _cache["names"]
+
+
+def shared_names():
+    """Return (names, name -> id dict) for building RecordBatch codes."""
+    get_names()
+    return _cache["names"], _cache["lookup"]
+
+
+def is_shared(categories):
+    """True if `categories` is the shared name list itself (so it costs nothing per batch)."""
+    return categories is _cache["names"]
+
+
+def get_id(name):
+    """Return the id of a name, or None if it has never been seen."""
+    get_names()
+    return _cache["lookup"].get(name)
+
+
+def ensure_ids(names):
+    """Return ids for the given names, registering any new ones."""
+    get_names()
+    lookup = _cache["lookup"]
+    missing = [n for n in dict.fromkeys(str(n) for n in names) if n not in lookup]
+    if missing:
+        _update(lambda data: _extend(data["names"], missing))
+        lookup = _cache["lookup"]
+    return [lookup[str(n)] for n in names]
+
+
+def name_dtype():
+    """Categorical dtype whose codes are the shared ids."""
+    get_names()
+    if _cache["dtype"] is None:
+        _cache["dtype"] = pd.CategoricalDtype(categories=_cache["names"])
+    return _cache["dtype"]
+
+
+def read_log(path, name_column, **kwargs):
+    """
+    Read a log CSV with its name column decoded straight into the shared
+    categorical dtype, so group-bys work on integer codes.
+    """
+    df = pd.read_csv(path, dtype={name_column: "category"}, **kwargs)
+    if name_column in df.columns:
+        get_names()
+        unknown = [n for n in df[name_column].cat.categories if n not in _cache["lookup"]]
+        if unknown:
+            ensure_ids(unknown)
+        # category -> category only remaps the integer codes
+        df[name_column] = df[name_column].astype(name_dtype())
+    return df
@@ -0,0 +1,151 @@
+# ------------------------------------------------------------
+# Description: Headless (Agg) rendering of the weekly and exercise charts,
+#              cached as image bytes keyed by the data version.
+# ------------------------------------------------------------
+
+import io
+from datetime import datetime
+
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import datasource
+import ledger
+from cache import LRUCache
+from records import to_day
+
+CHART_CACHE_BYTES = 32 * 1024 * 1024
+
+# (username, chart, window, data version, format) -> image bytes; b"" means "no data"
+_charts = LRUCache(CHART_CACHE_BYTES)
+
+
+def figure_bytes(fig, fmt="png", dpi=100):
+    """Render a Figure to PNG/SVG bytes without any GUI backend."""
+    FigureCanvasAgg(fig)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi)
+    return buf.getvalue()
+
+
+def cached_chart(username, chart, window, version, build, fmt="png"):
+    """
+    Return the image bytes for a chart, calling `build()` to make the Figure
+    only on a cache miss. Returns None when `build()` reports no data.
+    """
+    key = (username, chart, window, version, fmt)
+    data = _charts.get(key)
+    if data is None:
+        fig = build()
+        data = figure_bytes(fig, fmt) if fig is not None else b""
+        _charts.put(key, data)
+    return data or None
+
+
+def cache_stats():
+    return _charts.stats()
+
+
+# ---------------- Weekly Summary ----------------
+
+def load_weekly(username, days=7):
+    """Rows of the user's daily ledger for the last `days` days (None if nothing is logged)."""
+    rows = ledger.current_rows(username, session=datasource.current())
+    if not rows:
+        return None
+    df = ledger.to_frame(rows)
+    end_day = to_day(datetime.now())
+    days_col = df['date'].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    return df[(days_col >= end_day - days) & (days_col <= end_day)]
+
+
+def build_weekly_figure(df):
+    """Calories in / out / goal lines for a slice of the ledger."""
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot(111)
+
+    ax.plot(df['date'], df['in_cal'], 'b-', label='Calories In', marker='o')
+    ax.plot(df['date'], df['out_cal'], 'r-', label='Calories Out', marker='x')
+    ax.plot(df['date'], df['goal'], 'g--', label='Goal', marker='^')
+
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    ax.tick_params(axis='x', labelrotation=45)
+
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Calories')
+    ax.set_title('Weekly Calorie Summary')
+    ax.legend()
+    ax.grid(True, linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    return fig
+
+
+def weekly_chart(username, days=7, fmt="png"):
+    """Weekly summary image bytes, or None if there is nothing to plot."""
+    window = (days, datetime.now().date().isoformat())
+
+    def build():
+        df = load_weekly(username, days)
+        return build_weekly_figure(df) if df is not None and not df.empty else None
+
+    return cached_chart(username, "weekly", window, ledger.version(username), build, fmt)
+
+
+# ---------------- Exercise Trends ----------------
+
+def exercise_summary(username, days=30):
+    """Daily burn, per-activity duration and totals over the last `days` days."""
+    end_day = to_day(datetime.now())
+    start_day = end_day - days
+    batch = datasource.load_exercise(username, start_day, end_day)
+    window = batch.between(start_day, end_day)
+    activities = window.sum_by_name('duration_min')
+    return {
+        "dates": np.arange(start_day, end_day + 1).astype("datetime64[D]"),
+        "daily_calories": window.sum_by_day('calories_burned', start_day, end_day),
+        "activities": activities,
+        "entries": len(window),
+        "total_calories": window.total('calories_burned'),
+        "total_duration": window.total('duration_min'),
+        "favorite": activities.idxmax() if not activities.empty else "None",
+    }
+
+
+def build_exercise_figure(summary, days=30):
+    """Daily burn bars and top-10 activity pie."""
+    fig = Figure(figsize=(10, 8))
+
+    ax1 = fig.add_subplot(211)
+    ax1.bar(summary["dates"], summary["daily_calories"], color='orange', alpha=0.7)
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Calories Burned')
+    ax1.set_title('Daily Exercise Calories')
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    ax1.tick_params(axis='x', labelrotation=45)
+    ax1.grid(True, linestyle='--', alpha=0.7)
+
+    ax2 = fig.add_subplot(212)
+    top_activities = summary["activities"].nlargest(10)
+    top_activities = top_activities[top_activities > 0]
+    if not top_activities.empty:
+        ax2.pie(top_activities, labels=top_activities.index, autopct='%1.1f%%',
+                shadow=True, startangle=90)
+    ax2.axis('equal')
+    ax2.set_title(f'Exercise Activity Distribution (Last {days} Days)')
+
+    fig.tight_layout()
+    return fig
+
+
+def exercise_chart(username, days=30, fmt="png"):
+    """Exercise trends image bytes, or None if there is nothing to plot."""
+    window = (days, datetime.now().date().isoformat())
+    version = datasource.data_version(username, kinds=("exercise",))
+
+    def build():
+        summary = exercise_summary(username, days)
+        return build_exercise_figure(summary, days) if summary["entries"] else None
+
+    return cached_chart(username, "exercise", window, version, build, fmt)
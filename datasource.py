@@ -0,0 +1,204 @@
+# ------------------------------------------------------------
+# Description: Unified read layer over every nutrition/exercise store
+#              (tracker JSON files and the per-user CSV logs).
+# ------------------------------------------------------------
+
+import glob
+import os
+import sys
+import threading
+
+import archive
+import catalog_ids
+import helpers
+import storage
+from cache import LRUCache
+from records import RecordBatch, SCHEMAS
+from storage import file_stamp
+from stores import exercise_sources, nutrition_sources
+import stores
+
+FRAME_CACHE_BYTES = 256 * 1024 * 1024
+
+_local = threading.local()
+
+
+def discover_users():
+    """All usernames found in users.json, the tracker JSON files and data/."""
+    import auth
+
+    users = set(auth.load_users())
+    for path in (stores.NUTRI_FILE, stores.EXER_FILE):
+        users.update(storage.load_json(path, {}))
+    for suffix in ("_nutrition.csv", "_exercise.csv", "_tracker.csv"):
+        for path in glob.glob(os.path.join(helpers.DATA_DIR, f"*{suffix}")):
+            users.add(os.path.basename(path)[:-len(suffix)])
+    return sorted(users)
+
+
+def data_version(username, kinds=("nutrition", "exercise")):
+    """A value that changes whenever any of the user's sources of the given kinds changes."""
+    paths = []
+    if "nutrition" in kinds:
+        paths += nutrition_sources(username)
+    if "exercise" in kinds:
+        paths += exercise_sources(username)
+    paths.append(archive.INDEX_FILE)
+    return tuple(file_stamp(p) for p in paths)
+
+
+# ---------------- Shared Batch Cache ----------------
+
+def _batch_bytes(batch):
+    """
+    Memory a cached batch keeps alive: its arrays, plus its name list
+    unless that is the shared catalog list every batch points to.
+    """
+    size = batch.days.nbytes + batch.codes.nbytes + sum(c.nbytes for c in batch.columns.values())
+    if not catalog_ids.is_shared(batch.categories):
+        size += sys.getsizeof(batch.categories) + sum(sys.getsizeof(n) for n in batch.categories)
+    return size
+
+
+# Parsed batches shared by every session of this process. Keys carry the
+# source's file stamp, so a batch is never served for changed contents;
+# writes through this app also drop the stale entries right away.
+_frames = LRUCache(FRAME_CACHE_BYTES, sizeof=_batch_bytes)
+
+
+def invalidate(path):
+    """Forget every cached batch read from `path` (call after writing to it)."""
+    path = os.path.normpath(path)
+    return _frames.discard(lambda key: os.path.normpath(key[1]) == path if key[0] != "merged"
+                           else any(os.path.normpath(part[1]) == path for part in key[3]))
+
+
+storage.on_write(invalidate)
+
+
+def cache_stats():
+    """Entries, bytes and hit/miss/eviction counters of the shared batch cache."""
+    return _frames.stats()
+
+
+class ReadSession:
+    """
+    Reads each source file at most once while its contents are unchanged.
+    Parsed batches come from the process-wide cache, so sessions for the
+    same user (or the same shared log) reuse them. One session is meant to
+    live for a single page request.
+    """
+
+    def __init__(self):
+        self._files = {}
+
+    def _cached(self, path, loader):
+        stamp = file_stamp(path)
+        hit = self._files.get(path)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        value = loader(path) if stamp is not None else None
+        self._files[path] = (stamp, value)
+        return value
+
+    def _shared(self, key, load):
+        batch = _frames.get(key)
+        if batch is None:
+            batch = load()
+            _frames.put(key, batch)
+        return batch
+
+    # Stores are kept in date order on write (stores.insert_record/append_rows),
+    # so sorted() is only a linear check; it sorts files written before that.
+
+    def _source(self, kind, username, path):
+        """(cache key, date-sorted RecordBatch) of one store; the key carries the file's stamp."""
+        stamp = file_stamp(path)
+        if path.endswith(".json"):
+            def load():
+                # The JSON file holds every user, so it is parsed once per session at most
+                data = self._cached(path, lambda p: storage.load_json(p, {}))
+                records = (data or {}).get(username, [])
+                return RecordBatch.from_records(kind, records, *catalog_ids.shared_names()).sorted()
+            key = ("json", path, kind, username, stamp)
+        else:
+            if stamp is None:
+                return ("missing", path), RecordBatch.empty(kind)
+            columns = stores.csv_columns(kind)
+
+            def load():
+                df = catalog_ids.read_log(path, columns[SCHEMAS[kind][0]])
+                return RecordBatch.from_frame(kind, df, columns, catalog_ids.get_names()).sorted()
+            key = ("csv", path, kind, stamp)
+        return key, self._shared(key, load)
+
+    def _archive_batch(self, name, entry):
+        key = ("archive", name, archive.generation(entry))
+        return key, self._shared(key, lambda: archive.read_bucket(name, entry).sorted())
+
+    def _merge(self, kind, username, parts):
+        """
+        One date-sorted batch from date-sorted (key, batch) parts. The merged
+        batch is cached under the parts' keys, so it is rebuilt only when a
+        part's file changed; it does not hold on to the parts themselves.
+        """
+        parts = [(key, batch) for key, batch in parts if len(batch)]
+        if not parts:
+            return RecordBatch.empty(kind)
+        if len(parts) == 1:
+            return parts[0][1]
+        key = ("merged", kind, username, tuple(k for k, _ in parts))
+        return self._shared(key, lambda: RecordBatch.merge(kind, [b for _, b in parts]))
+
+    def source_batch(self, kind, username, path):
+        """The user's records of one kind from a single store."""
+        return self._source(kind, username, path)[1]
+
+    def archived_batches(self, kind, username, start_day=None, end_day=None):
+        """(bucket name, RecordBatch) for the user's archive buckets overlapping the range."""
+        return [(name, self._archive_batch(name, entry)[1])
+                for name, entry in archive.user_buckets(kind, username, start_day, end_day)]
+
+    def records(self, kind, username, start_day=None, end_day=None):
+        """
+        The user's records of one kind as one date-sorted RecordBatch: the live
+        stores plus the archive buckets that overlap [start_day, end_day].
+        Rows outside the range are not filtered out; use `between` for that.
+        """
+        parts = [self._archive_batch(name, entry)
+                 for name, entry in archive.user_buckets(kind, username, start_day, end_day)]
+        parts += [self._source(kind, username, path) for path in stores.sources(kind, username)]
+        return self._merge(kind, username, parts)
+
+    def nutrition(self, username, start_day=None, end_day=None):
+        """Nutrition records for the user (archived months only if the range reaches them)."""
+        return self.records("nutrition", username, start_day, end_day)
+
+    def exercise(self, username, start_day=None, end_day=None):
+        """Exercise records for the user (archived months only if the range reaches them)."""
+        return self.records("exercise", username, start_day, end_day)
+
+
+def begin_request():
+    """Start a fresh read session for the current thread (one per page rerun)."""
+    _local.session = ReadSession()
+    return _local.session
+
+
+def current():
+    """Return the current thread's read session, creating one if needed."""
+    session = getattr(_local, "session", None)
+    return session if session is not None else begin_request()
+
+
+def load_nutrition(username, start_day=None, end_day=None):
+    return current().nutrition(username, start_day, end_day)
+
+
+def load_exercise(username, start_day=None, end_day=None):
+    return current().exercise(username, start_day, end_day)
+
+
+def load_recent(kind, username):
+    """Only what is still in the live stores (plus any back-dated rows written there)."""
+    return current().records(kind, username, archive.hot_start(kind, username))
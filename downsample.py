@@ -0,0 +1,145 @@
+# ------------------------------------------------------------
+# Description: Min/max decimation pyramid for long-range daily trend
+#              charts, so a chart gets a bounded number of points per
+#              series at any zoom level without losing peaks.
+# ------------------------------------------------------------
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import datasource
+import ledger
+from cache import LRUCache
+from records import to_day
+
+MAX_POINTS = 800            # about one point per pixel of a dashboard-wide chart
+PYRAMID_CACHE_BYTES = 16 * 1024 * 1024
+
+# (username, ledger version, last day) -> Pyramid
+_pyramids = LRUCache(PYRAMID_CACHE_BYTES, sizeof=lambda p: p.nbytes)
+
+
+class Pyramid:
+    """
+    Daily series plus precomputed coarser levels.
+
+    Level k splits the days into buckets of 2**k days and keeps, for every
+    series, the row of its minimum and of its maximum within each bucket.
+    Drawing the rows a level keeps (for all series at once) preserves every
+    series' peaks and troughs, and each level is built from the one below in
+    a single vectorized pass.
+    """
+
+    def __init__(self, start_day, series):
+        self.start_day = start_day
+        self.names = list(series)
+        self.values = np.column_stack([np.asarray(series[n], dtype=np.float64) for n in self.names])
+        count = len(self.names)
+        cols = np.repeat(np.arange(count), 2)          # series of each min/max column
+        is_max = np.tile([False, True], count)
+
+        self.levels = []
+        level = np.repeat(np.arange(len(self.values))[:, None], 2 * count, axis=1)
+        while len(level) > 1:
+            if len(level) % 2:
+                level = np.vstack([level, level[-1:]])
+            a, b = level[0::2], level[1::2]
+            va, vb = self.values[a, cols], self.values[b, cols]
+            level = np.where(np.where(is_max, vb > va, vb < va), b, a)
+            self.levels.append(level)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + sum(level.nbytes for level in self.levels)
+
+    @property
+    def end_day(self):
+        return self.start_day + len(self) - 1
+
+    def _extremes(self, lo, hi):
+        """Rows of every series' minimum and maximum among rows [lo, hi)."""
+        if hi <= lo:
+            return np.empty(0, dtype=np.int64)
+        segment = self.values[lo:hi]
+        return lo + np.concatenate([segment.argmin(axis=0), segment.argmax(axis=0)])
+
+    def query(self, start_day, end_day, max_points=MAX_POINTS):
+        """
+        (day numbers, {series: values}) covering [start_day, end_day] with at
+        most about `max_points` rows, using the finest level that fits. Buckets
+        the range only partly covers are scanned directly, so their in-range
+        extremes are kept even when the bucket's own lie outside the range.
+        """
+        lo = max(start_day - self.start_day, 0)
+        hi = min(end_day - self.start_day, len(self) - 1)
+        if hi < lo:
+            return np.empty(0, dtype=np.int64), {n: np.empty(0) for n in self.names}
+
+        per_bucket = 2 * len(self.names)
+        if hi - lo + 1 <= max_points:
+            rows = np.arange(lo, hi + 1)
+        else:
+            k = 1
+            while k < len(self.levels) and (-(-(hi - lo + 1) // 2 ** k) + 1) * per_bucket > max_points:
+                k += 1
+            size = 2 ** k
+            first, last = -(-lo // size), (hi + 1) // size      # whole buckets [first, last)
+            if first < last:
+                parts = [self.levels[k - 1][first:last].ravel(),
+                         self._extremes(lo, first * size), self._extremes(last * size, hi + 1)]
+            else:
+                parts = [self._extremes(lo, hi + 1)]
+            rows = np.unique(np.concatenate([[lo, hi], *parts]))
+
+        return self.start_day + rows, {n: self.values[rows, i] for i, n in enumerate(self.names)}
+
+
+# ---------------- Ledger Trends ----------------
+
+def ledger_pyramid(username):
+    """
+    Pyramid of daily calories in/out from the user's ledger, covering at
+    least the last week and filled with zeros up to today. Rebuilt only
+    when the ledger or one of its sources changes.
+    """
+    today = to_day(datetime.now())
+    key = (username, ledger.version(username), today)
+    pyramid = _pyramids.get(key)
+    if pyramid is not None:
+        return pyramid
+
+    rows = ledger.current_rows(username, session=datasource.current())
+    days = np.fromiter((int(d) for d in rows), dtype=np.int64, count=len(rows))
+    totals = np.array([rows[d][:2] for d in rows], dtype=np.float64).reshape(-1, 2)
+    start = min(int(days.min()), today - 6) if len(days) else today - 6
+    span = max(today, int(days.max()) if len(days) else today) - start + 1
+
+    series = {}
+    for i, name in enumerate(("In", "Out")):
+        values = np.zeros(span)
+        values[days - start] = totals[:, i]
+        series[name] = values
+
+    pyramid = Pyramid(start, series)
+    _pyramids.discard(lambda k: k[0] == username)
+    _pyramids.put(key, pyramid)
+    return pyramid
+
+
+def trend_frame(username, days=None, max_points=MAX_POINTS):
+    """
+    Date-indexed DataFrame of daily In/Out calories for the last `days` days
+    (all history when None), decimated to at most about `max_points` rows.
+    Also returns the number of daily points it stands for.
+    """
+    pyramid = ledger_pyramid(username)
+    end_day = to_day(datetime.now())
+    start_day = pyramid.start_day if days is None else end_day - days + 1
+    picked, values = pyramid.query(start_day, end_day, max_points)
+    df = pd.DataFrame(values, index=pd.Index(picked.astype("datetime64[D]"), name="Date"))
+    return df, end_day - max(start_day, pyramid.start_day) + 1
@@ -1,14 +1,25 @@
 # Author: Rushi
 # Description: Exercise module that loads exercise dataset, calculates calories burned using calories-per-kg method, and saves user exercise logs.
 
+import argparse
 import os
 import pandas as pd
+import catalog_ids
+import storage
+import stores
 
 DATASET_PATH = "exercise/exercise_dataset.csv"
 
+# Log written before entries were saved per user; it has no user column, so
+# no page reads it until migrate_legacy_log assigns its rows to someone
 EXERCISE_LOG_PATH = "data/exercise_log.csv"
 
 
+def get_log_path(username):
+    # Per-user exercise log
+    return os.path.join("data", f"{username}_exercise.csv")
+
+
 def load_exercise_dataset():
    
     if not os.path.exists(DATASET_PATH):
@@ -23,9 +34,9 @@ def get_activity_list():
     return df["Activity, Exercise or Sport (1 hour)"].tolist()
 
 
-def calculate_calories(activity, weight_kg, duration_minutes):
- 
-    df = load_exercise_dataset()
+def calculate_calories(activity, weight_kg, duration_minutes, dataset=None):
+    # Pass `dataset` (from load_exercise_dataset) to avoid re-reading the catalog per call
+    df = dataset if dataset is not None else load_exercise_dataset()
 
     row = df[df["Activity, Exercise or Sport (1 hour)"] == activity]
 
@@ -39,24 +50,53 @@ def calculate_calories(activity, weight_kg, duration_minutes):
     return round(calories_burned, 2)
 
 
-def save_exercise_entry(date, activity, duration_minutes, weight_kg, calories_burned):
+def save_exercise_entry(date, activity, duration_minutes, weight_kg, calories_burned, username):
    
 
-    entry = {
-        "date": [date],
-        "exercise_type": [activity],
-        "duration_minutes": [duration_minutes],
-        "user_weight_kg": [weight_kg],
-        "calories_burned": [calories_burned],
-    }
+    save_exercise_entries([(date, activity, duration_minutes, weight_kg, calories_burned)], username)
+
 
-    df_new = pd.DataFrame(entry)
+def save_exercise_entries(entries, username):
+    # Append many (date, activity, duration_minutes, weight_kg, calories_burned) rows in one write
+
+    entries = list(entries)
+    if not entries:
+        return
+
+    df_new = pd.DataFrame(entries, columns=["date", "exercise_type", "duration_minutes",
+                                            "user_weight_kg", "calories_burned"])
 
     os.makedirs("data", exist_ok=True)
+    catalog_ids.ensure_ids(df_new["exercise_type"].unique())
+
+    stores.append_rows(get_log_path(username), df_new)
+
+
+def migrate_legacy_log(username):
+    # One-off: move the rows of the legacy shared log into `username`'s log and
+    # keep the old file as exercise_log.csv.migrated; returns how many rows moved
+
+    if not os.path.exists(EXERCISE_LOG_PATH):
+        return 0
+
+    with storage.locked(EXERCISE_LOG_PATH):
+        df = pd.read_csv(EXERCISE_LOG_PATH)
+        if not df.empty:
+            catalog_ids.ensure_ids(df["exercise_type"].dropna().unique())
+            stores.append_rows(get_log_path(username), df)
+        os.replace(EXERCISE_LOG_PATH, EXERCISE_LOG_PATH + ".migrated")
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign the legacy shared exercise log to one user.")
+    parser.add_argument("--migrate-legacy", metavar="USER", required=True,
+                        help=f"move {EXERCISE_LOG_PATH} into data/USER_exercise.csv")
+    args = parser.parse_args()
+
+    rows = migrate_legacy_log(args.migrate_legacy)
+    print(f"Moved {rows} entries to {get_log_path(args.migrate_legacy)}")
+
 
-    if os.path.exists(EXERCISE_LOG_PATH):
-        df_existing = pd.read_csv(EXERCISE_LOG_PATH)
-        df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-        df_combined.to_csv(EXERCISE_LOG_PATH, index=False)
-    else:
-        df_new.to_csv(EXERCISE_LOG_PATH, index=False)
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,13 @@
 
 import streamlit as st
 from datetime import date
-import pandas as pd
-import os
 import exercise
+import archive
+import datasource
+import export
+import importer
+import stats
+import timeline
 
 
 def exercise_screen(root=None, username="Rushi"):
@@ -63,30 +67,49 @@ def exercise_screen(root=None, username="Rushi"):
                     activity=selected_activity,
                     duration_minutes=duration,
                     weight_kg=weight_kg,
-                    calories_burned=calories
+                    calories_burned=calories,
+                    username=username
                 )
+                stats.update(username)
 
                 st.success(f"✅ Workout Logged: {selected_activity} for {duration} min")
             except Exception as e:
                 st.error(f"❌ Failed to save entry: {e}")
 
+    with st.expander("📥 Import workout file (GPX / TCX / CSV)"):
+        upload = st.file_uploader("Workout export", type=["gpx", "tcx", "csv"])
+        import_weight = st.number_input("⚖ Your Weight (kg)", min_value=20.0, max_value=200.0,
+                                        value=70.0, key="import_weight")
+        if upload is not None and st.button("Import Sessions"):
+            try:
+                entries, unmatched = importer.import_workouts(upload, import_weight, name=upload.name,
+                                                              username=username)
+                stats.update(username)
+                st.success(f"✅ Imported {len(entries)} sessions ({unmatched} could not be matched)")
+            except Exception as e:
+                st.error(f"❌ Import failed: {e}")
+
     st.divider()
     st.subheader("📅 Your Recent Exercise Logs")
 
-    exercise_file = "data/exercise_log.csv"
+    history = datasource.load_recent("exercise", username)
+    archived = archive.summary("exercise", username)
 
-    if os.path.exists(exercise_file):
+    if len(history) or archived["rows"]:
         try:
-            history_df = pd.read_csv(exercise_file)
-
-            st.dataframe(history_df.tail(5), use_container_width=True)
+            # Archived months are only read when the live stores hold too few rows
+            shown = history if len(history) >= 5 else datasource.load_exercise(username)
+            recent, _ = timeline.recent([shown], n=5)
+            recent_df = shown.take([row for _, _, row in recent]).to_frame()
+            st.dataframe(recent_df, use_container_width=True)
 
-            total_burned = history_df["calories_burned"].sum()
-            last_activity = history_df.tail(1)["exercise_type"].values[0]
+            total_burned = history.total("calories_burned") + archived["totals"]["calories_burned"]
+            last_activity = recent_df["exercise"].iloc[0]
 
             c1, c2 = st.columns(2)
             c1.metric("🔥 Total Calories Burned", f"{round(total_burned, 2)} kcal")
             c2.metric("🏃 Last Activity", last_activity)
+            export.show_export_panel(username, "exercise")
 
         except Exception as e:
             st.error(f"⚠ Error loading exercise history: {e}")
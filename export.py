@@ -0,0 +1,172 @@
+# ------------------------------------------------------------
+# Description: Streams a user's nutrition/exercise history to CSV or
+#              JSONL in fixed-size chunks (optionally gzip-compressed).
+# ------------------------------------------------------------
+
+import argparse
+import gzip
+import io
+import os
+
+import pandas as pd
+
+import archive
+import storage
+import stores
+from records import SCHEMAS, to_day
+
+CHUNK_SIZE = 10000
+FORMATS = ("csv", "jsonl")
+
+
+def export_columns(kind):
+    """Columns of an export: date, name, values and which store the row came from."""
+    name_field, fields = SCHEMAS[kind]
+    return ["date", name_field, *fields, "source"]
+
+
+def _filter(df, start, end):
+    if start is None and end is None:
+        return df
+    days = df["date"].astype(str).str[:10]
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= days >= str(start)
+    if end is not None:
+        mask &= days <= str(end)
+    return df[mask]
+
+
+def iter_chunks(username, kind, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield DataFrames of at most `chunk_size` rows in the export schema:
+    archived months that overlap the range first, then the tracker JSON
+    store, then the CSV log. The CSV log is read incrementally; the JSON
+    store has to be parsed whole but is only converted to frames one chunk
+    at a time.
+    """
+    columns = export_columns(kind)
+    start_day = to_day(str(start)) if start is not None else None
+    end_day = to_day(str(end)) if end is not None else None
+    for name, entry in archive.user_buckets(kind, username, start_day, end_day):
+        df = archive.read_bucket(name, entry).to_frame()
+        df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+        df["source"] = "archive"
+        for i in range(0, len(df), chunk_size):
+            chunk = _filter(df.iloc[i:i + chunk_size].reindex(columns=columns), start, end)
+            if not chunk.empty:
+                yield chunk
+    json_path, csv_path = stores.sources(kind, username)
+    csv_columns = stores.csv_columns(kind)
+
+    records = storage.load_json(json_path, {}).get(username, [])
+    for i in range(0, len(records), chunk_size):
+        df = pd.DataFrame(records[i:i + chunk_size]).reindex(columns=columns)
+        df["source"] = "tracker"
+        df = _filter(df, start, end)
+        if not df.empty:
+            yield df
+    del records
+
+    if os.path.exists(csv_path):
+        rename = {v: k for k, v in csv_columns.items()}
+        for df in pd.read_csv(csv_path, chunksize=chunk_size, usecols=list(csv_columns.values())):
+            df = df.rename(columns=rename).reindex(columns=columns)
+            df["source"] = "log"
+            df = _filter(df, start, end)
+            if not df.empty:
+                yield df
+
+
+def write_export(out, username, kind, fmt="csv", start=None, end=None, columns=None,
+                 chunk_size=CHUNK_SIZE, compress=False):
+    """
+    Write the export to `out` (a path or a binary file object) chunk by chunk.
+    Returns the number of rows written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = columns or export_columns(kind)
+    unknown = set(columns) - set(export_columns(kind))
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+    close = isinstance(out, (str, os.PathLike))
+    f = open(out, "wb") if close else out
+    stream = gzip.GzipFile(fileobj=f, mode="wb") if compress else f
+    rows = 0
+    try:
+        for df in iter_chunks(username, kind, start, end, chunk_size):
+            df = df[columns]
+            if fmt == "csv":
+                text = df.to_csv(index=False, header=(rows == 0))
+            else:
+                text = df.to_json(orient="records", lines=True, date_format="iso")
+                if not text.endswith("\n"):
+                    text += "\n"
+            stream.write(text.encode("utf-8"))
+            rows += len(df)
+        if fmt == "csv" and rows == 0:
+            stream.write((",".join(columns) + "\n").encode("utf-8"))
+    finally:
+        if compress:
+            stream.close()
+        if close:
+            f.close()
+    return rows
+
+
+def export_filename(username, kind, fmt, compress):
+    return f"{username}_{kind}.{fmt}" + (".gz" if compress else "")
+
+
+def show_export_panel(username, kind):
+    """Streamlit widget: export this history into memory, then offer it for download."""
+    import streamlit as st
+
+    with st.expander("⬇️ Export History"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            fmt = st.selectbox("Format", FORMATS, key=f"{kind}_export_fmt")
+            compress = st.checkbox("gzip", key=f"{kind}_export_gz")
+        with col2:
+            start = st.date_input("From", value=None, key=f"{kind}_export_from")
+            end = st.date_input("To", value=None, key=f"{kind}_export_to")
+        with col3:
+            columns = st.multiselect("Columns", export_columns(kind), default=export_columns(kind),
+                                     key=f"{kind}_export_cols")
+
+        if st.button("Prepare Export", key=f"{kind}_export_go") and columns:
+            buffer = io.BytesIO()
+            rows = write_export(buffer, username, kind, fmt, start, end, columns, compress=compress)
+            st.session_state[f"{kind}_export_file"] = (buffer.getvalue(), rows,
+                                                       export_filename(username, kind, fmt, compress))
+
+        prepared = st.session_state.get(f"{kind}_export_file")
+        if prepared:
+            data, rows, filename = prepared
+            st.download_button(f"Download {rows} rows", data, file_name=filename, key=f"{kind}_export_dl")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a user's nutrition or exercise history.")
+    parser.add_argument("username")
+    parser.add_argument("kind", choices=sorted(SCHEMAS))
+    parser.add_argument("-o", "--output", help="output file (default: <user>_<kind>.<format>[.gz])")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--start", help="first date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last date (YYYY-MM-DD)")
+    parser.add_argument("--columns", help="comma-separated columns to keep")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    output = args.output or export_filename(args.username, args.kind, args.format, args.gzip)
+    columns = args.columns.split(",") if args.columns else None
+    rows = write_export(output, args.username, args.kind, args.format, args.start, args.end,
+                        columns, args.chunk_size, args.gzip)
+    print(f"Exported {rows} rows to {output}")
+
+
+if __name__ == "__main__":
+    main()
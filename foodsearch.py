@@ -0,0 +1,156 @@
+# ------------------------------------------------------------
+# Description: Prefix and typo-tolerant search over the food catalog,
+#              built once per catalog version, for type-ahead selection.
+# ------------------------------------------------------------
+
+import os
+import re
+import threading
+from bisect import bisect_left
+
+import numpy as np
+
+import nutrition
+
+SEARCH_LIMIT = 10
+MIN_SIMILARITY = 0.3       # share of the query's trigrams a fuzzy match must contain
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+# Cached index, rebuilt when the catalog file changes on disk
+_cache = {"stamp": None, "index": None}
+_lock = threading.Lock()
+
+
+def normalize(text):
+    """Lower-case words separated by single spaces."""
+    return " ".join(_WORD.findall(str(text).lower()))
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FoodIndex:
+    """
+    Search structures over the catalog's food names.
+
+    - the normalized names, sorted, for whole-name prefix matches;
+    - every word of every name, sorted, for matches on any word;
+    - trigram -> item ids, for names that only match approximately.
+
+    Prefix lookups are two bisects; the fuzzy fallback only touches the
+    id lists of the query's trigrams.
+    """
+
+    def __init__(self, names, calories):
+        self.names = [str(n) for n in names]
+        self.calories = {name: float(c) for name, c in zip(self.names, calories)}
+        keys = [normalize(n) for n in self.names]
+        key_array = np.array(keys, dtype=str)
+        # Ties rank shorter, then alphabetically earlier names first
+        order = np.argsort(key_array, kind="stable")
+        by_length = order[np.argsort(np.char.str_len(key_array[order]), kind="stable")]
+        self.rank = np.empty(len(keys), dtype=np.int64)
+        self.rank[by_length] = np.arange(len(keys))
+
+        self.sorted_keys = key_array[order].tolist()
+        self.sorted_ids = order
+
+        words, word_ids = [], []
+        grams = {}
+        gram_counts = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            for word in set(key.split()):
+                words.append(word)
+                word_ids.append(i)
+            key_grams = _trigrams(key)
+            gram_counts[i] = len(key_grams)
+            for gram in key_grams:
+                grams.setdefault(gram, []).append(i)
+        word_order = np.argsort(np.array(words, dtype=str), kind="stable")
+        self.words = np.array(words, dtype=str)[word_order].tolist()
+        self.word_ids = np.array(word_ids, dtype=np.int64)[word_order]
+        self.grams = {g: np.array(ids, dtype=np.int64) for g, ids in grams.items()}
+        self.gram_counts = gram_counts
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix_range(self, items, prefix):
+        lo = bisect_left(items, prefix)
+        hi = bisect_left(items, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _best(self, ids, k, exclude=()):
+        ids = np.setdiff1d(np.unique(ids), np.fromiter(exclude, dtype=np.int64))
+        if len(ids) > k:
+            ids = ids[np.argpartition(self.rank[ids], k)[:k]]
+        return ids[np.argsort(self.rank[ids])].tolist()
+
+    def search(self, query, k=SEARCH_LIMIT):
+        """Up to `k` food names for a query, best first."""
+        query = normalize(query)
+        if not query:
+            return [self.names[i] for i in self.sorted_ids[:k].tolist()]
+
+        # 1. names starting with the query
+        lo, hi = self._prefix_range(self.sorted_keys, query)
+        found = self._best(self.sorted_ids[lo:hi], k)
+
+        # 2. names in which every query word starts some word
+        if len(found) < k:
+            matches = None
+            for word in query.split():
+                lo, hi = self._prefix_range(self.words, word)
+                ids = np.unique(self.word_ids[lo:hi])
+                matches = ids if matches is None else np.intersect1d(matches, ids, assume_unique=True)
+            found += self._best(matches, k - len(found), found)
+
+        # 3. typo-tolerant fallback: share of the query's trigrams in the name
+        if len(found) < k:
+            query_grams = _trigrams(query)
+            grams = [self.grams[g] for g in query_grams if g in self.grams]
+            if grams:
+                counts = np.bincount(np.concatenate(grams), minlength=len(self))
+                score = counts / len(query_grams)
+                candidates = np.flatnonzero(score >= MIN_SIMILARITY)
+                candidates = np.setdiff1d(candidates, np.array(found, dtype=np.int64))
+                if len(candidates):
+                    # Prefer more shared trigrams, then fewer extra ones in the name
+                    order = np.lexsort((self.rank[candidates],
+                                        self.gram_counts[candidates] - counts[candidates],
+                                        -counts[candidates]))
+                    found += candidates[order[:k - len(found)]].tolist()
+
+        return [self.names[i] for i in found]
+
+    def calories_per_100g(self, name):
+        return self.calories.get(name)
+
+    def estimate(self, name, weight_grams):
+        """Calories for a weight of a catalog food (as nutrition.calculate_calories), or None."""
+        rate = self.calories.get(name)
+        return None if rate is None else round((rate / 100) * weight_grams, 2)
+
+
+def get_index():
+    """The index for the current food catalog, rebuilt only when the catalog file changes."""
+    path = nutrition.get_food_file_path()
+    if path:
+        st = os.stat(path)
+        stamp = (path, st.st_mtime_ns, st.st_size)
+    else:
+        stamp = None
+    with _lock:
+        if _cache["index"] is None or _cache["stamp"] != stamp:
+            df = nutrition.load_food_data()
+            if df.empty or "Food" not in df.columns:
+                index = FoodIndex([], [])
+            else:
+                df = df.dropna(subset=["Food"]).drop_duplicates("Food")
+                index = FoodIndex(df["Food"].astype(str).tolist(),
+                                  df["Calories_per_100g"].fillna(0).astype(float).tolist())
+            _cache.update(stamp=stamp, index=index)
+        return _cache["index"]
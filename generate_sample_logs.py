@@ -44,14 +44,15 @@ def generate_nutrition_logs(username=USERNAME, n=NUM_ENTRIES):
     print(f"Wrote {n} nutrition entries to {user_file}")
 
 
-def generate_exercise_logs(n=NUM_ENTRIES):
+def generate_exercise_logs(username, n=NUM_ENTRIES):
+    exercise_file = exercise.get_log_path(username)
     # Ensure data dir exists
-    os.makedirs(os.path.dirname(exercise.EXERCISE_LOG_PATH) or 'data', exist_ok=True)
+    os.makedirs(os.path.dirname(exercise_file) or 'data', exist_ok=True)
 
     # Remove existing exercise log to start fresh
-    if os.path.exists(exercise.EXERCISE_LOG_PATH):
-        os.remove(exercise.EXERCISE_LOG_PATH)
-        print(f"Removed existing file: {exercise.EXERCISE_LOG_PATH}")
+    if os.path.exists(exercise_file):
+        os.remove(exercise_file)
+        print(f"Removed existing file: {exercise_file}")
 
     activities = exercise.get_activity_list()
     if not activities:
@@ -63,8 +64,8 @@ def generate_exercise_logs(n=NUM_ENTRIES):
         duration = random.randint(20, 90)  # minutes
         weight_kg = round(random.uniform(60, 90), 1)
         cals = exercise.calculate_calories(activity, weight_kg, duration)
-        exercise.save_exercise_entry(d, activity, duration, weight_kg, cals)
-    print(f"Wrote {n} exercise entries to {exercise.EXERCISE_LOG_PATH}")
+        exercise.save_exercise_entry(d, activity, duration, weight_kg, cals, username)
+    print(f"Wrote {n} exercise entries to {exercise_file}")
 
 
 def show_head_tail(path, label, n=5):
@@ -85,13 +86,13 @@ if __name__ == "__main__":
     generate_nutrition_logs(USERNAME, NUM_ENTRIES)
 
     # 2. Exercise
-    generate_exercise_logs(NUM_ENTRIES)
+    generate_exercise_logs(USERNAME, NUM_ENTRIES)
 
     # 3. Show results
     nutrition_path = os.path.join(nutrition.DATA_DIR, f"{USERNAME}_nutrition.csv")
-    exercise_path = exercise.EXERCISE_LOG_PATH
+    exercise_path = exercise.get_log_path(USERNAME)
 
     show_head_tail(nutrition_path, f"Nutrition ({USERNAME})")
-    show_head_tail(exercise_path, "Exercise Log")
+    show_head_tail(exercise_path, f"Exercise ({USERNAME})")
 
     print("Sample log generation complete.")
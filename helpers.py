@@ -3,6 +3,7 @@ import csv
 from datetime import datetime
 
 DATA_DIR = "data"
+DEFAULT_GOAL = 2000  # daily calorie goal used until the user sets one in their ledger
 
 
 def today_str():
@@ -39,8 +40,8 @@ def get_nutrition_data_path(username: str) -> str:
 
 def get_exercise_data_path(username: str) -> str:
     
-  #  Return the path for the exercise log file.
+  #  Return the path for the user's exercise log file.
 
     
     os.makedirs(DATA_DIR, exist_ok=True)
-    return os.path.join(DATA_DIR, "exercise_log.csv")
+    return os.path.join(DATA_DIR, f"{username}_exercise.csv")
@@ -0,0 +1,250 @@
+# ------------------------------------------------------------
+# Description: Streaming import of workout exports (GPX, TCX and
+#              per-second CSV streams) into the exercise log.
+# ------------------------------------------------------------
+
+import argparse
+import csv
+import io
+import math
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+
+import exercise
+
+SESSION_GAP = timedelta(minutes=10)   # a longer pause starts a new session
+MIN_SESSION = timedelta(minutes=1)    # shorter sessions are dropped as noise
+
+MPS_TO_MPH = 2.236936
+
+# sport keyword -> [(minimum mph, catalog activity)], checked from fastest down
+ACTIVITY_RULES = {
+    "run": [(6.5, "Running, 7.5 mph (8 min/mile)"), (0, "Running, 5 mph (12 min/mile)")],
+    "walk": [(3.5, "Walking, 4 mph (15 min/mile)"), (0, "Walking, 3 mph (20 min/mile)")],
+    "hik": [(0, "Hiking, cross country")],
+    "bik": [(14, "Cycling, vigorous effort"), (0, "Cycling, moderate effort")],
+    "cycl": [(14, "Cycling, vigorous effort"), (0, "Cycling, moderate effort")],
+    "swim": [(2.0, "Swimming, freestyle, vigorous"), (0, "Swimming, freestyle, moderate")],
+}
+# Used when the file does not say which sport it is
+SPEED_RULES = [(14, "Cycling, vigorous effort"), (9, "Cycling, moderate effort"),
+               (6.5, "Running, 7.5 mph (8 min/mile)"), (4.5, "Running, 5 mph (12 min/mile)"),
+               (3.5, "Walking, 4 mph (15 min/mile)"), (0, "Walking, 3 mph (20 min/mile)")]
+
+
+class Session:
+    """Running totals for one continuous stretch of activity."""
+
+    def __init__(self, start, sport):
+        self.start = start
+        self.end = start
+        self.sport = sport
+        self.distance_m = 0.0
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def avg_mph(self):
+        seconds = self.duration.total_seconds()
+        return self.distance_m / seconds * MPS_TO_MPH if seconds else 0.0
+
+
+# ---------------- Parsing Helpers ----------------
+
+def _parse_time(text):
+    """Timezone-aware datetime; epoch seconds are UTC, ISO times without an offset are local."""
+    text = text.strip()
+    try:
+        return datetime.fromtimestamp(float(text), tz=timezone.utc)
+    except ValueError:
+        value = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        return value if value.tzinfo else value.astimezone()
+
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(a))
+
+
+def _tag(element):
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element, name):
+    for child in element.iter():
+        if _tag(child) == name and child.text:
+            return child.text
+    return None
+
+
+# ---------------- Point Streams ----------------
+# Each yields (time, lat, lon, cumulative distance in m or None, sport or None)
+
+def _points_xml(source):
+    """GPX <trkpt> / TCX <Trackpoint> elements, parsed one at a time."""
+    sport = None
+    open_elements = []
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        tag = _tag(element)
+        if event == "start":
+            open_elements.append(element)
+            if tag == "Activity" and element.get("Sport"):
+                sport = element.get("Sport")
+            continue
+        open_elements.pop()
+
+        if tag == "type" and element.text:  # GPX <trk><type>
+            sport = element.text
+        elif tag in ("trkpt", "Trackpoint"):
+            when = _child_text(element, "time") or _child_text(element, "Time")
+            if when:
+                lat = element.get("lat") or _child_text(element, "LatitudeDegrees")
+                lon = element.get("lon") or _child_text(element, "LongitudeDegrees")
+                dist = _child_text(element, "DistanceMeters")
+                yield (_parse_time(when),
+                       float(lat) if lat else None, float(lon) if lon else None,
+                       float(dist) if dist else None, sport)
+            # Detach finished points from their parent so memory stays flat
+            if open_elements:
+                open_elements[-1].remove(element)
+
+
+def _points_csv(source):
+    """Per-second CSV rows with a time column and optional distance/lat/lon/sport columns."""
+    reader = csv.DictReader(source)
+    fields = {name.strip().lower(): name for name in reader.fieldnames or []}
+
+    def pick(*names):
+        return next((fields[n] for n in names if n in fields), None)
+
+    time_col = pick("timestamp", "time", "datetime", "date")
+    if time_col is None:
+        raise ValueError("CSV stream needs a timestamp/time column")
+    dist_col = pick("distance_m", "distance", "distancemeters")
+    lat_col, lon_col = pick("lat", "latitude"), pick("lon", "lng", "longitude")
+    sport_col = pick("sport", "activity", "type")
+
+    for row in reader:
+        if not row.get(time_col):
+            continue
+        lat = row.get(lat_col) if lat_col else None
+        lon = row.get(lon_col) if lon_col else None
+        dist = row.get(dist_col) if dist_col else None
+        yield (_parse_time(row[time_col]),
+               float(lat) if lat else None, float(lon) if lon else None,
+               float(dist) if dist else None, (row.get(sport_col) or None) if sport_col else None)
+
+
+def iter_points(source, name=None):
+    """Pick the parser from the file name (path or uploaded file object)."""
+    name = (name or getattr(source, "name", None) or str(source)).lower()
+    if name.endswith((".gpx", ".tcx", ".xml")):
+        return _points_xml(source)
+    if name.endswith(".csv"):
+        if isinstance(source, (str, os.PathLike)):
+            return _read_csv_path(source)
+        if isinstance(source, io.TextIOBase):
+            return _points_csv(source)
+        return _points_csv(io.TextIOWrapper(source, encoding="utf-8", newline=""))
+    raise ValueError(f"Unsupported workout file: {name}")
+
+
+def _read_csv_path(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from _points_csv(f)
+
+
+# ---------------- Sessions ----------------
+
+def iter_sessions(points, gap=SESSION_GAP, min_duration=MIN_SESSION):
+    """Group a time-ordered point stream into sessions, keeping only running totals."""
+    current = None
+    last_pos = last_dist = None
+    for when, lat, lon, dist, sport in points:
+        if current is not None and when < current.end:
+            continue  # out-of-order sample
+        if current is None or when - current.end > gap or (sport and sport != current.sport):
+            if current is not None and current.duration >= min_duration:
+                yield current
+            current = Session(when, sport)
+            last_pos = last_dist = None
+
+        if dist is not None:
+            if last_dist is not None:
+                current.distance_m += max(0.0, dist - last_dist)
+            last_dist = dist
+        elif lat is not None and lon is not None:
+            if last_pos is not None:
+                current.distance_m += _haversine_m(last_pos[0], last_pos[1], lat, lon)
+            last_pos = (lat, lon)
+        current.end = when
+
+    if current is not None and current.duration >= min_duration:
+        yield current
+
+
+def match_activity(session, activities, sport=None):
+    """Map a session to the closest activity in the exercise catalog, or None."""
+    mph = session.avg_mph()
+    hint = (sport or session.sport or "").lower()
+    rules = next((r for key, r in ACTIVITY_RULES.items() if key in hint), SPEED_RULES)
+    for minimum, activity in rules:
+        if mph >= minimum and activity in activities:
+            return activity
+    return next((a for _, a in rules if a in activities), None)
+
+
+# ---------------- Import ----------------
+
+def import_workouts(source, weight_kg, name=None, sport=None, gap=SESSION_GAP, dry_run=False,
+                    username=None):
+    """
+    Stream one export file into the user's exercise log.
+    Returns the list of (date, activity, minutes, weight_kg, calories) entries
+    written (or that would be written with dry_run=True) and a count of
+    sessions that matched no catalog activity. Dates are the local day each
+    session started on.
+    """
+    dataset = exercise.load_exercise_dataset()
+    activities = set(dataset["Activity, Exercise or Sport (1 hour)"])
+    entries, unmatched = [], 0
+    for session in iter_sessions(iter_points(source, name), gap=gap):
+        activity = match_activity(session, activities, sport)
+        if activity is None:
+            unmatched += 1
+            continue
+        minutes = round(session.duration.total_seconds() / 60, 1)
+        calories = exercise.calculate_calories(activity, weight_kg, minutes, dataset)
+        entries.append((session.start.astimezone().date().isoformat(), activity, minutes, weight_kg, calories))
+
+    if entries and not dry_run:
+        exercise.save_exercise_entries(entries, username)
+    return entries, unmatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import GPX/TCX/CSV workout exports into the exercise log.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--user", required=True, help="whose exercise log to import into")
+    parser.add_argument("--weight", type=float, required=True, help="body weight in kg")
+    parser.add_argument("--sport", help="override the sport (running, walking, cycling, ...)")
+    parser.add_argument("--gap-min", type=float, default=SESSION_GAP.total_seconds() / 60,
+                        help="pause in minutes that splits sessions")
+    parser.add_argument("--dry-run", action="store_true", help="show sessions without saving")
+    args = parser.parse_args()
+
+    for path in args.files:
+        entries, unmatched = import_workouts(path, args.weight, sport=args.sport,
+                                             gap=timedelta(minutes=args.gap_min), dry_run=args.dry_run,
+                                             username=args.user)
+        for day, activity, minutes, _, calories in entries:
+            print(f"{day}  {activity:<35} {minutes:>6} min  {calories:>8} kcal")
+        print(f"{path}: {len(entries)} sessions {'found' if args.dry_run else 'imported'}, {unmatched} unmatched")
+
+
+if __name__ == "__main__":
+    main()
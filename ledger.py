@@ -0,0 +1,242 @@
+# ------------------------------------------------------------
+# Description: Materializes the per-user daily ledger
+#              (data/{user}_tracker.csv: date,in_cal,out_cal,goal)
+#              from every nutrition and exercise source.
+# ------------------------------------------------------------
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import archive
+import datasource
+import helpers
+import storage
+import stores
+from records import RecordBatch, from_day, to_day
+
+LEDGER_COLUMNS = ["date", "in_cal", "out_cal", "goal"]
+KIND_FIELD = {"nutrition": "calories", "exercise": "calories_burned"}
+
+
+def get_state_path(username):
+    """Per-user watermark file: the last seen stamp and daily totals of each source."""
+    return os.path.join(helpers.DATA_DIR, f"{username}_ledger_state.json")
+
+
+def _daily_totals(batch, field):
+    """{day number (as str): total} for one source batch."""
+    if len(batch) == 0:
+        return {}
+    days, inverse = np.unique(batch.days, return_inverse=True)
+    sums = np.bincount(inverse, weights=batch.columns[field])
+    return {str(d): round(float(s), 2) for d, s in zip(days, sums)}
+
+
+def _combine(sources):
+    """Sum per-source daily totals into {day: [in_cal, out_cal]}."""
+    combined = {}
+    for key, entry in sources.items():
+        col = 0 if key.startswith("nutrition:") else 1
+        for day, total in entry["daily"].items():
+            combined.setdefault(day, [0.0, 0.0])[col] += total
+    return combined
+
+
+def read_ledger(path):
+    """{day: [in_cal, out_cal, goal]} from an existing ledger file."""
+    rows = {}
+    if os.path.exists(path):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                if not row.get("date"):
+                    continue
+                goal = row.get("goal") or helpers.DEFAULT_GOAL
+                rows[str(to_day(row["date"]))] = [float(row.get("in_cal") or 0),
+                                                  float(row.get("out_cal") or 0), float(goal)]
+    return rows
+
+
+def _format_row(day, values):
+    in_cal, out_cal, goal = values
+    return [from_day(int(day)).isoformat(), round(in_cal, 2), round(out_cal, 2), f"{goal:g}"]
+
+
+def _scan(username, session, old_sources):
+    """
+    Per-source stamps and daily totals. Only sources whose (mtime, size)
+    differs from the stored watermark are re-read.
+    """
+    new_sources = {}
+    for kind, field in KIND_FIELD.items():
+        sources = [(f"{kind}:{path}", list(storage.file_stamp(path) or []),
+                    lambda kind=kind, path=path: session.source_batch(kind, username, path))
+                   for path in stores.sources(kind, username)]
+        # Archived months count as one more source, versioned by their generations
+        buckets = archive.user_buckets(kind, username)
+        sources.append((f"{kind}:archive", [[name, archive.generation(entry)] for name, entry in buckets],
+                        lambda kind=kind: RecordBatch.concat(
+                            kind, [b for _, b in session.archived_batches(kind, username)])))
+
+        for key, stamp, load in sources:
+            old = old_sources.get(key)
+            if old is not None and old["stamp"] == stamp:
+                new_sources[key] = old
+                continue
+            new_sources[key] = {"stamp": stamp, "daily": _daily_totals(load(), field)}
+    return new_sources
+
+
+def _changes(old_sources, new_sources):
+    """{day: [in_cal, out_cal]} for every date whose totals differ between two scans."""
+    before = _combine(old_sources)
+    after = _combine(new_sources)
+    return {d: after.get(d, [0.0, 0.0]) for d in set(before) | set(after) if before.get(d) != after.get(d)}
+
+
+def _apply(ledger, changes):
+    """Set the totals of changed dates, keeping their goals."""
+    for day, (in_cal, out_cal) in changes.items():
+        goal = ledger[day][2] if day in ledger else helpers.DEFAULT_GOAL
+        ledger[day] = [in_cal, out_cal, goal]
+
+
+def pending_changes(username, session=None):
+    """
+    {day: [in_cal, out_cal]} for dates whose totals changed since the ledger
+    was last written (only sources with a new stamp are read). Writes nothing.
+    """
+    session = session or datasource.ReadSession()
+    old_sources = storage.load_json(get_state_path(username), {}).get("sources", {})
+    new_sources = _scan(username, session, old_sources)
+    return _changes(old_sources, new_sources) if new_sources != old_sources else {}
+
+
+def current_rows(username, session=None):
+    """
+    The user's ledger rows ({day: [in_cal, out_cal, goal]}) including entries
+    logged since it was last written. Nothing is written, so pages can call
+    this on every render.
+    """
+    # The state is written after the ledger, so reading it first never pairs
+    # a newer state with an older ledger (re-applying a change is harmless)
+    changes = pending_changes(username, session)
+    ledger = read_ledger(helpers.get_user_data_path(username))
+    _apply(ledger, changes)
+    return ledger
+
+
+def version(username):
+    """A value that changes whenever current_rows(username) can change."""
+    return storage.file_stamp(helpers.get_user_data_path(username)), datasource.data_version(username)
+
+
+def to_frame(rows):
+    """DataFrame (date, in_cal, out_cal, goal) of ledger rows, ordered by date."""
+    days = sorted(rows, key=int)
+    df = pd.DataFrame([rows[d] for d in days], columns=LEDGER_COLUMNS[1:], dtype=np.float64)
+    df.insert(0, "date", pd.to_datetime(np.array(days, dtype=np.int64).astype("datetime64[D]")))
+    return df
+
+
+def update_ledger(username, full=False, session=None, on_change=None):
+    """
+    Bring the user's ledger file up to date and return how many dates changed.
+
+    Only dates whose totals differ are touched. When every changed date is
+    newer than the ledger's last row the rows are appended; otherwise the
+    file is rewritten atomically. `full=True` ignores the watermark and
+    recomputes every date. The whole update holds the ledger's lock, so
+    concurrent sessions cannot both append the same rows.
+
+    `on_change(username, {day: (in_cal, out_cal)}, previous ledger stamp)`
+    is called, still under the lock, when any date changed (see stats.update).
+    """
+    session = session or datasource.ReadSession()
+    path = helpers.get_user_data_path(username)
+    state_path = get_state_path(username)
+    with storage.locked(path):
+        old_sources = {} if full else storage.load_json(state_path, {}).get("sources", {})
+        new_sources = _scan(username, session, old_sources)
+        if not full and new_sources == old_sources:
+            return 0
+
+        previous_stamp = storage.file_stamp(path)
+        ledger = read_ledger(path)
+        last_day = max((int(d) for d in ledger), default=None)
+        changes = _changes(old_sources, new_sources)
+        if full:
+            # Dates no source mentions any more drop back to zero (goals are kept)
+            changes = {**{d: [0.0, 0.0] for d in ledger}, **changes}
+        _apply(ledger, changes)
+        changed = sorted(changes, key=int)
+
+        if changed and not full and last_day is not None and int(changed[0]) > last_day:
+            with open(path, "a", newline="") as f:
+                csv.writer(f).writerows(_format_row(d, ledger[d]) for d in changed)
+            storage.notify_write(path)
+        elif changed or full:
+            def write(f):
+                writer = csv.writer(f)
+                writer.writerow(LEDGER_COLUMNS)
+                writer.writerows(_format_row(d, ledger[d]) for d in sorted(ledger, key=int))
+            storage.atomic_write(path, write, newline="")
+
+        storage.atomic_write(state_path, lambda f: json.dump({"sources": new_sources}, f, indent=2))
+        if changed and on_change is not None:
+            on_change(username, {int(d): tuple(ledger[d][:2]) for d in changed}, previous_stamp)
+    return len(changed)
+
+
+def _rebuild_user(username, on_change=None):
+    """Worker for rebuild_all; returns (username, changed dates or error)."""
+    try:
+        return username, update_ledger(username, full=True, on_change=on_change)
+    except Exception as e:
+        return username, str(e)
+
+
+def rebuild_all(users=None, workers=None, on_change=None):
+    """Fully recompute every user's ledger, one user per worker process."""
+    users = users or datasource.discover_users()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_rebuild_user, users, [on_change] * len(users),
+                             chunksize=max(1, len(users) // 64)))
+
+
+def update_all(users=None, on_change=None):
+    """Incremental update of every user's ledger in this process."""
+    users = users or datasource.discover_users()
+    session = datasource.ReadSession()
+    return {u: update_ledger(u, session=session, on_change=on_change) for u in users}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill data/{user}_tracker.csv from the nutrition and exercise logs.")
+    parser.add_argument("--full", action="store_true", help="recompute every date using all CPU cores")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes for --full")
+    parser.add_argument("--user", action="append", help="only these users (repeatable)")
+    args = parser.parse_args()
+    # stats builds on this module, so it is only pulled in to keep its state in step
+    import stats
+
+    start = time.time()
+    if args.full:
+        results = rebuild_all(args.user, args.workers, on_change=stats.record_days)
+    else:
+        results = update_all(args.user, on_change=stats.record_days)
+    for username, result in results.items():
+        if isinstance(result, str):
+            print(f"Failed: {username}: {result}")
+    changed = sum(r for r in results.values() if isinstance(r, int))
+    print(f"Updated {len(results)} ledgers ({changed} dates changed) in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
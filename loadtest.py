@@ -0,0 +1,368 @@
+# ------------------------------------------------------------
+# Description: Load-testing harness that drives the storage functions
+#              and page data paths from many threads and processes in a
+#              scratch folder, then reports latency and data integrity.
+# ------------------------------------------------------------
+
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+DEFAULT_MIX = "read=50,nutrition=20,exercise=15,tracker=10,register=5"
+OPERATIONS = ("read", "dashboard", "nutrition", "exercise", "tracker", "register")
+ID_BLOCK = 1_000_000       # ids per thread; each write carries a unique id
+
+
+def parse_mix(text):
+    """'read=50,nutrition=20' -> {"read": 50, "nutrition": 20}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {name} (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def prepare_scratch(folder=None):
+    """Create a scratch folder holding copies of the food and exercise catalogs."""
+    folder = folder or tempfile.mkdtemp(prefix="fitness-loadtest-")
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ("food", "exercise"):
+        src = os.path.join(here, name)
+        if os.path.isdir(src) and not os.path.exists(os.path.join(folder, name)):
+            shutil.copytree(src, os.path.join(folder, name))
+    os.makedirs(os.path.join(folder, "data"), exist_ok=True)
+    return folder
+
+
+# ---------------- Operations ----------------
+# Each takes (user, id, rng) and returns what it wrote as (store, id), or None
+
+def _op_read(user, op_id, rng):
+    import datasource
+    import timeline
+
+    session = datasource.begin_request()
+    batches = [session.nutrition(user), session.exercise(user)]
+    timeline.recent(batches, n=20)
+    batches[0].sum_by_name("calories")
+
+
+def _op_dashboard(user, op_id, rng):
+    import datasource
+    import stats
+
+    datasource.begin_request()
+    stats.current(user)
+
+
+def _op_nutrition(user, op_id, rng):
+    import nutrition
+
+    day = date.today() - timedelta(days=rng.randrange(60))
+    nutrition.save_user_record(user, day.isoformat(), "Apple", op_id, 1.0)
+    return "nutrition", (user, op_id)
+
+
+def _op_exercise(user, op_id, rng):
+    import exercise
+
+    day = date.today() - timedelta(days=rng.randrange(60))
+    exercise.save_exercise_entry(day.isoformat(), "Yoga, Hatha", op_id, 70.0, 1.0, user)
+    return "exercise", (user, op_id)
+
+
+def _op_tracker(user, op_id, rng):
+    import stores
+
+    # Same write as the "Add Nutrition Record" button
+    day = date.today() - timedelta(days=rng.randrange(60))
+    stores.insert_record(stores.NUTRI_FILE, user, {
+        "date": day.isoformat(), "food": "Apple", "weight_g": op_id, "calories": 1})
+    return "tracker", (user, op_id)
+
+
+def _op_register(user, op_id, rng):
+    import auth
+
+    name = f"lt{op_id}"
+    ok, message = auth.register_user(name, "secret")
+    if not ok:
+        raise RuntimeError(message)
+    return "register", name
+
+
+_OPS = {"read": _op_read, "dashboard": _op_dashboard, "nutrition": _op_nutrition,
+        "exercise": _op_exercise, "tracker": _op_tracker, "register": _op_register}
+
+
+# ---------------- Workers ----------------
+
+def _thread_loop(worker_id, deadline, mix, users, seed, out):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in names}
+    errors = {}
+    written = []
+    n = 0
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        op_id = worker_id * ID_BLOCK + n
+        n += 1
+        start = time.perf_counter()
+        try:
+            result = _OPS[name](rng.choice(users), op_id, rng)
+            if result is not None:
+                written.append(result)
+        except Exception as e:
+            errors.setdefault(name, []).append(f"{type(e).__name__}: {e}")
+        latencies[name].append(time.perf_counter() - start)
+    out.append((latencies, errors, written))
+
+
+def run_process(args):
+    """
+    Worker process: run `threads` threads against the scratch folder for
+    `seconds` seconds. Returns ({op: [latency s]}, {op: [error]}, [(store, id)]).
+    """
+    process_id, folder, threads, seconds, mix, users, seed = args
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    os.chdir(folder)
+    # Import everything up front so the first operations are not timed with imports
+    import datasource, stats, nutrition, exercise, stores, auth, timeline  # noqa: F401
+
+    out = []
+    deadline = time.perf_counter() + seconds
+    workers = [threading.Thread(target=_thread_loop,
+                                args=(process_id * threads + t, deadline, mix, users, seed + t, out))
+               for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    latencies, errors, written = {}, {}, []
+    for lat, err, wr in out:
+        for name, values in lat.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, values in err.items():
+            errors.setdefault(name, []).extend(values)
+        written.extend(wr)
+    return latencies, errors, written
+
+
+# ---------------- Integrity ----------------
+
+def _count(counter, key):
+    counter[key] = counter.get(key, 0) + 1
+
+
+def _csv_ids(path, id_column, user=None):
+    """({id or (user, id): count}, corrupt rows, error) from a CSV log."""
+    seen, corrupt = {}, 0
+    if not os.path.exists(path):
+        return seen, corrupt, None
+    try:
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            width = len(reader.fieldnames or [])
+            for row in reader:
+                if None in row or len(row) != width or not row.get(id_column):
+                    corrupt += 1
+                    continue
+                try:
+                    op_id = int(float(row[id_column]))
+                except ValueError:
+                    corrupt += 1
+                    continue
+                _count(seen, (user, op_id) if user else op_id)
+    except (csv.Error, UnicodeDecodeError) as e:
+        return seen, corrupt, str(e)
+    return seen, corrupt, None
+
+
+def _json_file(path):
+    """(data, error) without hiding a corrupt file the way storage.load_json does."""
+    if not os.path.exists(path):
+        return {}, None
+    try:
+        with open(path) as f:
+            return json.load(f), None
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return {}, str(e)
+
+
+def check_integrity(folder, written):
+    """
+    Compare what the workers wrote with what is on disk.
+    Returns {store: {"written", "lost", "duplicated", "corrupt", "error"}}.
+    """
+    expected = {}
+    for store, key in written:
+        expected.setdefault(store, []).append(key)
+
+    found = {}
+    report = {}
+
+    # Per-user nutrition and exercise CSVs
+    for store, id_column in (("nutrition", "Weight_g"), ("exercise", "duration_minutes")):
+        store_seen, corrupt, errors = {}, 0, []
+        for user in {u for u, _ in expected.get(store, [])}:
+            seen, bad, error = _csv_ids(os.path.join(folder, "data", f"{user}_{store}.csv"), id_column, user)
+            for key, count in seen.items():
+                store_seen[key] = store_seen.get(key, 0) + count
+            corrupt += bad
+            if error:
+                errors.append(error)
+        found[store] = (store_seen, corrupt, "; ".join(errors) or None)
+
+    # Tracker JSON store
+    data, error = _json_file(os.path.join(folder, "nutrition.json"))
+    seen = {}
+    for user, records in data.items():
+        for record in records:
+            _count(seen, (user, record.get("weight_g")))
+    found["tracker"] = (seen, 0, error)
+
+    # Accounts
+    data, error = _json_file(os.path.join(folder, "users.json"))
+    found["register"] = ({name: 1 for name in data}, 0, error)
+
+    for store in ("nutrition", "exercise", "tracker", "register"):
+        keys = expected.get(store, [])
+        if not keys:
+            continue
+        seen, corrupt, error = found[store]
+        report[store] = {
+            "written": len(keys),
+            "lost": sum(1 for k in keys if k not in seen),
+            "duplicated": sum(1 for k in keys if seen.get(k, 0) > 1),
+            "corrupt": corrupt,
+            "error": error,
+        }
+    return report
+
+
+# ---------------- Driver ----------------
+
+def run(processes=2, threads=4, seconds=5.0, mix=DEFAULT_MIX, users=20, folder=None, seed=0):
+    """
+    Run the load test and return {"ops": {op: stats}, "integrity": {...},
+    "errors": {op: first errors}, "seconds", "elapsed", "folder"}.
+    """
+    mix = parse_mix(mix) if isinstance(mix, str) else mix
+    folder = prepare_scratch(folder)
+    names = [f"load{i}" for i in range(users)]
+    jobs = [(p, folder, threads, seconds, mix, names, seed + p * 1000) for p in range(processes)]
+
+    start = time.perf_counter()
+    if processes == 1:
+        cwd = os.getcwd()
+        try:
+            results = [run_process(jobs[0])]
+        finally:
+            os.chdir(cwd)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(run_process, jobs))
+    elapsed = time.perf_counter() - start
+
+    latencies, errors, written = {}, {}, []
+    for lat, err, wr in results:
+        for name, values in lat.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, values in err.items():
+            errors.setdefault(name, []).extend(values)
+        written.extend(wr)
+
+    ops = {}
+    for name, values in sorted(latencies.items()):
+        ms = np.array(values) * 1000
+        ops[name] = {
+            "count": len(values),
+            "errors": len(errors.get(name, [])),
+            "per_s": len(values) / seconds,
+            **({f"p{q}": float(np.percentile(ms, q)) for q in (50, 90, 99)} if len(ms) else {}),
+            "max": float(ms.max()) if len(ms) else 0.0,
+        }
+    return {"ops": ops, "integrity": check_integrity(folder, written),
+            "errors": {name: values[:3] for name, values in errors.items()},
+            "seconds": seconds, "elapsed": elapsed, "folder": folder}
+
+
+def print_report(result):
+    print(f"{'operation':<11}{'count':>8}{'errors':>8}{'ops/s':>9}"
+          f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, s in result["ops"].items():
+        print(f"{name:<11}{s['count']:>8}{s['errors']:>8}{s['per_s']:>9.1f}"
+              f"{s.get('p50', 0):>9.1f}{s.get('p90', 0):>9.1f}{s.get('p99', 0):>9.1f}{s['max']:>9.1f}")
+    total = sum(s["count"] for s in result["ops"].values())
+    print(f"{total} operations in {result['seconds']:g}s of load ({total / result['seconds']:.1f} ops/s), "
+          f"{result['elapsed']:.1f}s wall time including start-up")
+
+    print("\nIntegrity")
+    for store, r in result["integrity"].items():
+        line = (f"  {store:<10} {r['written']} written, {r['lost']} lost, "
+                f"{r['duplicated']} duplicated, {r['corrupt']} corrupt rows")
+        print(line + (f", unreadable file: {r['error']}" if r["error"] else ""))
+
+    for name, messages in result["errors"].items():
+        print(f"\nFirst errors in {name}:")
+        for message in messages:
+            print(f"  {message}")
+
+
+def has_problems(result):
+    return any(r["lost"] or r["duplicated"] or r["corrupt"] or r["error"]
+               for r in result["integrity"].values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent read/write load test in a scratch folder.")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="threads per process")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"operation weights (default: {DEFAULT_MIX}); operations: {', '.join(OPERATIONS)}")
+    parser.add_argument("--dir", help="scratch folder (default: a new temporary folder)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch folder afterwards")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    try:
+        result = run(args.processes, args.threads, args.seconds, args.mix, args.users, args.dir, args.seed)
+    except Exception:
+        traceback.print_exc()
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+    if not args.keep and not args.dir:
+        shutil.rmtree(result["folder"], ignore_errors=True)
+    elif args.keep:
+        print(f"\nScratch folder kept at {result['folder']}")
+    sys.exit(1 if has_problems(result) else 0)
+
+
+if __name__ == "__main__":
+    main()
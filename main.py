@@ -8,6 +8,8 @@ import auth
 import tracker
 import visualize
 import calories
+import datasource
+import profiler
 
 st.set_page_config(page_title="Fitness Tracker", layout="wide")
 
@@ -49,6 +51,8 @@ def login_page():
 # ---------------- MAIN APP ----------------
 def main_app():
     """Main user interface after login."""
+    # Every rerun reads each data file at most once
+    datasource.begin_request()
     st.sidebar.title(f"Hello, {st.session_state.user}")
     if st.sidebar.button("Logout"):
         st.session_state.user = None
@@ -58,7 +62,19 @@ def main_app():
         "Navigation",
         ["Dashboard", "Log Nutrition", "Log Exercise", "Calorie Calculator"]
     )
+    dev_mode = st.sidebar.toggle("Developer mode", value=profiler.enabled_from_env(),
+                                 help="Profile each page rerun")
 
+    if dev_mode:
+        with profiler.profile(page) as result:
+            show_page(page)
+        profiler.show_panel(result)
+    else:
+        show_page(page)
+
+
+def show_page(page):
+    """Render the selected page."""
     if page == "Dashboard":
         visualize.show_dashboard(st.session_state.user)
     elif page == "Log Nutrition":
@@ -3,6 +3,8 @@
 
 import pandas as pd
 import os
+import catalog_ids
+import stores
 
 DATA_DIR = 'data/'
 FOOD_FOLDER = 'food'
@@ -56,10 +58,8 @@ def save_user_record(username, date, food, weight, calories):
         'Calories': [calories]
     }
     new_df = pd.DataFrame(new_record)
+    catalog_ids.ensure_ids([food])
 
-    if os.path.exists(user_file):
-        new_df.to_csv(user_file, mode='a', header=False, index=False)
-    else:
-        new_df.to_csv(user_file, mode='w', header=True, index=False)
+    stores.append_rows(user_file, new_df)
     
     return True
@@ -2,9 +2,14 @@
 #Description : Streamlit interface allowing users to select food, input weight, and visualize daily logs.
 
 import streamlit as st
-import pandas as pd
 from datetime import date
 import nutrition
+import archive
+import foodsearch
+import datasource
+import export
+import stats
+import timeline
 
 def nutrition_screen(root=None, username="Ishaan", in_cal=None):
     st.sidebar.header(f"User: {username}")
@@ -13,51 +18,58 @@ def nutrition_screen(root=None, username="Ishaan", in_cal=None):
     st.title("🍎 Nutrition Tracker")
     st.markdown("### Log your daily meals")
 
-    food_df = nutrition.load_food_data()
+    food_index = foodsearch.get_index()
     
-    if food_df.empty:
+    if not len(food_index):
         st.error("⚠️ Critical Error: Food database not found.")
         st.warning("Please ensure 'Food and Calories.csv' is inside the 'food' folder.")
         return
 
-    with st.form("nutrition_form"):
-        col1, col2 = st.columns(2)
+    # Outside the form so every keystroke-and-enter refreshes the matches
+    query = st.text_input("🔎 Search foods", key="food_search", placeholder="e.g. chick, brwn rice")
+    matches = food_index.search(query)
+    if not matches:
+        # The history and export below are still shown
+        st.warning("No foods match your search.")
+    else:
+        with st.form("nutrition_form"):
+            col1, col2 = st.columns(2)
         
-        with col1:
-            date_input = st.date_input("Date", date.today())
-            food_list = sorted(food_df['Food'].unique().tolist())
-            food_select = st.selectbox("Select Food Item", food_list)
+            with col1:
+                date_input = st.date_input("Date", date.today())
+                food_select = st.selectbox("Select Food Item", matches)
         
-        with col2:
-            weight_input = st.number_input("Weight (grams)", min_value=1.0, value=100.0, step=10.0)
+            with col2:
+                weight_input = st.number_input("Weight (grams)", min_value=1.0, value=100.0, step=10.0)
         
-        estimated_cals = nutrition.calculate_calories(food_select, weight_input, food_df)
-        st.info(f"⚡ Estimated Energy: **{estimated_cals} kcal**")
+            estimated_cals = food_index.estimate(food_select, weight_input)
+            st.info(f"⚡ Estimated Energy: **{estimated_cals} kcal**")
         
-        submitted = st.form_submit_button("Add to Log")
+            submitted = st.form_submit_button("Add to Log")
 
-        if submitted:
-            success = nutrition.save_user_record(username, date_input, food_select, weight_input, estimated_cals)
-            if success:
-                st.success(f"✅ Logged: {weight_input}g of {food_select}")
-            else:
-                st.error("❌ Failed to save data.")
+            if submitted:
+                success = nutrition.save_user_record(username, date_input, food_select, weight_input, estimated_cals)
+                if success:
+                    stats.update(username)
+                    st.success(f"✅ Logged: {weight_input}g of {food_select}")
+                else:
+                    st.error("❌ Failed to save data.")
 
     st.divider()
     st.subheader("📅 Your Recent Logs")
     
-    user_file_path = f"data/{username}_nutrition.csv"
-    
     try:
-        import os
-        if os.path.exists(os.path.join(nutrition.DATA_DIR, f"{username}_nutrition.csv")):
-            full_path = os.path.join(nutrition.DATA_DIR, f"{username}_nutrition.csv")
-            history_df = pd.read_csv(full_path)
-            
-            st.dataframe(history_df.tail(5), use_container_width=True)
+        history = datasource.load_recent("nutrition", username)
+        archived = archive.summary("nutrition", username)
+        if len(history) or archived["rows"]:
+            # Archived months are only read when the live stores hold too few rows
+            shown = history if len(history) >= 5 else datasource.load_nutrition(username)
+            recent, _ = timeline.recent([shown], n=5)
+            st.dataframe(shown.take([row for _, _, row in recent]).to_frame(), use_container_width=True)
             
-            total_cals = history_df['Calories'].sum()
+            total_cals = history.total('calories') + archived["totals"]["calories"]
             st.metric("Total Calories Tracked (All Time)", f"{round(total_cals, 2)} kcal")
+            export.show_export_panel(username, "nutrition")
         else:
             st.info("No logs found yet. Add your first meal above!")
             
@@ -0,0 +1,197 @@
+# ------------------------------------------------------------
+# Description: Developer-mode profiler for page reruns: deterministic
+#              call profile, wall vs CPU time and peak memory, shown in
+#              a collapsible panel and saved under profiles/ for comparison.
+# ------------------------------------------------------------
+
+import argparse
+import cProfile
+import glob
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_ENV = "FITNESS_PROFILE"     # set to 1 to start with developer mode on
+PROFILE_DIR = "profiles"
+TOP_FUNCTIONS = 25
+
+# tracemalloc is process-wide: profiled reruns in concurrent sessions share
+# one tracing run, started by the first and stopped by the last to finish.
+# Only one cProfile profiler may be active at a time (Python 3.12+ refuses a
+# second), so reruns that overlap the one holding it run without a call profile.
+_tracing = {"users": 0, "entries": 0, "ours": False, "profiling": False}
+_tracing_lock = threading.Lock()
+
+
+def enabled_from_env():
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+def _slug(text):
+    return re.sub(r"[^0-9a-z]+", "-", text.lower()).strip("-") or "page"
+
+
+def _label(func):
+    """'file.py:12(name)' with the path shortened to the file name, as pstats prints it."""
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-in
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def _start_tracing():
+    """
+    Join the shared tracing run and claim the profiler if it is free.
+    Return (entry number, whether other reruns were running, whether the profiler was claimed).
+    """
+    with _tracing_lock:
+        busy = _tracing["users"] > 0
+        if not busy:
+            _tracing["ours"] = not tracemalloc.is_tracing()
+            if _tracing["ours"]:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        _tracing["users"] += 1
+        _tracing["entries"] += 1
+        profiled = not _tracing["profiling"]
+        _tracing["profiling"] = True
+        return _tracing["entries"], busy, profiled
+
+
+def _stop_tracing(entry, profiled):
+    """Leave the shared tracing run; return (peak bytes, whether other reruns overlapped)."""
+    with _tracing_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        overlapped = _tracing["entries"] != entry or _tracing["users"] > 1
+        if profiled:
+            _tracing["profiling"] = False
+        _tracing["users"] -= 1
+        if _tracing["users"] == 0 and _tracing["ours"]:
+            tracemalloc.stop()
+            _tracing["ours"] = False
+        return peak, overlapped
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    """The `limit` functions with the most cumulative time, as dicts (times in ms)."""
+    rows = []
+    for func, (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({"function": _label(func), "calls": calls,
+                     "own_ms": own * 1000, "cumulative_ms": cumulative * 1000})
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+@contextmanager
+def profile(page, save=True):
+    """
+    Profile the code run inside the block. Yields a dict that is filled on
+    exit with wall/CPU/wait time (ms), peak traced memory, the top
+    functions and the path of the saved .prof file. A block that raises
+    (including Streamlit's rerun) is not saved.
+
+    Peak memory is traced for the whole process: when reruns in other
+    sessions overlap this one, `peak_shared` is set and the peak covers them too.
+    A rerun that starts while another one holds the profiler is only timed
+    (`profiled` is False, no top functions, nothing saved).
+    """
+    result = {"page": page}
+    entry, shared, profiled = _start_tracing()
+    profiler = cProfile.Profile()
+    enabled = completed = False
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        if profiled:
+            try:
+                profiler.enable()
+                enabled = True
+            except ValueError:
+                pass  # a profiling tool outside this module (a debugger, coverage) is active
+        yield result
+        completed = True
+    finally:
+        if enabled:
+            profiler.disable()
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        peak, overlapped = _stop_tracing(entry, profiled)
+
+        # Time this thread spent off the CPU: file I/O, locks, sleeping
+        result.update(wall_ms=wall * 1000, cpu_ms=cpu * 1000, wait_ms=max(wall - cpu, 0.0) * 1000,
+                      peak_bytes=peak, peak_shared=shared or overlapped, profiled=enabled,
+                      top=top_functions(pstats.Stats(profiler)) if enabled else [], path=None)
+        if completed and save and enabled:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            result["path"] = os.path.join(PROFILE_DIR, f"{stamp}_{_slug(page)}.prof")
+            profiler.dump_stats(result["path"])
+
+
+def show_panel(result):
+    """Streamlit widget: collapsible summary of one profiled rerun."""
+    import streamlit as st
+    import pandas as pd
+    import charts
+    import datasource
+
+    title = f"🩺 Profile: {result['page']} ({result['wall_ms']:.0f} ms)"
+    with st.expander(title):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Wall time", f"{result['wall_ms']:.0f} ms")
+        col2.metric("CPU time", f"{result['cpu_ms']:.0f} ms")
+        col3.metric("I/O & waiting", f"{result['wait_ms']:.0f} ms")
+        col4.metric("Peak memory", f"{result['peak_bytes'] / 1024 / 1024:.1f} MB")
+        if result["peak_shared"]:
+            st.caption("Peak memory is traced for the whole process and includes reruns "
+                       "in other sessions that overlapped this one.")
+
+        if result["profiled"]:
+            st.dataframe(pd.DataFrame(result["top"]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Another session's rerun was being profiled, so this one was only timed.")
+
+        caches = {"Batch cache": datasource.cache_stats(), "Chart cache": charts.cache_stats()}
+        st.dataframe(pd.DataFrame(caches).T, use_container_width=True)
+        if result["path"]:
+            st.caption(f"Saved to {result['path']} (compare runs with `python profiler.py OLD NEW`).")
+
+
+# ---------------- Comparing Saved Profiles ----------------
+
+def compare(old_path, new_path, limit=TOP_FUNCTIONS):
+    """
+    Functions of two saved profiles with their cumulative times (ms) and the
+    change, ordered by the largest absolute change.
+    """
+    old = {_label(f): v[3] * 1000 for f, v in pstats.Stats(old_path).stats.items()}
+    new = {_label(f): v[3] * 1000 for f, v in pstats.Stats(new_path).stats.items()}
+    rows = [{"function": name, "old_ms": old.get(name, 0.0), "new_ms": new.get(name, 0.0),
+             "change_ms": new.get(name, 0.0) - old.get(name, 0.0)} for name in set(old) | set(new)]
+    rows.sort(key=lambda r: abs(r["change_ms"]), reverse=True)
+    return rows[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List saved page profiles, or compare two of them.")
+    parser.add_argument("profiles", nargs="*", help="OLD.prof NEW.prof to compare (default: list saved profiles)")
+    parser.add_argument("--limit", type=int, default=TOP_FUNCTIONS)
+    args = parser.parse_args()
+
+    if not args.profiles:
+        for path in sorted(glob.glob(os.path.join(PROFILE_DIR, "*.prof"))):
+            print(path)
+        return
+    if len(args.profiles) != 2:
+        parser.error("give exactly two profiles to compare")
+
+    print(f"{'old ms':>10}{'new ms':>10}{'change':>10}  function")
+    for row in compare(*args.profiles, limit=args.limit):
+        print(f"{row['old_ms']:>10.1f}{row['new_ms']:>10.1f}{row['change_ms']:>+10.1f}  {row['function']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# ------------------------------------------------------------
+# Description: Recalculates stored calories in every user log after
+#              calorie values change in the food or exercise catalog.
+# ------------------------------------------------------------
+
+import argparse
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import archive
+import exercise
+import helpers
+import nutrition
+import storage
+
+SNAPSHOT_FILE = os.path.join(helpers.DATA_DIR, "catalog_snapshot.json")
+
+
+# ---------------- Catalogs ----------------
+
+def read_food_catalog(path=None):
+    """{food: calories per 100 g} from a food catalog CSV (default: the live one)."""
+    df = pd.read_csv(path) if path else nutrition.load_food_data()
+    df.columns = df.columns.str.strip()
+    if df.empty:
+        return {}
+    return dict(zip(df['Food'].astype(str), df['Calories_per_100g'].astype(float)))
+
+
+def read_exercise_catalog(path=None):
+    """{activity: calories per kg per hour} from an exercise catalog CSV."""
+    df = pd.read_csv(path or exercise.DATASET_PATH)
+    return dict(zip(df["Activity, Exercise or Sport (1 hour)"].astype(str), df["Calories per kg"].astype(float)))
+
+
+def diff_catalog(old, new):
+    """{name: new value} for items whose value changed (new and removed items are ignored)."""
+    return {name: value for name, value in new.items() if name in old and old[name] != value}
+
+
+def save_snapshot(food, activities):
+    storage.save_json(SNAPSHOT_FILE, {"food": food, "exercise": activities})
+
+
+# ---------------- Per-file Rewrite ----------------
+
+def _recalc_rows(kind, changes, rows):
+    """
+    Recompute the calories of log rows (CSV dicts) whose item changed, in
+    place, and return how many changed. Uses the same formulas as
+    nutrition.calculate_calories and exercise.calculate_calories; rows with
+    a blank or invalid number are left as they are.
+    """
+    if kind == "nutrition":
+        name_col, value_col = "Food", "Calories"
+        compute = lambda row, rate: round((rate / 100) * float(row["Weight_g"]), 2)
+    else:
+        name_col, value_col = "exercise_type", "calories_burned"
+        compute = lambda row, rate: round(rate * float(row["user_weight_kg"]) * (float(row["duration_minutes"]) / 60), 2)
+
+    changed = 0
+    for row in rows:
+        rate = changes.get(row.get(name_col))
+        if rate is None:
+            continue
+        try:
+            value = compute(row, rate)
+            if float(row[value_col] or 0) == value:
+                continue
+        except (TypeError, ValueError):
+            continue
+        row[value_col] = value
+        changed += 1
+    return changed
+
+
+def _recalc_file(args):
+    """
+    Worker: rewrite one log file, recomputing only rows whose item changed.
+    The file's lock is held from the read to the replace, so entries saved
+    meanwhile wait instead of being lost. Returns (path, changed rows or error).
+    """
+    path, kind, changes = args
+    try:
+        with storage.locked(path):
+            with open(path, newline="") as f:
+                reader = csv.DictReader(f)
+                fields = reader.fieldnames
+                rows = list(reader)
+
+            changed = _recalc_rows(kind, changes, rows)
+            if changed:
+                def write(out):
+                    writer = csv.DictWriter(out, fieldnames=fields)
+                    writer.writeheader()
+                    writer.writerows(rows)
+                storage.atomic_write(path, write, newline="")
+        return path, changed
+    except Exception as e:
+        return path, str(e)
+
+
+def log_files():
+    """(path, kind) for every log whose calories come from a catalog."""
+    files = [(p, "nutrition") for p in sorted(glob.glob(os.path.join(helpers.DATA_DIR, "*_nutrition.csv")))]
+    files += [(p, "exercise") for p in sorted(glob.glob(os.path.join(helpers.DATA_DIR, "*_exercise.csv")))]
+    if os.path.exists(exercise.EXERCISE_LOG_PATH):
+        files.append((exercise.EXERCISE_LOG_PATH, "exercise"))
+    return files
+
+
+def recalculate(old_food=None, old_exercise=None, workers=None, everything=False):
+    """
+    Diff the catalogs against the old versions (explicit CSVs, or the snapshot
+    taken on the previous run), rewrite affected rows in all logs in parallel,
+    then in the archive buckets of those logs, and store a new snapshot.
+    Calories typed in by hand on the tracker pages are not catalog-derived
+    and are left alone.
+    Return {"items": changed item names, "files": {path or bucket: rows changed
+    or error}, "records": total}.
+    """
+    food = read_food_catalog()
+    activities = read_exercise_catalog()
+    snapshot = storage.load_json(SNAPSHOT_FILE, {})
+
+    if everything:
+        food_changes, exercise_changes = food, activities
+    else:
+        before_food = read_food_catalog(old_food) if old_food else snapshot.get("food", {})
+        before_exercise = read_exercise_catalog(old_exercise) if old_exercise else snapshot.get("exercise", {})
+        food_changes = diff_catalog(before_food, food)
+        exercise_changes = diff_catalog(before_exercise, activities)
+
+    jobs = []
+    for path, kind in log_files():
+        changes = food_changes if kind == "nutrition" else exercise_changes
+        if changes:
+            jobs.append((path, kind, changes))
+
+    results = {}
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = dict(pool.map(_recalc_file, jobs))
+
+    def update_bucket(entry, rows):
+        # Buckets of the tracker JSON stores hold hand-typed calories
+        changes = food_changes if entry["kind"] == "nutrition" else exercise_changes
+        return _recalc_rows(entry["kind"], changes, rows) if entry["source"].endswith(".csv") else 0
+
+    if food_changes or exercise_changes:
+        try:
+            results.update(archive.rewrite_buckets(update_bucket))
+        except Exception as e:
+            results[archive.ARCHIVE_DIR] = str(e)
+
+    if not any(isinstance(r, str) for r in results.values()):
+        save_snapshot(food, activities)
+    return {
+        "items": sorted(set(food_changes) | set(exercise_changes)),
+        "files": results,
+        "records": sum(r for r in results.values() if isinstance(r, int)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalculate logged calories after catalog changes.")
+    parser.add_argument("--old-food", help="previous food catalog CSV (default: last snapshot)")
+    parser.add_argument("--old-exercise", help="previous exercise catalog CSV (default: last snapshot)")
+    parser.add_argument("--all", action="store_true", help="recompute every catalog-derived row")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.time()
+    report = recalculate(args.old_food, args.old_exercise, args.workers, args.all)
+    for path, result in report["files"].items():
+        print(f"{path}: {result if isinstance(result, str) else f'{result} records updated'}")
+    print(f"{len(report['items'])} catalog items changed, {report['records']} records updated "
+          f"in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
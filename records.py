@@ -0,0 +1,266 @@
+# ------------------------------------------------------------
+# Description: Columnar record batches for nutrition and exercise history.
+# ------------------------------------------------------------
+
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+EPOCH = date(1970, 1, 1)
+MISSING_DAY = np.iinfo(np.int32).min   # parse_days result for a blank or invalid date
+
+# kind -> (name column, numeric columns)
+SCHEMAS = {
+    "nutrition": ("food", ("weight_g", "calories")),
+    "exercise": ("exercise", ("duration_min", "calories_burned")),
+}
+
+
+# ---------------- Date Helpers ----------------
+
+def to_day(value):
+    """Convert a date, datetime or 'YYYY-MM-DD...' string to a day number."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if hasattr(value, "date") and callable(value.date):
+        value = value.date()
+    return (value - EPOCH).days
+
+
+def from_day(day):
+    """Convert a day number back to a date."""
+    return EPOCH + timedelta(days=int(day))
+
+
+def parse_days(values):
+    """
+    Vectorized conversion of date strings to an int32 array of day numbers.
+    Blank or unparseable dates become MISSING_DAY.
+    """
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int32)
+    # A 'U10' array keeps just the 'YYYY-MM-DD' prefix of every value
+    text = np.asarray(values, dtype="U10")
+    try:
+        days = text.astype("datetime64[D]")
+    except ValueError:
+        # Only hand-edited logs get here, so the slower parser is fine
+        days = pd.to_datetime(pd.Series(text), format="%Y-%m-%d", errors="coerce").to_numpy().astype("datetime64[D]")
+    out = days.astype(np.int64)
+    out[np.isnat(days)] = MISSING_DAY
+    return out.astype(np.int32)
+
+
+# ---------------- Record Batch ----------------
+
+class RecordBatch:
+    """
+    Column-oriented storage for one kind of record.
+
+    Dates are int32 day numbers, numeric fields are float64 arrays and the
+    food/exercise name is an int32 code into a shared list of interned names.
+    """
+
+    def __init__(self, kind, days, codes, categories, columns):
+        self.kind = kind
+        self.name_field, self.value_fields = SCHEMAS[kind]
+        self.days = days
+        self.codes = codes
+        self.categories = categories
+        self.columns = columns
+
+    @classmethod
+    def empty(cls, kind, categories=None):
+        """Return a batch with no rows."""
+        _, fields = SCHEMAS[kind]
+        return cls(kind, np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32),
+                   categories if categories is not None else [],
+                   {f: np.empty(0, dtype=np.float64) for f in fields})
+
+    @classmethod
+    def from_records(cls, kind, records, categories=None, lookup=None):
+        """
+        Build a batch from the list-of-dicts format stored by tracker.
+        Pass a shared name list (and its name -> code dict) to get stable codes;
+        they are copied before any unknown name is added.
+        """
+        name_field, fields = SCHEMAS[kind]
+        shared = categories is not None
+        categories = categories if shared else []
+        if lookup is None:
+            lookup = {name: i for i, name in enumerate(categories)}
+
+        n = len(records)
+        codes = np.empty(n, dtype=np.int32)
+        columns = {f: np.empty(n, dtype=np.float64) for f in fields}
+        dates = []
+        for i, record in enumerate(records):
+            dates.append(record.get("date") or "")
+            name = str(record.get(name_field) or "")
+            code = lookup.get(name)
+            if code is None:
+                if shared:
+                    categories, lookup, shared = list(categories), dict(lookup), False
+                code = len(categories)
+                categories.append(sys.intern(name))
+                lookup[name] = code
+            codes[i] = code
+            for f in fields:
+                columns[f][i] = record.get(f) or 0
+
+        days = parse_days(dates)
+        keep = days != MISSING_DAY
+        if not keep.all():
+            return cls(kind, days[keep], codes[keep], categories, {f: col[keep] for f, col in columns.items()})
+        return cls(kind, days, codes, categories, columns)
+
+    @classmethod
+    def from_frame(cls, kind, df, columns, categories=None):
+        """
+        Build a batch from a log DataFrame whose name column is categorical
+        (see catalog_ids.read_log). `columns` maps schema fields
+        ("date", name field, value fields) to the frame's column names.
+        `categories` may pass in the list the categorical dtype was built from.
+        Rows without a valid date are dropped and blank names become "".
+        """
+        name_field, fields = SCHEMAS[kind]
+        if df.empty:
+            return cls.empty(kind)
+        names = df[columns[name_field]]
+        days = parse_days(df[columns["date"]].to_numpy())
+        codes = names.cat.codes.to_numpy().astype(np.int32)
+        categories = categories if categories is not None else list(names.cat.categories)
+        values = {f: df[columns[f]].to_numpy(dtype=np.float64, na_value=0.0) for f in fields}
+
+        blank = codes < 0
+        if blank.any():
+            if "" not in categories:
+                categories = list(categories) + [""]
+            codes[blank] = categories.index("")
+        keep = days != MISSING_DAY
+        if not keep.all():
+            days, codes = days[keep], codes[keep]
+            values = {f: col[keep] for f, col in values.items()}
+        return cls(kind, days, codes, categories, values)
+
+    @classmethod
+    def concat(cls, kind, batches):
+        """Concatenate batches, re-coding names when their name lists differ."""
+        batches = [b for b in batches if len(b)] or batches[:1]
+        if not batches:
+            return cls.empty(kind)
+        if len(batches) == 1:
+            return batches[0]
+
+        categories = max((b.categories for b in batches), key=len)
+        lookup = None
+        codes = []
+        for b in batches:
+            if b.categories is categories or b.categories == categories[:len(b.categories)]:
+                codes.append(b.codes)
+                continue
+            if lookup is None:
+                categories = list(categories)
+                lookup = {name: i for i, name in enumerate(categories)}
+            remap = np.empty(len(b.categories), dtype=np.int32)
+            for i, name in enumerate(b.categories):
+                if name not in lookup:
+                    lookup[name] = len(categories)
+                    categories.append(name)
+                remap[i] = lookup[name]
+            codes.append(remap[b.codes])
+
+        _, fields = SCHEMAS[kind]
+        return cls(kind,
+                   np.concatenate([b.days for b in batches]),
+                   np.concatenate(codes),
+                   categories,
+                   {f: np.concatenate([b.columns[f] for b in batches]) for f in fields})
+
+    @classmethod
+    def merge(cls, kind, batches):
+        """
+        Merge date-sorted batches into one date-sorted batch without sorting:
+        each batch is placed by binary search into the ones before it.
+        Within a day, rows keep the order of the batches they came from.
+        """
+        batches = [b for b in batches if len(b)]
+        if len(batches) <= 1:
+            return batches[0] if batches else cls.empty(kind)
+        merged = cls.concat(kind, batches)
+
+        days, order = batches[0].days, np.arange(len(batches[0]))
+        offset = len(days)
+        for b in batches[1:]:
+            # Final positions of the rows merged so far and of the new batch
+            old = np.searchsorted(b.days, days, side="left") + np.arange(len(days))
+            new = np.searchsorted(days, b.days, side="right") + np.arange(len(b))
+            merged_days = np.empty(len(days) + len(b), dtype=days.dtype)
+            merged_days[old], merged_days[new] = days, b.days
+            merged_order = np.empty(len(merged_days), dtype=np.int64)
+            merged_order[old], merged_order[new] = order, offset + np.arange(len(b))
+            days, order, offset = merged_days, merged_order, offset + len(b)
+        return merged.take(order)
+
+    def __len__(self):
+        return len(self.days)
+
+    def take(self, indices):
+        """Return a new batch with the given rows, sharing the name list."""
+        return RecordBatch(self.kind, self.days[indices], self.codes[indices], self.categories,
+                           {f: col[indices] for f, col in self.columns.items()})
+
+    def sorted(self, ascending=True):
+        """Return the batch ordered by date (stable within a day)."""
+        if len(self) == 0 or (ascending and np.all(self.days[1:] >= self.days[:-1])):
+            return self
+        order = np.argsort(self.days, kind="stable")
+        if not ascending:
+            order = order[::-1]
+        return self.take(order)
+
+    def between(self, start_day=None, end_day=None):
+        """Rows with start_day <= day <= end_day of a date-sorted batch (array views, no copy)."""
+        lo = 0 if start_day is None else int(np.searchsorted(self.days, start_day, side="left"))
+        hi = len(self) if end_day is None else int(np.searchsorted(self.days, end_day, side="right"))
+        return self.take(slice(lo, max(lo, hi)))
+
+    def page(self, number, size, newest_first=True):
+        """Rows of page `number` (0-based) of a date-sorted batch."""
+        if newest_first:
+            hi = max(len(self) - number * size, 0)
+            return self.take(slice(max(hi - size, 0), hi)).take(slice(None, None, -1))
+        return self.take(slice(number * size, (number + 1) * size))
+
+    def names(self, indices=None):
+        """Decode the name codes (optionally only for some rows) to strings."""
+        codes = self.codes if indices is None else self.codes[indices]
+        return np.asarray(self.categories, dtype=object)[codes]
+
+    def total(self, field):
+        """Sum of a numeric field over all rows."""
+        return float(self.columns[field].sum())
+
+    def sum_by_name(self, field):
+        """Sum a numeric field per name without hashing any strings."""
+        sums = np.bincount(self.codes, weights=self.columns[field], minlength=len(self.categories))
+        present = np.bincount(self.codes, minlength=len(self.categories)) > 0
+        return pd.Series(sums[present], index=np.asarray(self.categories, dtype=object)[present])
+
+    def sum_by_day(self, field, start_day, end_day):
+        """Daily sums of a field for day numbers start_day..end_day inclusive."""
+        mask = (self.days >= start_day) & (self.days <= end_day)
+        return np.bincount(self.days[mask] - start_day, weights=self.columns[field][mask],
+                           minlength=end_day - start_day + 1)
+
+    def to_frame(self):
+        """
+        Convert to a pandas DataFrame.
+        Numeric columns are passed through without copying; names become a categorical column.
+        """
+        data = {"date": self.days.astype("datetime64[D]").astype("datetime64[s]")}
+        data[self.name_field] = pd.Categorical.from_codes(self.codes, categories=self.categories)
+        data.update(self.columns)
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,117 @@
+# ------------------------------------------------------------
+# Description: Headless weekly report generation for every user,
+#              run in a process pool (python reports.py --workers 8).
+# ------------------------------------------------------------
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import charts
+import datasource
+import helpers
+import storage
+from records import to_day
+
+REPORT_DIR = "reports"
+STATE_FILE = os.path.join(REPORT_DIR, "report_state.json")
+
+
+def report_version(username, end):
+    """Changes when the user's data, ledger goals or the report week change."""
+    ledger = os.path.join(helpers.DATA_DIR, f"{username}_tracker.csv")
+    return [end.isoformat(), repr(datasource.data_version(username)), repr(datasource.file_stamp(ledger))]
+
+
+def weekly_summary(username, end, days=7, session=None):
+    """Daily in/out/goal calories for the `days` days ending on `end`."""
+    session = session or datasource.ReadSession()
+    end_day = to_day(end)
+    start_day = end_day - days + 1
+
+    goals = np.full(days, float(helpers.DEFAULT_GOAL))
+    ledger = os.path.join(helpers.DATA_DIR, f"{username}_tracker.csv")
+    if os.path.isfile(ledger):
+        df = pd.read_csv(ledger, usecols=["date", "goal"]).dropna()
+        offsets = df["date"].to_numpy(dtype="U10").astype("datetime64[D]").astype(np.int64) - start_day
+        keep = (offsets >= 0) & (offsets < days)
+        goals[offsets[keep]] = df["goal"].to_numpy(dtype=float)[keep]
+
+    return pd.DataFrame({
+        "date": np.arange(start_day, end_day + 1).astype("datetime64[D]").astype("datetime64[s]"),
+        "in_cal": session.nutrition(username, start_day, end_day).sum_by_day("calories", start_day, end_day),
+        "out_cal": session.exercise(username, start_day, end_day).sum_by_day("calories_burned", start_day, end_day),
+        "goal": goals,
+    })
+
+
+def _write_report(args):
+    """Worker: write <user>_weekly.csv and <user>_weekly.<fmt>; return (user, error or None)."""
+    username, end, out_dir, fmt = args
+    try:
+        df = weekly_summary(username, end)
+        prefix = os.path.join(out_dir, f"{username}_weekly")
+        df.to_csv(prefix + ".csv", index=False, date_format="%Y-%m-%d")
+        with open(f"{prefix}.{fmt}", "wb") as f:
+            f.write(charts.figure_bytes(charts.build_weekly_figure(df), fmt))
+    except Exception as e:
+        return username, str(e)
+    return username, None
+
+
+def generate_reports(users=None, end=None, workers=None, out_dir=REPORT_DIR, fmt="png", force=False):
+    """
+    Build weekly reports for all (or the given) users in parallel.
+    Users whose data has not changed since the last run are skipped.
+    Return (written, skipped, failed) where failed maps username -> error.
+    """
+    end = end or date.today()
+    users = users or datasource.discover_users()
+    os.makedirs(out_dir, exist_ok=True)
+
+    state_file = os.path.join(out_dir, os.path.basename(STATE_FILE))
+    state = storage.load_json(state_file, {})
+    versions = {u: report_version(u, end) for u in users}
+    todo = [u for u in users if force or state.get(u) != versions[u]]
+    skipped = [u for u in users if u not in todo]
+
+    written, failed = [], {}
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [(u, end, out_dir, fmt) for u in todo]
+            for username, error in pool.map(_write_report, jobs, chunksize=max(1, len(jobs) // 64)):
+                if error:
+                    failed[username] = error
+                    continue
+                state[username] = versions[username]
+                written.append(username)
+        storage.save_json(state_file, state)
+    return written, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate weekly calorie reports for every user.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--out", default=REPORT_DIR, help="output folder")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day of the week (YYYY-MM-DD)")
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--user", action="append", help="only these users (repeatable)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if data is unchanged")
+    args = parser.parse_args()
+
+    start = time.time()
+    written, skipped, failed = generate_reports(args.user, args.end, args.workers, args.out,
+                                                args.format, args.force)
+    for username, error in failed.items():
+        print(f"Failed: {username}: {error}")
+    print(f"Wrote {len(written)} reports, skipped {len(skipped)} unchanged users "
+          f"in {time.time() - start:.1f}s -> {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# ------------------------------------------------------------
+# Description: Read-only local HTTP service exposing per-user totals,
+#              daily series and recent entries as JSON, with ETag /
+#              Last-Modified revalidation and an in-memory response cache.
+# ------------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import re
+import traceback
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import archive
+import datasource
+import timeline
+from cache import LRUCache
+from records import from_day, to_day
+
+DEFAULT_PORT = 8600
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+DAILY_DEFAULT_DAYS = 30
+DAILY_MAX_DAYS = 3660
+RECENT_DEFAULT = 20
+RECENT_MAX = 200
+
+_ROUTE = re.compile(r"^/users/([^/]+)/(totals|daily|recent)/?$")
+
+# (route, username, params, data version) -> (body, etag, last_modified)
+_responses = LRUCache(RESPONSE_CACHE_BYTES, sizeof=lambda r: len(r[0]))
+
+
+class RequestError(Exception):
+    """A request the service refuses; carries the HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------- Queries ----------------
+# The same readers the dashboard and history pages use
+
+def totals(username):
+    """Entry counts and calorie totals over the user's whole history (live stores + archive index)."""
+    nutrition = datasource.load_recent("nutrition", username)
+    exercise = datasource.load_recent("exercise", username)
+    archived_nutrition = archive.summary("nutrition", username)
+    archived_exercise = archive.summary("exercise", username)
+    calories_in = nutrition.total("calories") + archived_nutrition["totals"]["calories"]
+    calories_out = exercise.total("calories_burned") + archived_exercise["totals"]["calories_burned"]
+    return {
+        "nutrition": {"entries": len(nutrition) + archived_nutrition["rows"], "calories": calories_in},
+        "exercise": {"entries": len(exercise) + archived_exercise["rows"], "calories_burned": calories_out},
+        "net_calories": calories_in - calories_out,
+    }
+
+
+def daily(username, start_day, end_day):
+    """Calories in and out per day from start_day to end_day (day numbers, inclusive)."""
+    session = datasource.current()
+    calories_in = session.nutrition(username, start_day, end_day).sum_by_day("calories", start_day, end_day)
+    calories_out = session.exercise(username, start_day, end_day).sum_by_day("calories_burned", start_day, end_day)
+    return {
+        "start": from_day(start_day).isoformat(),
+        "end": from_day(end_day).isoformat(),
+        "calories_in": calories_in.tolist(),
+        "calories_out": calories_out.tolist(),
+    }
+
+
+def recent(username, n, before=None):
+    """
+    The `n` newest nutrition and exercise entries older than the `before`
+    cursor ("day:source:row", as returned in "next"), newest first.
+    """
+    batches = [datasource.load_nutrition(username), datasource.load_exercise(username)]
+    fields = [("nutrition", "calories"), ("exercise", "calories_burned")]
+    items, cursor = timeline.recent(batches, n=n, before=before)
+    entries = []
+    for day, source, row in items:
+        batch = batches[source]
+        kind, field = fields[source]
+        entries.append({"date": from_day(day).isoformat(), "type": kind,
+                        "name": batch.categories[batch.codes[row]],
+                        "calories": float(batch.columns[field][row])})
+    return {"entries": entries, "next": None if cursor is None else ":".join(map(str, cursor))}
+
+
+# ---------------- Request Handling ----------------
+
+def _param(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _parse_request(path, query):
+    """(route, username, resolved params) for a URL, or RequestError."""
+    match = _ROUTE.match(path)
+    if not match:
+        raise RequestError(404, "Not found")
+    username, route = unquote(match.group(1)), match.group(2)
+    if not username or "/" in username or "\\" in username or username.startswith("."):
+        raise RequestError(400, "Invalid username")
+
+    params = parse_qs(query)
+    try:
+        if route == "daily":
+            end = _param(params, "end")
+            end_day = to_day(datetime.strptime(end, "%Y-%m-%d")) if end else to_day(datetime.now())
+            start = _param(params, "start")
+            start_day = to_day(datetime.strptime(start, "%Y-%m-%d")) if start \
+                else end_day - DAILY_DEFAULT_DAYS + 1
+            if not 0 <= end_day - start_day < DAILY_MAX_DAYS:
+                raise RequestError(400, f"Range must cover 1 to {DAILY_MAX_DAYS} days")
+            return route, username, (start_day, end_day)
+        if route == "recent":
+            n = int(_param(params, "n", RECENT_DEFAULT))
+            if not 1 <= n <= RECENT_MAX:
+                raise RequestError(400, f"n must be between 1 and {RECENT_MAX}")
+            before = _param(params, "before")
+            cursor = tuple(int(part) for part in before.split(":")) if before else None
+            if cursor is not None and len(cursor) != 3:
+                raise ValueError(before)
+            return route, username, (n, cursor)
+    except ValueError:
+        raise RequestError(400, "Invalid query parameters")
+    return route, username, ()
+
+
+def _last_modified(version):
+    """Newest modification time (seconds) among the stamps of a data version, or None."""
+    mtimes = [stamp[0] for stamp in version if stamp]
+    return max(mtimes) / 1e9 if mtimes else None
+
+
+def _not_modified(headers, etag, last_modified):
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    since = headers.get("If-Modified-Since")
+    if since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _error(status, message):
+    return status, {"Content-Type": "application/json"}, json.dumps({"error": message}).encode()
+
+
+def respond(target, headers=None):
+    """
+    Answer a GET for `target` (path and query string).
+    Returns (status, headers, body bytes); failures are JSON errors, never exceptions.
+    """
+    url = urlsplit(target)
+    try:
+        route, username, params = _parse_request(url.path, url.query)
+        return _answer(route, username, params, headers or {})
+    except RequestError as e:
+        return _error(e.status, str(e))
+    except Exception:
+        traceback.print_exc()
+        return _error(500, "Internal server error")
+
+
+def _answer(route, username, params, headers):
+    """Status, headers and body for a parsed request (revalidated or served from the cache)."""
+    # The version is a handful of stat calls, so validators are checked
+    # before any data is read
+    version = datasource.data_version(username)
+    key = (route, username, params, version)
+    etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+    last_modified = _last_modified(version)
+
+    out = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        out["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    if _not_modified(headers, etag, last_modified):
+        return 304, out, b""
+
+    cached = _responses.get(key)
+    if cached is None:
+        # Checked only when data has to be read; known users' answers are cached
+        if username not in datasource.discover_users():
+            raise RequestError(404, "Unknown user")
+        datasource.begin_request()
+        if route == "totals":
+            data = totals(username)
+        elif route == "daily":
+            data = daily(username, *params)
+        else:
+            data = recent(username, *params)
+        cached = (json.dumps({"user": username, **data}).encode(), etag, last_modified)
+        # Responses for older versions of the same request can never be served again
+        _responses.discard(lambda k: k[:3] == key[:3])
+        _responses.put(key, cached)
+    return 200, {**out, "Content-Type": "application/json"}, cached[0]
+
+
+def cache_stats():
+    """Entries, bytes and hit/miss/eviction counters of the response cache."""
+    return _responses.stats()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FitnessTracker"
+
+    def _send(self, include_body):
+        status, headers, body = respond(self.path, self.headers)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(True)
+
+    def do_HEAD(self):
+        self._send(False)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, quiet=False):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve read-only per-user totals, daily series and recent entries.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--quiet", action="store_true", help="do not log every request")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.quiet)
+    print(f"Serving on http://{args.host}:{args.port}/users/<name>/(totals|daily|recent)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# ------------------------------------------------------------
+# Description: Incremental rolling statistics per user (moving averages,
+#              EWMA, workout streaks, week-over-week deltas), kept in
+#              data/{user}_stats.json and fed by the daily ledger.
+# ------------------------------------------------------------
+
+import json
+import os
+from datetime import datetime
+
+import datasource
+import helpers
+import ledger
+import storage
+from records import to_day
+
+WINDOW = 30                 # longest rolling window, in days
+EWMA_SPAN = 7
+EWMA_ALPHA = 2 / (EWMA_SPAN + 1)
+SERIES = ("net", "out")     # net calories (in - out) and calories burned
+
+
+def get_stats_path(username):
+    return os.path.join(helpers.DATA_DIR, f"{username}_stats.json")
+
+
+class RollingStats:
+    """
+    Day-by-day accumulator. Each series keeps a ring buffer of the last
+    WINDOW days plus running sums for the last 7 days, the 7 days before
+    those and the last 30 days, so adding a day (or correcting the latest
+    one) is O(1). Days without records count as zero.
+    """
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.first_day = state.get("first_day")
+        self.last_day = state.get("last_day")
+        self.series = state.get("series") or {
+            name: {"ring": [0.0] * WINDOW, "sum7": 0.0, "prev7": 0.0, "sum30": 0.0} for name in SERIES}
+        # "_prev" values are as of the day before last_day, so last_day can be replaced
+        for key in ("ewma", "ewma_prev"):
+            setattr(self, key, state.get(key))
+        for key in ("streak", "streak_prev", "longest", "longest_prev"):
+            setattr(self, key, state.get(key, 0))
+
+    def state(self):
+        return {"first_day": self.first_day, "last_day": self.last_day, "series": self.series,
+                "ewma": self.ewma, "ewma_prev": self.ewma_prev, "streak": self.streak,
+                "streak_prev": self.streak_prev, "longest": self.longest, "longest_prev": self.longest_prev}
+
+    def push(self, day, in_cal, out_cal):
+        """Add the totals of `day`; it must not be older than the last day pushed."""
+        values = {"net": in_cal - out_cal, "out": out_cal}
+        if self.last_day is None:
+            self.first_day = self.last_day = day - 1
+        if day < self.last_day:
+            raise ValueError("days must be pushed in order")
+        if day == self.last_day:
+            self._replace(values)
+            return
+
+        gap = day - self.last_day - 1
+        if gap >= WINDOW:
+            # Nothing in the windows survives a gap this long; clear them in one step
+            for s in self.series.values():
+                s.update(ring=[0.0] * WINDOW, sum7=0.0, prev7=0.0, sum30=0.0)
+            if self.ewma is not None:
+                self.ewma *= (1 - EWMA_ALPHA) ** gap
+            self.streak = 0
+            self.last_day = day - 1
+            gap = 0
+        for _ in range(gap):
+            self._advance({name: 0.0 for name in SERIES})
+        self._advance(values)
+
+    def _advance(self, values):
+        self.last_day += 1
+        day = self.last_day
+        for name, s in self.series.items():
+            ring, value = s["ring"], values[name]
+            week_ago, two_weeks_ago = ring[(day - 7) % WINDOW], ring[(day - 14) % WINDOW]
+            s["sum7"] += value - week_ago
+            s["prev7"] += week_ago - two_weeks_ago
+            s["sum30"] += value - ring[day % WINDOW]
+            ring[day % WINDOW] = value
+
+        self.ewma_prev, self.streak_prev, self.longest_prev = self.ewma, self.streak, self.longest
+        self._set_latest(values)
+
+    def _replace(self, values):
+        day = self.last_day
+        for name, s in self.series.items():
+            delta = values[name] - s["ring"][day % WINDOW]
+            s["sum7"] += delta
+            s["sum30"] += delta
+            s["ring"][day % WINDOW] = values[name]
+        self._set_latest(values)
+
+    def _set_latest(self, values):
+        net = values["net"]
+        self.ewma = net if self.ewma_prev is None else self.ewma_prev + EWMA_ALPHA * (net - self.ewma_prev)
+        self.streak = self.streak_prev + 1 if values["out"] > 0 else 0
+        self.longest = max(self.longest_prev, self.streak)
+
+    def snapshot(self, today):
+        """Current values as of `today` (later empty days are filled in without saving)."""
+        current = RollingStats(_copy_state(self.state()))
+        if current.last_day is not None and today > current.last_day:
+            current.push(today, 0.0, 0.0)
+        days = (current.last_day - current.first_day) if current.last_day is not None else 0
+        net, out = current.series["net"], current.series["out"]
+        return {
+            "net_avg_7": net["sum7"] / max(min(days, 7), 1),
+            "net_avg_30": net["sum30"] / max(min(days, 30), 1),
+            "net_ewma": current.ewma or 0.0,
+            "net_week": net["sum7"],
+            "net_week_delta": net["sum7"] - net["prev7"],
+            "burned_week": out["sum7"],
+            "burned_week_delta": out["sum7"] - out["prev7"],
+            "streak": current.streak,
+            "longest_streak": current.longest,
+        }
+
+
+def _copy_state(state):
+    return {**state, "series": {name: {**s, "ring": list(s["ring"])} for name, s in state["series"].items()}}
+
+
+# ---------------- Persistence ----------------
+
+def _ledger_stamp(username):
+    return list(datasource.file_stamp(helpers.get_user_data_path(username)) or [])
+
+
+def _from_rows(rows):
+    """Engine fed with every row of a ledger ({day: [in_cal, out_cal, goal]})."""
+    engine = RollingStats()
+    for day in sorted(rows, key=int):
+        in_cal, out_cal, _ = rows[day]
+        engine.push(int(day), in_cal, out_cal)
+    return engine
+
+
+def _save(username, engine):
+    state = {"ledger_stamp": _ledger_stamp(username), **engine.state()}
+    storage.atomic_write(get_stats_path(username), lambda f: json.dump(state, f, indent=2))
+
+
+def rebuild(username):
+    """Recompute the user's statistics from the whole ledger and save them."""
+    engine = _from_rows(ledger.read_ledger(helpers.get_user_data_path(username)))
+    _save(username, engine)
+    return engine
+
+
+def record_days(username, days, previous_stamp):
+    """
+    Feed ledger rows that just changed ({day: (in_cal, out_cal)}).
+
+    Called by ledger.update_ledger with the ledger's stamp from before its
+    write: if the saved state was built from that version and no change is
+    older than the last day seen, the days are pushed in O(1) each;
+    otherwise (back-dated entries, a ledger edited by hand) it rebuilds.
+    """
+    state = storage.load_json(get_stats_path(username), {})
+    if state.get("ledger_stamp") != list(previous_stamp or []) or state.get("last_day") is None \
+            or min(days, default=state["last_day"]) < state["last_day"]:
+        return rebuild(username)
+
+    engine = RollingStats(state)
+    for day in sorted(days):
+        engine.push(day, *days[day])
+    _save(username, engine)
+    return engine
+
+
+def update(username, session=None):
+    """Bring the user's ledger and statistics up to date after a write."""
+    return ledger.update_ledger(username, session=session, on_change=record_days)
+
+
+def current(username, today=None, session=None):
+    """
+    The user's statistics as of today. Nothing is written: entries the
+    ledger has not taken in yet are pushed onto a copy of the saved state,
+    or the figures are recomputed in memory when that is not possible.
+    """
+    session = session or datasource.current()
+    changes = ledger.pending_changes(username, session)
+    state = storage.load_json(get_stats_path(username), {})
+    if state.get("ledger_stamp") == _ledger_stamp(username) and state.get("last_day") is not None \
+            and min(map(int, changes), default=state["last_day"]) >= state["last_day"]:
+        engine = RollingStats(state)
+        for day in sorted(changes, key=int):
+            engine.push(int(day), *changes[day])
+    else:
+        engine = _from_rows(ledger.current_rows(username, session))
+    return engine.snapshot(to_day(today or datetime.now()))
@@ -1,6 +1,68 @@
 
 import json
 import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Called with the path of every file written through this module
+_write_hooks = []
+
+# New files get the permissions open() would give them (mkstemp uses 0600)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_stamp(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def on_write(hook):
+    """Register `hook(path)` to run after a file is written (readers use it to drop cached copies)."""
+    _write_hooks.append(hook)
+
+
+def notify_write(filename):
+    """Tell the registered hooks that `filename` changed (for writes made outside this module)."""
+    for hook in _write_hooks:
+        hook(filename)
+
+
+@contextmanager
+def locked(filename):
+    """
+    Hold an exclusive lock on `filename` for the duration of the block, so a
+    read-modify-write cannot interleave with another one in any thread or
+    process. The lock lives in a ".<name>.lock" file next to it; do not nest
+    two blocks on the same path.
+    """
+    folder, name = os.path.split(os.path.abspath(filename))
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, f".{name}.lock"), "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
 
 
 def load_json(filename, default=None):
@@ -15,7 +77,31 @@ def load_json(filename, default=None):
         return default if default is not None else {}
 
 
+def atomic_write(filename, write, mode="w", **open_kwargs):
+    """
+    Write a file through a temporary file in the same folder, then rename it
+    into place, so readers never see a half-written file.
+    `write(f)` receives the open temporary file.
+    """
+    folder = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            write(f)
+        if os.path.exists(filename):
+            shutil.copymode(filename, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    notify_write(filename)
+
+
 def save_json(filename, data):
   
     with open(filename, 'w') as f:
         json.dump(data, f, indent=2)
+    notify_write(filename)
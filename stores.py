@@ -0,0 +1,102 @@
+# ------------------------------------------------------------
+# Description: Where every nutrition/exercise store lives, how its
+#              columns map to the RecordBatch schema, and the low-level
+#              writes shared by the pages, the read layer and batch jobs.
+# ------------------------------------------------------------
+
+import csv
+import io
+import json
+import os
+from bisect import bisect_right
+
+import helpers
+import storage
+
+# Tracker page entries of every user, {username: [record, ...]}
+NUTRI_FILE = "nutrition.json"
+EXER_FILE = "exercise.json"
+
+# Column mapping from each CSV log to the RecordBatch schema
+NUTRITION_CSV_COLUMNS = {"date": "Date", "food": "Food", "weight_g": "Weight_g", "calories": "Calories"}
+EXERCISE_CSV_COLUMNS = {"date": "date", "exercise": "exercise_type",
+                        "duration_min": "duration_minutes", "calories_burned": "calories_burned"}
+
+
+def nutrition_sources(username):
+    """Paths of every store that can hold the user's nutrition records."""
+    return [NUTRI_FILE, os.path.join(helpers.DATA_DIR, f"{username}_nutrition.csv")]
+
+
+def exercise_sources(username):
+    """
+    Paths of every store that can hold the user's exercise records. The
+    legacy data/exercise_log.csv has no user column, so it is read only once
+    exercise.migrate_legacy_log has moved it into a user's log.
+    """
+    return [EXER_FILE, os.path.join(helpers.DATA_DIR, f"{username}_exercise.csv")]
+
+
+def sources(kind, username):
+    return nutrition_sources(username) if kind == "nutrition" else exercise_sources(username)
+
+
+def csv_columns(kind):
+    return NUTRITION_CSV_COLUMNS if kind == "nutrition" else EXERCISE_CSV_COLUMNS
+
+
+# ---------------- Ordered Writes ----------------
+# Every store is kept sorted by date, so readers can bisect instead of sorting
+
+def insert_record(path, username, record):
+    """Add a record to a tracker JSON store, keeping the user's list ordered by date."""
+    with storage.locked(path):
+        data = storage.load_json(path, {})
+        records = data.setdefault(username, [])
+        records.insert(bisect_right(records, record["date"], key=lambda r: r["date"]), record)
+        storage.atomic_write(path, lambda f: json.dump(data, f, indent=2))
+
+
+def _last_date(path):
+    """First field of the last line of a CSV file (the header's for a file without rows)."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - 4096, 0))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    if not lines:
+        return ""
+    return next(csv.reader([lines[-1].decode("utf-8", "replace")]), [""])[0][:10]
+
+
+def _merge_rows(path, df):
+    """Rewrite a CSV log with the rows of `df` merged in by date."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    # Format the new rows exactly as an append would
+    rows += list(csv.reader(io.StringIO(df.to_csv(header=False, index=False))))
+    header, rows = rows[0], [r for r in rows[1:] if r]
+    rows.sort(key=lambda r: r[0][:10])
+
+    def write(out):
+        writer = csv.writer(out)
+        writer.writerow(header)
+        writer.writerows(rows)
+    storage.atomic_write(path, write, newline="", encoding="utf-8")
+
+
+def append_rows(path, df):
+    """
+    Add the rows of `df` to a CSV log whose first column is the date, keeping
+    the file ordered by date. Rows dated on or after the file's last row are
+    appended; earlier ones are merged in and the file is replaced atomically
+    (a file written before logs were kept in order is sorted at that point).
+    """
+    df = df.sort_values(df.columns[0], kind="stable")
+    with storage.locked(path):
+        if not os.path.exists(path):
+            storage.atomic_write(path, lambda f: df.to_csv(f, index=False), newline="", encoding="utf-8")
+        elif str(df.iloc[0, 0])[:10] >= _last_date(path):
+            df.to_csv(path, mode="a", header=False, index=False)
+            storage.notify_write(path)
+        else:
+            _merge_rows(path, df)
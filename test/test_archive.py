@@ -0,0 +1,105 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import archive
+import datasource
+import ledger
+import nutrition
+from records import to_day
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        with open("nutrition.json", "w") as f:
+            json.dump({"TestBot": [{"date": "2024-01-05", "food": "Rice", "weight_g": 100, "calories": 130},
+                                   {"date": "2025-06-01", "food": "Rice", "weight_g": 50, "calories": 65}]}, f)
+        nutrition.save_user_record("TestBot", "2024-01-01", "Apple", 200, 104.0)
+        nutrition.save_user_record("TestBot", "2024-02-10", "Apple", 100, 52.0)
+        nutrition.save_user_record("TestBot", "2025-06-02", "Bread", 50, 132.5)
+        self.today = date(2025, 6, 30)
+
+    def test_old_entries_move_to_monthly_buckets(self):
+        moved = archive.archive_old(horizon_days=90, today=self.today)
+        self.assertEqual(sum(moved.values()), 3)
+        self.assertEqual(sorted(archive.load_index()), ["csv_TestBot_nutrition_2024-01.csv.gz",
+                                                        "csv_TestBot_nutrition_2024-02.csv.gz",
+                                                        "json_nutrition_TestBot_2024-01.csv.gz"])
+        self.assertEqual(len(datasource.ReadSession().records(
+            "nutrition", "TestBot", archive.hot_start("nutrition", "TestBot"))), 2)
+
+        summary = archive.summary("nutrition", "TestBot")
+        self.assertEqual(summary["rows"], 3)
+        self.assertEqual(summary["totals"]["calories"], 286.0)
+        self.assertEqual(summary["by_name"], {"Apple": 156.0, "Rice": 130.0})
+
+    def test_only_overlapping_buckets_are_read(self):
+        archive.archive_old(horizon_days=90, today=self.today)
+        session = datasource.ReadSession()
+        self.assertEqual(len(session.nutrition("TestBot", to_day("2024-02-01"))), 3)
+        self.assertEqual(len(session.nutrition("TestBot")), 5)
+        self.assertEqual(session.nutrition("TestBot").total("calories"), 483.5)
+
+    def test_second_run_appends_and_ledger_is_unchanged(self):
+        ledger.update_ledger("TestBot")
+        archive.archive_old(horizon_days=400, today=self.today)
+        # Moving rows between stores does not change any daily total
+        self.assertEqual(ledger.update_ledger("TestBot"), 0)
+        nutrition.save_user_record("TestBot", "2024-01-20", "Apple", 100, 52.0)
+        archive.archive_old(horizon_days=400, today=self.today)
+
+        entry = archive.load_index()["csv_TestBot_nutrition_2024-01.csv.gz"]
+        self.assertEqual(entry["rows"], 2)
+        self.assertEqual(len(archive.read_bucket("csv_TestBot_nutrition_2024-01.csv.gz", entry)), 2)
+        self.assertEqual(ledger.update_ledger("TestBot"), 1)
+
+    def test_stores_and_tracker_users_never_share_a_bucket(self):
+        # The legacy shared log and a tracker user called "log" used to map to "exercise_log_..."
+        legacy = os.path.join("data", "exercise_log.csv")
+        with open(legacy, "w") as f:
+            f.write("date,exercise_type,duration_minutes,user_weight_kg,calories_burned\n"
+                    "2024-01-03,Running,30,70,300\n")
+        with open("exercise.json", "w") as f:
+            json.dump({"log": [{"date": "2024-01-04", "exercise": "Yoga", "duration_min": 60,
+                                "calories_burned": 200}]}, f)
+        archive.archive_old(horizon_days=90, today=self.today)
+        self.assertEqual(archive.summary("exercise", "log")["rows"], 1)
+        self.assertEqual(archive.summary("exercise", "log")["totals"]["calories_burned"], 200)
+        # The legacy log belongs to nobody until it is migrated, so it is not archived
+        self.assertNotIn(legacy, {entry["source"] for entry in archive.load_index().values()})
+        with open(legacy) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_entries_saved_while_archiving_are_kept(self):
+        def append():
+            for i in range(40):
+                nutrition.save_user_record("TestBot", "2024-03-01", "Apple", 100 + i, 52.0)
+        writer = threading.Thread(target=append)
+        writer.start()
+        while writer.is_alive():
+            archive.archive_old(horizon_days=90, today=self.today)
+        writer.join()
+        session = datasource.ReadSession()
+        self.assertEqual(len(session.nutrition("TestBot", to_day("2023-01-01"))), 45)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,42 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = LRUCache(max_bytes=10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        self.assertEqual(cache.get("a"), b"aaaa")  # "b" is now the oldest
+        cache.put("c", b"cccc")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), b"cccc")
+        self.assertEqual(cache.current_bytes, 8)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_oversized_values_are_not_stored(self):
+        cache = LRUCache(max_bytes=3)
+        cache.put("big", b"too large")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.current_bytes, 0)
+
+    def test_counters_and_discard(self):
+        cache = LRUCache(max_bytes=100)
+        cache.put(("u1", "weekly"), b"x")
+        cache.put(("u2", "weekly"), b"y")
+        cache.get(("u1", "weekly"))
+        cache.get("missing")
+        self.assertEqual(cache.discard(lambda key: key[0] == "u1"), 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
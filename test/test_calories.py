@@ -0,0 +1,42 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calories
+
+
+class TestEnergyModel(unittest.TestCase):
+
+    def test_cohort_matches_single_values(self):
+        age = np.array([30, 45, 60])
+        sex = np.array(["Male", "Female", "Female"])
+        weight = np.array([70.0, 60.0, 80.0])
+        height = np.array([170.0, 165.0, 160.0])
+        activity = ["Sedentary (little or no exercise)", "Very active (6-7 days/week)",
+                    "Sedentary (little or no exercise)"]
+
+        self.assertAlmostEqual(float(calories.bmr(30, "Male", 70.0, 170.0)),
+                               88.362 + 13.397 * 70 + 4.799 * 170 - 5.677 * 30)
+        cohort = calories.tdee(age, sex, weight, height, activity)
+        for i in range(3):
+            self.assertAlmostEqual(cohort[i], float(calories.tdee(age[i], sex[i], weight[i], height[i], activity[i])))
+        with self.assertRaises(ValueError):
+            calories.tdee(30, "Male", 70.0, 170.0, "Couch")
+
+    def test_projection_across_scenarios(self):
+        deficits = np.array([1000, 500, 0, -500])
+        path = calories.project_weight(np.array([[30], [50]]), "Female", 70.0, 165.0, 1.375, deficits, weeks=10)
+        self.assertEqual(path.shape, (11, 2, 4))
+        np.testing.assert_allclose(path[:, :, 2], 70.0)
+        # Bigger deficits lose more, and each week's loss is smaller than the last
+        self.assertTrue(np.all(np.diff(path[-1], axis=-1) > 0))
+        weekly = -np.diff(path[:, 0, 0])
+        self.assertTrue(np.all(weekly > 0) and np.all(np.diff(weekly) < 0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog_ids
+import storage
+
+
+class TestCatalogIds(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder (no catalogs) so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def test_ids_are_stable_across_reloads(self):
+        ids = catalog_ids.ensure_ids(["Apple", "Rice", "Apple"])
+        self.assertEqual(ids[0], ids[2])
+        self.assertEqual(catalog_ids.ensure_ids(["Kiwi"]), [ids[1] + 1])
+
+        # A fresh process only has the file to go on
+        catalog_ids._cache["stamp"] = None
+        self.assertEqual(catalog_ids.get_id("Rice"), ids[1])
+        self.assertEqual(catalog_ids.get_names(), ["Apple", "Rice", "Kiwi"])
+
+    def test_names_registered_elsewhere_are_kept(self):
+        catalog_ids.ensure_ids(["Apple"])
+        # Another process adds a name after this one cached the dictionary
+        data = storage.load_json(catalog_ids.ID_FILE)
+        data["names"].append("Bread")
+        storage.save_json(catalog_ids.ID_FILE, data)
+
+        catalog_ids.ensure_ids(["Rice"])
+        self.assertEqual(storage.load_json(catalog_ids.ID_FILE)["names"], ["Apple", "Bread", "Rice"])
+
+    def test_concurrent_registrations(self):
+        def register(i):
+            catalog_ids.ensure_ids([f"Food {i}"])
+        threads = [threading.Thread(target=register, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        names = storage.load_json(catalog_ids.ID_FILE)["names"]
+        self.assertEqual(sorted(names), sorted(f"Food {i}" for i in range(8)))
+
+    def test_read_log_uses_shared_codes(self):
+        catalog_ids.ensure_ids(["Rice", "Apple"])
+        with open("log.csv", "w") as f:
+            f.write("Date,Food,Calories\n2025-01-01,Apple,52\n2025-01-02,Kiwi,40\n")
+        df = catalog_ids.read_log("log.csv", "Food")
+        self.assertEqual(df["Food"].cat.codes.tolist(), [catalog_ids.get_id("Apple"), catalog_ids.get_id("Kiwi")])
+        self.assertIs(df["Food"].dtype, catalog_ids.name_dtype())
+        self.assertEqual(catalog_ids.get_names(), ["Rice", "Apple", "Kiwi"])
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        catalog_ids._cache["stamp"] = None
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import charts
+import exercise
+import nutrition
+from cache import LRUCache
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCharts(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder, with an empty chart cache, so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.old_cache = charts._charts
+        charts._charts = LRUCache(charts.CHART_CACHE_BYTES)
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        df = charts.ledger.to_frame({"20089": [100.0, 50.0, 2000.0], "20090": [120.0, 0.0, 2000.0]})
+        return charts.build_weekly_figure(df)
+
+    def test_hit_and_miss(self):
+        first = charts.cached_chart("TestBot", "weekly", 7, "v1", self.build)
+        again = charts.cached_chart("TestBot", "weekly", 7, "v1", self.build)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(first, again)
+        stats = charts.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+        # Other users, windows and formats are separate entries
+        charts.cached_chart("OtherBot", "weekly", 7, "v1", self.build)
+        charts.cached_chart("TestBot", "weekly", 30, "v1", self.build)
+        svg = charts.cached_chart("TestBot", "weekly", 7, "v1", self.build, fmt="svg")
+        self.assertEqual(self.builds, 4)
+        self.assertIn(b"<svg", svg)
+
+    def test_new_version_rebuilds(self):
+        charts.cached_chart("TestBot", "weekly", 7, "v1", self.build)
+        charts.cached_chart("TestBot", "weekly", 7, "v2", self.build)
+        self.assertEqual(self.builds, 2)
+
+    def test_no_data_is_cached(self):
+        def build():
+            self.builds += 1
+            return None
+        self.assertIsNone(charts.cached_chart("TestBot", "weekly", 7, "v1", build))
+        self.assertIsNone(charts.cached_chart("TestBot", "weekly", 7, "v1", build))
+        self.assertEqual(self.builds, 1)
+
+    def test_charts_follow_saved_entries(self):
+        today = date.today().isoformat()
+        self.assertIsNone(charts.weekly_chart("TestBot"))
+        self.assertIsNone(charts.exercise_chart("TestBot"))
+
+        nutrition.save_user_record("TestBot", today, "Apple", 200, 104.0)
+        weekly = charts.weekly_chart("TestBot")
+        self.assertTrue(weekly.startswith(b"\x89PNG"))
+        self.assertIs(charts.weekly_chart("TestBot"), weekly)
+        self.assertIsNone(charts.exercise_chart("TestBot"))
+
+        exercise.save_exercise_entry(today, "Yoga, Hatha", 60, 70, 301.0, username="TestBot")
+        self.assertIsNot(charts.weekly_chart("TestBot"), weekly)
+        self.assertTrue(charts.exercise_chart("TestBot").startswith(b"\x89PNG"))
+
+    def test_renders_without_gui_backend(self):
+        code = ("import sys, charts\n"
+                "df = charts.ledger.to_frame({'20089': [100.0, 50.0, 2000.0]})\n"
+                "assert charts.figure_bytes(charts.build_weekly_figure(df)).startswith(b'\\x89PNG')\n"
+                "assert 'matplotlib.pyplot' not in sys.modules\n")
+        env = {**os.environ, "MPLBACKEND": "TkAgg", "PYTHONPATH": REPO}
+        env.pop("DISPLAY", None)
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def tearDown(self):
+        charts._charts = self.old_cache
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import csv
+import json
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog_ids
+import datasource
+import nutrition
+import stores
+from records import RecordBatch
+
+
+class TestDataSource(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        with open("nutrition.json", "w") as f:
+            json.dump({"TestBot": [{"date": "2025-01-02", "food": "Apple", "weight_g": 100, "calories": 52}],
+                       "Other": [{"date": "2025-01-02", "food": "Rice", "weight_g": 100, "calories": 130}]}, f)
+        nutrition.save_user_record("TestBot", "2025-01-01", "Apple", 200, 104.0)
+        nutrition.save_user_record("TestBot", "2025-01-03", "Bread", 50, 132.5)
+
+    def test_all_sources_are_merged(self):
+        batch = datasource.ReadSession().nutrition("TestBot")
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.total("calories"), 288.5)
+        self.assertEqual(sorted(batch.names().tolist()), ["Apple", "Apple", "Bread"])
+
+    def test_session_reads_each_file_once(self):
+        session = datasource.ReadSession()
+        first = session.nutrition("TestBot")
+        path = os.path.join("data", "TestBot_nutrition.csv")
+        batch = session.source_batch("nutrition", "TestBot", path)
+        self.assertIs(session.source_batch("nutrition", "TestBot", path), batch)
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(batch.total("calories"),
+                         sum(float(r[stores.NUTRITION_CSV_COLUMNS["calories"]]) for r in rows))
+
+        # A write changes the file stamp, so the next read sees it
+        nutrition.save_user_record("TestBot", "2025-01-04", "Apple", 100, 52.0)
+        self.assertEqual(len(session.nutrition("TestBot")), len(first) + 1)
+
+    def test_sessions_share_cached_batches(self):
+        first = datasource.ReadSession().nutrition("TestBot")
+        hits = datasource.cache_stats()["hits"]
+        self.assertIs(datasource.ReadSession().nutrition("TestBot"), first)
+        self.assertGreater(datasource.cache_stats()["hits"], hits)
+
+        # Writing through the app drops the stale batches straight away
+        path = os.path.join("data", "TestBot_nutrition.csv")
+        nutrition.save_user_record("TestBot", "2025-01-04", "Apple", 100, 52.0)
+        self.assertFalse(datasource.invalidate(path))
+        self.assertEqual(len(datasource.ReadSession().nutrition("TestBot")), 4)
+
+    def test_logs_stay_in_date_order(self):
+        # A late entry for an earlier day is merged in, not appended
+        nutrition.save_user_record("TestBot", "2025-01-02", "Rice", 100, 130.0)
+        with open(os.path.join("data", "TestBot_nutrition.csv")) as f:
+            dates = [line.split(",")[0] for line in f.read().splitlines()[1:]]
+        self.assertEqual(dates, ["2025-01-01", "2025-01-02", "2025-01-03"])
+
+        batch = datasource.ReadSession().nutrition("TestBot")
+        self.assertEqual(batch.days.tolist(), sorted(batch.days.tolist()))
+        # JSON and CSV entries of the same day keep their store order
+        self.assertEqual(batch.between(*[batch.days[1]] * 2).names().tolist(), ["Apple", "Rice"])
+
+    def test_cache_counts_what_entries_keep_alive(self):
+        datasource._frames.clear()
+        datasource.ReadSession().nutrition("TestBot")
+        # Merged entries are plain batches; they do not pin their parts
+        self.assertTrue(all(isinstance(value, RecordBatch) for value, _ in datasource._frames._entries.values()))
+
+        records = [{"date": "2025-01-01", "food": "Unlisted dish", "weight_g": 1, "calories": 1}]
+        private = RecordBatch.from_records("nutrition", records)
+        shared = RecordBatch.from_records("nutrition", records[:0], *catalog_ids.shared_names())
+        arrays = private.days.nbytes + private.codes.nbytes + sum(c.nbytes for c in private.columns.values())
+        self.assertGreater(datasource._batch_bytes(private), arrays)
+        self.assertEqual(datasource._batch_bytes(shared), 0)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
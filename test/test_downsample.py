@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downsample import Pyramid
+
+
+class TestPyramid(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.calories_in = rng.normal(2000, 200, 3000)
+        self.calories_out = rng.normal(400, 80, 3000)
+        self.calories_in[1234] = 9000     # a feast
+        self.calories_out[2345] = -50     # a bad import
+        self.pyramid = Pyramid(100, {"In": self.calories_in, "Out": self.calories_out})
+
+    def test_long_ranges_are_capped_and_keep_peaks(self):
+        days, values = self.pyramid.query(100, 3099, max_points=400)
+        self.assertLessEqual(len(days), 400)
+        self.assertEqual(days[0], 100)
+        self.assertEqual(days[-1], 3099)
+        self.assertTrue(np.all(np.diff(days) > 0))
+        self.assertEqual(values["In"].max(), 9000)
+        self.assertEqual(values["Out"].min(), -50)
+
+    def test_partial_edge_buckets_keep_their_extremes(self):
+        a = np.arange(5000, dtype=float) % 1300
+        a[1003] = 9000       # in range, but its bucket's max outside the range is lower
+        a[998] = 10000       # same bucket, before the range
+        b = -a
+        pyramid = Pyramid(0, {"a": a, "b": b})
+        for lo, hi in [(1001, 2999), (999, 4997), (1001, 1003)]:
+            _, values = pyramid.query(lo, hi, max_points=400)
+            self.assertEqual(values["a"].max(), a[lo:hi + 1].max())
+            self.assertEqual(values["a"].min(), a[lo:hi + 1].min())
+            self.assertEqual(values["b"].min(), b[lo:hi + 1].min())
+
+        rng = np.random.default_rng(7)
+        c = rng.normal(size=3000)
+        pyramid = Pyramid(0, {"c": c})
+        for lo, hi in np.sort(rng.integers(0, 3000, size=(500, 2)), axis=1):
+            days, values = pyramid.query(lo, hi, max_points=100)
+            self.assertLessEqual(len(days), 110)
+            self.assertEqual(values["c"].max(), c[lo:hi + 1].max())
+            self.assertEqual(values["c"].min(), c[lo:hi + 1].min())
+
+    def test_short_ranges_are_exact(self):
+        days, values = self.pyramid.query(200, 259, max_points=400)
+        np.testing.assert_array_equal(days, np.arange(200, 260))
+        np.testing.assert_array_equal(values["In"], self.calories_in[100:160])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
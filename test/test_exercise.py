@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+import csv
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datasource
+import exercise
+
+
+class TestLegacyExerciseLog(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        os.makedirs("data")
+        with open(exercise.EXERCISE_LOG_PATH, "w") as f:
+            f.write("date,exercise_type,duration_minutes,user_weight_kg,calories_burned\n"
+                    '2025-01-05,"Yoga, Hatha",60,70,301.0\n'
+                    "2025-01-01,Running,30,70,300.0\n")
+
+    def test_migration_assigns_rows_to_one_user(self):
+        exercise.save_exercise_entry("2025-01-03", "Rowing", 20, 70, 150.0, "TestBot")
+        self.assertEqual(len(datasource.ReadSession().exercise("TestBot")), 1)
+
+        self.assertEqual(exercise.migrate_legacy_log("TestBot"), 2)
+        with open(exercise.get_log_path("TestBot"), newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["date"] for r in rows], ["2025-01-01", "2025-01-03", "2025-01-05"])
+        self.assertEqual(datasource.ReadSession().exercise("TestBot").total("calories_burned"), 751.0)
+
+        self.assertFalse(os.path.exists(exercise.EXERCISE_LOG_PATH))
+        self.assertTrue(os.path.exists(exercise.EXERCISE_LOG_PATH + ".migrated"))
+        self.assertEqual(exercise.migrate_legacy_log("OtherBot"), 0)
+        self.assertEqual(len(datasource.ReadSession().exercise("OtherBot")), 0)
+
+    def test_saving_needs_a_user(self):
+        with self.assertRaises(TypeError):
+            exercise.save_exercise_entry("2025-01-03", "Rowing", 20, 70, 150.0)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import gzip
+import io
+import json
+import shutil
+import tempfile
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import archive
+import export
+import nutrition
+import stores
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        nutrition.save_user_record("TestBot", "2025-01-01", "Apple", 200, 104.0)
+        nutrition.save_user_record("TestBot", "2025-03-02", "Rice", 100, 130.0)
+        stores.insert_record(stores.NUTRI_FILE, "TestBot",
+                             {"date": "2025-03-01", "food": "Toast", "weight_g": 50, "calories": 130.0})
+
+    def export(self, **kwargs):
+        buffer = io.BytesIO()
+        rows = export.write_export(buffer, "TestBot", "nutrition", **kwargs)
+        return rows, buffer.getvalue()
+
+    def test_csv(self):
+        rows, data = self.export()
+        self.assertEqual(rows, 3)
+        lines = data.decode().splitlines()
+        self.assertEqual(lines[0], "date,food,weight_g,calories,source")
+        self.assertEqual(lines[1], "2025-03-01,Toast,50,130.0,tracker")
+        self.assertEqual([line.split(",")[-1] for line in lines[2:]], ["log", "log"])
+
+    def test_jsonl_gzip(self):
+        rows, data = self.export(fmt="jsonl", compress=True)
+        records = [json.loads(line) for line in gzip.decompress(data).decode().splitlines()]
+        self.assertEqual(rows, 3)
+        self.assertEqual([r["food"] for r in records], ["Toast", "Apple", "Rice"])
+        self.assertEqual(records[1], {"date": "2025-01-01", "food": "Apple", "weight_g": 200,
+                                      "calories": 104.0, "source": "log"})
+
+    def test_date_filter_and_columns(self):
+        rows, data = self.export(start=date(2025, 3, 1), end="2025-03-01", columns=["food", "calories"])
+        self.assertEqual(rows, 1)
+        self.assertEqual(data.decode().splitlines(), ["food,calories", "Toast,130.0"])
+
+        rows, data = self.export(start="2026-01-01")
+        self.assertEqual((rows, data.decode()), (0, "date,food,weight_g,calories,source\n"))
+
+    def test_archived_rows_and_small_chunks(self):
+        archive.archive_old(horizon_days=30, today=date(2025, 3, 2))
+        rows, data = self.export(chunk_size=1)
+        lines = data.decode().splitlines()
+        self.assertEqual(rows, 3)
+        self.assertEqual(len(lines), 4)  # one header
+        self.assertEqual(lines[1], "2025-01-01,Apple,200.0,104.0,archive")
+
+    def test_to_file_and_bad_arguments(self):
+        self.assertEqual(export.write_export("out.csv", "TestBot", "nutrition"), 3)
+        self.assertTrue(os.path.getsize("out.csv") > 0)
+        with self.assertRaises(ValueError):
+            export.write_export(io.BytesIO(), "TestBot", "nutrition", fmt="xml")
+        with self.assertRaises(ValueError):
+            export.write_export(io.BytesIO(), "TestBot", "nutrition", columns=["date", "nope"])
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
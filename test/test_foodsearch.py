@@ -0,0 +1,35 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from foodsearch import FoodIndex
+
+
+class TestFoodIndex(unittest.TestCase):
+
+    def setUp(self):
+        names = ["Chicken Breast", "Chicken", "Rice, brown, cooked", "Rice, white, cooked",
+                 "Brown Bread", "Apple", "Apple Pie", "Pineapple"]
+        self.index = FoodIndex(names, [165, 239, 112, 130, 247, 52, 237, 50])
+
+    def test_prefix_matches_rank_shorter_names_first(self):
+        self.assertEqual(self.index.search("chick"), ["Chicken", "Chicken Breast"])
+        self.assertEqual(self.index.search("apple", k=2), ["Apple", "Apple Pie"])
+
+    def test_every_word_must_match_a_word_prefix(self):
+        self.assertEqual(self.index.search("brown rice")[0], "Rice, brown, cooked")
+        self.assertEqual(self.index.search("bro")[0], "Brown Bread")
+
+    def test_typos_fall_back_to_trigrams(self):
+        self.assertEqual(self.index.search("chiken brest")[0], "Chicken Breast")
+        self.assertEqual(self.index.search("qqqq"), [])
+
+    def test_estimate_uses_catalog_calories(self):
+        self.assertEqual(self.index.estimate("Apple", 200), 104.0)
+        self.assertIsNone(self.index.estimate("Unknown", 100))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+import unittest
+import os
+import sys
+import io
+import csv
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import exercise
+import importer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ACTIVITIES = {"Running, 5 mph (12 min/mile)": 0.82, "Running, 7.5 mph (8 min/mile)": 1.28,
+              "Cycling, moderate effort": 1.03, "Cycling, vigorous effort": 1.29}
+
+
+def csv_stream(blocks):
+    """Per-second CSV rows for (start offset s, seconds, metres per second) blocks."""
+    start = datetime(2025, 1, 1, 7, 0, 0)
+    lines = ["timestamp,distance"]
+    distance = 0.0
+    for offset, seconds, speed in blocks:
+        for s in range(offset, offset + seconds):
+            lines.append(f"{(start + timedelta(seconds=s)).isoformat()},{distance}")
+            distance += speed
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+class TestImporter(unittest.TestCase):
+
+    def test_pause_splits_sessions(self):
+        points = importer.iter_points(csv_stream([(0, 1200, 3.0), (3600, 600, 1.5)]), name="run.csv")
+        sessions = list(importer.iter_sessions(points))
+        self.assertEqual(len(sessions), 2)
+        self.assertAlmostEqual(sessions[0].duration.total_seconds(), 1199)
+        self.assertAlmostEqual(sessions[0].avg_mph(), 3.0 * importer.MPS_TO_MPH, places=1)
+
+    def test_short_sessions_are_dropped(self):
+        points = importer.iter_points(csv_stream([(0, 30, 3.0)]), name="blip.csv")
+        self.assertEqual(list(importer.iter_sessions(points)), [])
+
+    def test_activity_matching(self):
+        activities = {"Running, 5 mph (12 min/mile)", "Running, 7.5 mph (8 min/mile)",
+                      "Walking, 3 mph (20 min/mile)"}
+        session = importer.Session(datetime(2025, 1, 1), "Running")
+        session.end = session.start + timedelta(hours=1)
+        session.distance_m = 12000  # ~7.5 mph
+        self.assertEqual(importer.match_activity(session, activities), "Running, 7.5 mph (8 min/mile)")
+        session.sport = None
+        session.distance_m = 4800  # ~3 mph, no sport given
+        self.assertEqual(importer.match_activity(session, activities), "Walking, 3 mph (20 min/mile)")
+
+
+@unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset to switch time zones")
+class TestImportFiles(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder with a small catalog, in a US
+        time zone, so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        os.makedirs("exercise")
+        with open(os.path.join("exercise", "exercise_dataset.csv"), "w") as f:
+            f.write('"Activity, Exercise or Sport (1 hour)",Calories per kg\n')
+            f.writelines(f'"{name}",{rate}\n' for name, rate in ACTIVITIES.items())
+        self.old_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "America/New_York"
+        time.tzset()
+
+    def fixture(self, name):
+        return os.path.join(FIXTURES, name)
+
+    def test_gpx(self):
+        sessions = list(importer.iter_sessions(importer.iter_points(self.fixture("morning_run.gpx"))))
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(sessions[0].sport, "running")
+        self.assertEqual(sessions[0].duration, timedelta(minutes=20))
+        self.assertAlmostEqual(sessions[0].distance_m, 20 * 200, delta=20)  # 0.0018 deg of latitude a minute
+
+        entries, unmatched = importer.import_workouts(self.fixture("morning_run.gpx"), 70, username="TestBot")
+        self.assertEqual(unmatched, 0)
+        self.assertEqual(entries, [("2025-03-01", "Running, 7.5 mph (8 min/mile)", 20.0, 70, 29.87)])
+        with open(exercise.get_log_path("TestBot"), newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["exercise_type"] for r in rows], ["Running, 7.5 mph (8 min/mile)"])
+
+    def test_tcx_from_upload(self):
+        with open(self.fixture("evening_ride.tcx"), "rb") as f:
+            upload = io.BytesIO(f.read())
+        entries, unmatched = importer.import_workouts(upload, 80, name="evening_ride.tcx", dry_run=True)
+        self.assertEqual(unmatched, 0)
+        # 02:00 UTC on March 2nd is still March 1st in New York
+        self.assertEqual(entries, [("2025-03-01", "Cycling, vigorous effort", 15.0, 80, 25.8),
+                                   ("2025-03-01", "Cycling, moderate effort", 10.0, 80, 13.73)])
+        self.assertFalse(os.path.exists("data"))
+
+    def test_naive_times_are_local(self):
+        when = importer._parse_time("2025-03-01T22:30:00")
+        self.assertEqual(when.astimezone().replace(tzinfo=None), datetime(2025, 3, 1, 22, 30))
+        self.assertEqual(importer._parse_time("2025-03-02T02:00:00Z").astimezone().date().isoformat(),
+                         "2025-03-01")
+
+    def test_catalog_is_read_once(self):
+        with mock.patch.object(exercise, "load_exercise_dataset", wraps=exercise.load_exercise_dataset) as load:
+            entries, _ = importer.import_workouts(self.fixture("evening_ride.tcx"), 80, dry_run=True)
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(load.call_count, 1)
+
+    def tearDown(self):
+        if self.old_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self.old_tz
+        time.tzset()
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
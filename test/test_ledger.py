@@ -0,0 +1,126 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ledger
+import stats
+import nutrition
+import exercise
+from records import to_day
+
+
+class TestLedger(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.user = "TestBot"
+        self.path = os.path.join("data", f"{self.user}_tracker.csv")
+        nutrition.save_user_record(self.user, "2025-01-01", "Apple", 200, 104.0)
+        nutrition.save_user_record(self.user, "2025-01-02", "Rice", 100, 130.0)
+        exercise.save_exercise_entry("2025-01-02", "Yoga, Hatha", 60, 70.0, 301.0, self.user)
+
+    def read(self):
+        return pd.read_csv(self.path).set_index("date")
+
+    def test_first_run_fills_every_date(self):
+        self.assertEqual(ledger.update_ledger(self.user), 2)
+        df = self.read()
+        self.assertEqual(df.loc["2025-01-02", "in_cal"], 130.0)
+        self.assertEqual(df.loc["2025-01-02", "out_cal"], 301.0)
+
+    def test_only_changed_dates_are_touched(self):
+        ledger.update_ledger(self.user)
+        self.assertEqual(ledger.update_ledger(self.user), 0)
+
+        nutrition.save_user_record(self.user, "2025-01-01", "Apple", 100, 52.0)
+        self.assertEqual(ledger.update_ledger(self.user), 1)
+        self.assertEqual(self.read().loc["2025-01-01", "in_cal"], 156.0)
+
+    def test_goals_survive_updates_and_full_rebuild(self):
+        ledger.update_ledger(self.user)
+        df = self.read()
+        df.loc["2025-01-01", "goal"] = 1800
+        df.to_csv(self.path)
+
+        nutrition.save_user_record(self.user, "2025-01-03", "Apple", 100, 52.0)
+        ledger.update_ledger(self.user)
+        ledger.update_ledger(self.user, full=True)
+        df = self.read()
+        self.assertEqual(df.loc["2025-01-01", "goal"], 1800)
+        self.assertEqual(list(df.index), ["2025-01-01", "2025-01-02", "2025-01-03"])
+
+    def test_reads_do_not_write(self):
+        rows = ledger.current_rows(self.user)
+        self.assertEqual(rows[str(to_day("2025-01-02"))][:2], [130.0, 301.0])
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(ledger.get_state_path(self.user)))
+
+        ledger.update_ledger(self.user)
+        stamp = os.stat(self.path).st_mtime_ns
+        nutrition.save_user_record(self.user, "2025-01-03", "Apple", 100, 52.0)
+        self.assertEqual(ledger.current_rows(self.user)[str(to_day("2025-01-03"))][0], 52.0)
+        self.assertEqual(os.stat(self.path).st_mtime_ns, stamp)
+
+    def test_concurrent_updates_write_each_date_once(self):
+        ledger.update_ledger(self.user)
+        nutrition.save_user_record(self.user, "2025-01-03", "Apple", 100, 52.0)
+        threads = [threading.Thread(target=ledger.update_ledger, args=(self.user,)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(list(self.read().index), ["2025-01-01", "2025-01-02", "2025-01-03"])
+
+    def test_new_files_get_default_permissions(self):
+        ledger.update_ledger(self.user)
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o666 & ~umask)
+
+    def test_rolling_stats_follow_the_ledger(self):
+        stats.update(self.user)
+        nutrition.save_user_record(self.user, "2025-01-03", "Apple", 100, 52.0)
+        nutrition.save_user_record(self.user, "2025-01-03", "Rice", 100, 130.0)
+        stats.update(self.user)
+        incremental = stats.current(self.user, today="2025-01-03")
+
+        stats.rebuild(self.user)
+        self.assertEqual(stats.current(self.user, today="2025-01-03"), incremental)
+        self.assertEqual(incremental["streak"], 0)
+        self.assertEqual(incremental["longest_streak"], 1)
+        self.assertAlmostEqual(incremental["net_week"], 104 + 130 - 301 + 182)
+
+    def test_stats_reads_do_not_write(self):
+        stats.update(self.user)
+        stamp = os.stat(stats.get_stats_path(self.user)).st_mtime_ns
+        nutrition.save_user_record(self.user, "2025-01-03", "Apple", 100, 52.0)
+        pending = stats.current(self.user, today="2025-01-03")
+        self.assertEqual(os.stat(stats.get_stats_path(self.user)).st_mtime_ns, stamp)
+
+        # A back-dated entry cannot be pushed onto the saved state, so it is recomputed
+        nutrition.save_user_record(self.user, "2025-01-01", "Apple", 100, 52.0)
+        backdated = stats.current(self.user, today="2025-01-03")
+        self.assertAlmostEqual(backdated["net_week"], pending["net_week"] + 52)
+
+        stats.update(self.user)
+        self.assertEqual(stats.current(self.user, today="2025-01-03"), backdated)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loadtest
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+
+    def test_single_thread_run_is_consistent(self):
+        result = loadtest.run(processes=1, threads=1, seconds=0.3, users=2, folder=self.tmp,
+                              mix="read=1,nutrition=1,tracker=1,register=1")
+        self.assertGreater(sum(s["count"] for s in result["ops"].values()), 0)
+        self.assertFalse(loadtest.has_problems(result), result["integrity"])
+
+    def test_lost_duplicated_and_corrupt_records_are_reported(self):
+        os.makedirs(os.path.join(self.tmp, "data"))
+        with open(os.path.join(self.tmp, "data", "load0_nutrition.csv"), "w") as f:
+            f.write("Date,Food,Weight_g,Calories\n2025-01-01,Apple,1,1.0\n2025-01-01,Apple,1,1.0\n2025-01-01,Ap\n")
+        with open(os.path.join(self.tmp, "users.json"), "w") as f:
+            f.write('{"lt5": ')
+
+        report = loadtest.check_integrity(self.tmp, [("nutrition", ("load0", 1)), ("nutrition", ("load0", 2)),
+                                                     ("register", "lt5")])
+        self.assertEqual(report["nutrition"], {"written": 2, "lost": 1, "duplicated": 1,
+                                               "corrupt": 1, "error": None})
+        self.assertIsNotNone(report["register"]["error"])
+
+    def test_unknown_operation_is_rejected(self):
+        self.assertEqual(loadtest.parse_mix("read=3,tracker"), {"read": 3.0, "tracker": 1.0})
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("delete=1")
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,7 +1,9 @@
 import unittest
 import os
 import pandas as pd
+import shutil
 import sys
+import tempfile
 
 # This block allows the test to find your 'nutrition.py' file
 # by looking in the folder above the 'test' folder.
@@ -17,10 +19,12 @@ class TestNutritionFunctionality(unittest.TestCase):
         """
         self.test_user = "TestBot"
         self.test_file = os.path.join(nutrition.DATA_DIR, f"{self.test_user}_nutrition.csv")
-        
-        # Ensure we start with a clean slate (delete test file if it exists)
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+
+        # Work inside an empty temporary folder, so the saved log, its lock
+        # file and the name id dictionary never touch the real data folder
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
 
     def test_1_calories_calculation(self):
         """
@@ -61,10 +65,10 @@ class TestNutritionFunctionality(unittest.TestCase):
 
     def tearDown(self):
         """
-        Clean up: Delete the test CSV file after we are done.
+        Clean up: Leave the temporary folder and delete it with the test CSV file.
         """
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
 
 if __name__ == '__main__':
     print("--- Starting Nutrition Module Tests ---")
@@ -0,0 +1,101 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import tracemalloc
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiler
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+BUSY = f"test_profiler.py:{busy.__code__.co_firstlineno}(busy)"
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def test_rerun_is_measured_saved_and_comparable(self):
+        with profiler.profile("Log Nutrition") as first:
+            busy(20000)
+        with profiler.profile("Log Nutrition") as second:
+            busy(200000)
+
+        self.assertTrue(os.path.isfile(first["path"]))
+        self.assertTrue(first["path"].endswith("_log-nutrition.prof"))
+        self.assertGreaterEqual(first["wall_ms"], first["cpu_ms"] - 1)
+        self.assertGreater(first["peak_bytes"], 0)
+        self.assertIn(BUSY, [r["function"] for r in first["top"]])
+
+        rows = {r["function"]: r for r in profiler.compare(first["path"], second["path"])}
+        self.assertGreater(rows[BUSY]["change_ms"], 0)
+        self.assertFalse(first["peak_shared"])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_overlapping_reruns_share_tracing(self):
+        entered, first_done = threading.Event(), threading.Event()
+        results = {}
+
+        def other_session():
+            with profiler.profile("Dashboard", save=False) as results["other"]:
+                entered.set()
+                first_done.wait(5)
+                results["tracing"] = tracemalloc.is_tracing()  # not stopped by the rerun that finished
+                busy(20000)
+
+        with profiler.profile("Log Nutrition", save=False) as first:
+            worker = threading.Thread(target=other_session)
+            worker.start()
+            entered.wait(5)
+        first_done.set()
+        worker.join()
+
+        self.assertTrue(results["tracing"])
+        self.assertTrue(first["peak_shared"])
+        self.assertTrue(results["other"]["peak_shared"])
+        self.assertGreater(results["other"]["peak_bytes"], 0)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        # Only the first rerun held the profiler; the overlapping one was timed only
+        self.assertTrue(first["profiled"])
+        self.assertFalse(results["other"]["profiled"])
+        self.assertEqual(results["other"]["top"], [])
+        with profiler.profile("Dashboard", save=False) as after:
+            busy(2000)
+        self.assertTrue(after["profiled"])
+
+    def test_profiler_already_active_elsewhere(self):
+        with mock.patch.object(profiler.cProfile.Profile, "enable",
+                               side_effect=ValueError("Another profiling tool is already active")):
+            with profiler.profile("Dashboard") as result:
+                busy(2000)
+        self.assertFalse(result["profiled"])
+        self.assertIsNone(result["path"])
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual((profiler._tracing["users"], profiler._tracing["profiling"]), (0, False))
+
+    def test_aborted_rerun_is_not_saved(self):
+        with self.assertRaises(RuntimeError):
+            with profiler.profile("Dashboard") as result:
+                raise RuntimeError("rerun")
+        self.assertIsNone(result["path"])
+        self.assertFalse(os.path.exists(profiler.PROFILE_DIR))
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
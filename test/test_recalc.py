@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+import csv
+import shutil
+import tempfile
+import threading
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import archive
+import datasource
+import ledger
+import nutrition
+import recalc
+
+
+class TestRecalc(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder with small catalogs so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        os.makedirs("food")
+        os.makedirs("exercise")
+        self.write_food(52.0)
+        with open(os.path.join("exercise", "exercise_dataset.csv"), "w") as f:
+            f.write('"Activity, Exercise or Sport (1 hour)",Calories per kg\n"Yoga, Hatha",4.3\n')
+        self.path = os.path.join("data", "TestBot_nutrition.csv")
+        nutrition.save_user_record("TestBot", "2025-01-01", "Apple", 200, 104.0)
+        nutrition.save_user_record("TestBot", "2025-01-02", "Rice", 100, 130.0)
+        recalc.recalculate(workers=1)  # first snapshot
+
+    def write_food(self, apple):
+        with open(os.path.join("food", "foodandcalories.csv"), "w") as f:
+            f.write(f"Food,Calories_per_100g\nApple,{apple}\nRice,130.0\n")
+
+    def read(self):
+        with open(self.path, newline="") as f:
+            return list(csv.DictReader(f))
+
+    def test_changed_calorie_value(self):
+        self.write_food(60.0)
+        report = recalc.recalculate(workers=1)
+        self.assertEqual(report["items"], ["Apple"])
+        self.assertEqual(report["files"], {self.path: 1})
+        self.assertEqual([float(r["Calories"]) for r in self.read()], [120.0, 130.0])
+
+    def test_archived_rows_and_totals_follow(self):
+        archive.archive_old(horizon_days=30, today=date(2025, 6, 30))
+        self.write_food(60.0)
+        report = recalc.recalculate(workers=1)
+        self.assertEqual(report["records"], 1)
+        summary = archive.summary("nutrition", "TestBot")
+        self.assertEqual(summary["totals"]["calories"], 250.0)
+        self.assertEqual(summary["by_name"]["Apple"], 120.0)
+        name, entry = archive.user_buckets("nutrition", "TestBot")[0]
+        self.assertEqual(archive.read_bucket(name, entry).total("calories"), 250.0)
+
+    def test_archived_rows_recalculated_twice_reach_the_ledger(self):
+        archive.archive_old(horizon_days=30, today=date(2025, 6, 30))
+        ledger.update_ledger("TestBot")
+        session = datasource.ReadSession()
+        for apple in (53.0, 54.0):
+            # One digit changes, so the bucket recompresses to the same size
+            self.write_food(apple)
+            recalc.recalculate(workers=1)
+            self.assertEqual(session.nutrition("TestBot").total("calories"), 2 * apple + 130.0)
+            ledger.update_ledger("TestBot")
+            rows = ledger.read_ledger(ledger.helpers.get_user_data_path("TestBot"))
+            self.assertEqual(sorted(r[0] for r in rows.values()), sorted([130.0, 2 * apple]))
+
+    def test_unchanged_file_is_not_rewritten(self):
+        stamp = os.stat(self.path).st_mtime_ns
+        self.assertEqual(recalc.recalculate(workers=1)["files"], {})
+
+        # Only Rice is logged with the new value already, so nothing is written
+        self.assertEqual(recalc._recalc_file((self.path, "nutrition", {"Rice": 130.0})), (self.path, 0))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, stamp)
+
+    def test_blank_numbers_are_left_alone(self):
+        with open(self.path, "a") as f:
+            f.write("2025-01-03,Apple,,\n")
+        self.write_food(60.0)
+        report = recalc.recalculate(workers=1)
+        self.assertEqual(report["files"], {self.path: 1})
+        self.assertEqual([r["Calories"] for r in self.read()], ["120.0", "130.0", ""])
+
+    def test_concurrent_appends_are_kept(self):
+        def append():
+            for i in range(40):
+                nutrition.save_user_record("TestBot", "2025-01-05", "Apple", 100 + i, 52.0)
+        writer = threading.Thread(target=append)
+        writer.start()
+        rate = 60.0
+        while writer.is_alive():
+            rate += 1
+            self.assertIsInstance(recalc._recalc_file((self.path, "nutrition", {"Apple": rate}))[1], int)
+        writer.join()
+        self.assertEqual(len(self.read()), 42)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,105 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import MISSING_DAY, RecordBatch, parse_days, to_day, from_day
+
+
+class TestRecordBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [
+            {"date": "2025-01-03", "food": "Apple", "weight_g": 100, "calories": 52},
+            {"date": "2025-01-01", "food": "Rice", "weight_g": 200, "calories": 260},
+            {"date": "2025-01-03", "food": "Apple", "weight_g": 50, "calories": 26},
+        ]
+        self.batch = RecordBatch.from_records("nutrition", self.records)
+
+    def test_names_are_interned_codes(self):
+        self.assertEqual(self.batch.categories, ["Apple", "Rice"])
+        self.assertEqual(self.batch.codes.tolist(), [0, 1, 0])
+        self.assertEqual(self.batch.days.dtype, np.int32)
+
+    def test_totals_and_group_sums(self):
+        self.assertEqual(self.batch.total("calories"), 338)
+        summary = self.batch.sum_by_name("calories")
+        self.assertEqual(summary["Apple"], 78)
+        self.assertEqual(summary["Rice"], 260)
+
+    def test_sum_by_day(self):
+        start = to_day("2025-01-01")
+        daily = self.batch.sum_by_day("calories", start, start + 2)
+        self.assertEqual(daily.tolist(), [260, 0, 78])
+
+    def test_sorted_and_frame(self):
+        newest = self.batch.sorted(ascending=False)
+        self.assertEqual(from_day(newest.days[-1]).isoformat(), "2025-01-01")
+        df = newest.to_frame()
+        self.assertEqual(list(df.columns), ["date", "food", "weight_g", "calories"])
+        self.assertEqual(df["food"].iloc[-1], "Rice")
+        self.assertEqual(len(df), 3)
+
+    def test_between_and_page(self):
+        batch = RecordBatch.from_records(
+            "exercise", [{"date": f"2025-01-{d:02d}", "exercise": "Run", "calories_burned": d} for d in range(1, 11)])
+        window = batch.between(to_day("2025-01-03"), to_day("2025-01-08"))
+        self.assertEqual(window.columns["calories_burned"].tolist(), [3, 4, 5, 6, 7, 8])
+        self.assertEqual(window.page(0, 4).columns["calories_burned"].tolist(), [8, 7, 6, 5])
+        self.assertEqual(window.page(1, 4).columns["calories_burned"].tolist(), [4, 3])
+        self.assertEqual(len(window.page(2, 4)), 0)
+        self.assertEqual(window.page(0, 4, newest_first=False).columns["calories_burned"].tolist(), [3, 4, 5, 6])
+
+    def test_shared_names_are_not_mutated(self):
+        shared = ["Rice", "Apple"]
+        batch = RecordBatch.from_records("nutrition", self.records, shared)
+        self.assertEqual(batch.codes.tolist(), [1, 0, 1])
+        self.assertIs(batch.categories, shared)
+
+        batch = RecordBatch.from_records("nutrition", [{"date": "2025-01-01", "food": "Kiwi"}], shared)
+        self.assertEqual(shared, ["Rice", "Apple"])
+        self.assertEqual(batch.names().tolist(), ["Kiwi"])
+
+    def test_merge_of_sorted_batches(self):
+        first = self.batch.sorted()
+        second = RecordBatch.from_records("nutrition", [
+            {"date": "2025-01-01", "food": "Kiwi", "calories": 40},
+            {"date": "2025-01-04", "food": "Rice", "calories": 130}])
+        merged = RecordBatch.merge("nutrition", [first, second])
+        self.assertEqual([from_day(d).isoformat() for d in merged.days],
+                         ["2025-01-01", "2025-01-01", "2025-01-03", "2025-01-03", "2025-01-04"])
+        self.assertEqual(merged.names().tolist(), ["Rice", "Kiwi", "Apple", "Apple", "Rice"])
+
+    def test_blank_dates_and_names(self):
+        self.assertEqual(parse_days(["2025-01-01", "", "nan"]).tolist(),
+                         [to_day("2025-01-01"), MISSING_DAY, MISSING_DAY])
+
+        df = pd.DataFrame({"Date": ["2025-01-01", None, "2025-01-02"],
+                           "Food": ["Apple", "Rice", None],
+                           "Weight_g": [100, 50, 10], "Calories": [52, 65, 5]})
+        df["Food"] = df["Food"].astype("category")
+        columns = {"date": "Date", "food": "Food", "weight_g": "Weight_g", "calories": "Calories"}
+        batch = RecordBatch.from_frame("nutrition", df, columns)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.names().tolist(), ["Apple", ""])
+        summary = batch.sum_by_name("calories")
+        self.assertEqual(summary["Apple"], 52)
+        self.assertEqual(summary[""], 5)
+
+        records = [{"date": "", "food": "Apple", "calories": 1}, {"date": "2025-01-01", "food": None}]
+        batch = RecordBatch.from_records("nutrition", records)
+        self.assertEqual(batch.names().tolist(), [""])
+
+    def test_empty_batch(self):
+        batch = RecordBatch.from_records("exercise", [])
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(batch.total("calories_burned"), 0)
+        self.assertTrue(batch.to_frame().empty)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
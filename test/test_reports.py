@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import exercise
+import nutrition
+import reports
+
+
+class TestReports(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.end = date(2025, 1, 7)
+        nutrition.save_user_record("TestBot", "2025-01-01", "Apple", 200, 104.0)
+        nutrition.save_user_record("TestBot", "2025-01-07", "Rice", 100, 130.0)
+        exercise.save_exercise_entry("2025-01-07", "Yoga, Hatha", 60, 70, 301.0, username="TestBot")
+        nutrition.save_user_record("OtherBot", "2025-01-03", "Apple", 100, 52.0)
+
+    def test_weekly_summary(self):
+        df = reports.weekly_summary("TestBot", self.end)
+        self.assertEqual(len(df), 7)
+        self.assertEqual(df["date"].iloc[0].date(), date(2025, 1, 1))
+        self.assertEqual(df["date"].iloc[-1].date(), self.end)
+        self.assertEqual(df["in_cal"].tolist(), [104.0, 0, 0, 0, 0, 0, 130.0])
+        self.assertEqual(df["out_cal"].tolist(), [0, 0, 0, 0, 0, 0, 301.0])
+        self.assertTrue((df["goal"] == 2000).all())
+
+    def test_weekly_summary_uses_ledger_goals(self):
+        with open(os.path.join("data", "TestBot_tracker.csv"), "w") as f:
+            f.write("date,in_cal,out_cal,goal\n2025-01-06,0,0,1800\n2024-12-01,0,0,1500\n")
+        goals = reports.weekly_summary("TestBot", self.end)["goal"].tolist()
+        self.assertEqual(goals, [2000] * 5 + [1800, 2000])
+
+    def test_generate_reports(self):
+        written, skipped, failed = reports.generate_reports(end=self.end, workers=2, out_dir="out")
+        self.assertEqual(sorted(written), ["OtherBot", "TestBot"])
+        self.assertEqual((skipped, failed), ([], {}))
+        for user in written:
+            self.assertTrue(os.path.getsize(os.path.join("out", f"{user}_weekly.png")) > 0)
+        with open(os.path.join("out", "TestBot_weekly.csv")) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "date,in_cal,out_cal,goal")
+        self.assertEqual(lines[-1], "2025-01-07,130.0,301.0,2000.0")
+
+    def test_unchanged_users_are_skipped(self):
+        reports.generate_reports(end=self.end, workers=1, out_dir="out")
+        self.assertEqual(reports.generate_reports(end=self.end, workers=1, out_dir="out"),
+                         ([], ["OtherBot", "TestBot"], {}))
+
+        nutrition.save_user_record("TestBot", "2025-01-07", "Apple", 100, 52.0)
+        written, skipped, _ = reports.generate_reports(end=self.end, workers=1, out_dir="out")
+        self.assertEqual((written, skipped), (["TestBot"], ["OtherBot"]))
+
+        # A new week or --force rebuilds everyone
+        written, _, _ = reports.generate_reports(end=date(2025, 1, 8), workers=1, out_dir="out")
+        self.assertEqual(sorted(written), ["OtherBot", "TestBot"])
+        written, _, _ = reports.generate_reports(end=date(2025, 1, 8), workers=1, out_dir="out", force=True)
+        self.assertEqual(sorted(written), ["OtherBot", "TestBot"])
+
+    def test_failed_user_is_retried(self):
+        written, _, failed = reports.generate_reports(["TestBot"], self.end, workers=1, out_dir="out", fmt="nope")
+        self.assertEqual(written, [])
+        self.assertIn("TestBot", failed)
+        written, skipped, failed = reports.generate_reports(["TestBot"], self.end, workers=1, out_dir="out")
+        self.assertEqual((written, skipped, failed), (["TestBot"], [], {}))
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
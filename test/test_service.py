@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nutrition
+import service
+
+
+class TestService(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Work inside an empty temporary folder so real data is untouched.
+        """
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        nutrition.save_user_record("TestBot", "2025-01-01", "Apple", 200, 104.0)
+        nutrition.save_user_record("TestBot", "2025-01-03", "Bread", 50, 132.5)
+
+    def test_unchanged_data_is_answered_with_304(self):
+        status, headers, body = service.respond("/users/TestBot/totals")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["nutrition"], {"entries": 2, "calories": 236.5})
+
+        status, _, body = service.respond("/users/TestBot/totals", {"If-None-Match": headers["ETag"]})
+        self.assertEqual((status, body), (304, b""))
+
+        nutrition.save_user_record("TestBot", "2025-01-04", "Apple", 100, 52.0)
+        status, changed, body = service.respond("/users/TestBot/totals", {"If-None-Match": headers["ETag"]})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(changed["ETag"], headers["ETag"])
+        self.assertEqual(json.loads(body)["nutrition"]["entries"], 3)
+
+    def test_daily_and_recent(self):
+        status, _, body = service.respond("/users/TestBot/daily?start=2025-01-01&end=2025-01-03")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["calories_in"], [104.0, 0.0, 132.5])
+
+        page = json.loads(service.respond("/users/TestBot/recent?n=1")[2])
+        self.assertEqual([e["name"] for e in page["entries"]], ["Bread"])
+        older = json.loads(service.respond(f"/users/TestBot/recent?n=1&before={page['next']}")[2])
+        self.assertEqual([e["name"] for e in older["entries"]], ["Apple"])
+        self.assertIsNone(older["next"])
+
+    def test_bad_requests(self):
+        self.assertEqual(service.respond("/users/TestBot/weekly")[0], 404)
+        self.assertEqual(service.respond("/users/..%2Fsecret/totals")[0], 400)
+        self.assertEqual(service.respond("/users/TestBot/daily?start=2025-02-01&end=2025-01-01")[0], 400)
+        self.assertEqual(service.respond("/users/TestBot/recent?n=abc")[0], 400)
+
+    def test_unknown_user_is_404(self):
+        status, headers, body = service.respond("/users/Nobody/totals")
+        self.assertEqual((status, json.loads(body)), (404, {"error": "Unknown user"}))
+        self.assertEqual(headers["Content-Type"], "application/json")
+
+        nutrition.save_user_record("Nobody", "2025-01-01", "Apple", 100, 52.0)
+        self.assertEqual(service.respond("/users/Nobody/totals")[0], 200)
+
+    def test_failures_are_json_500(self):
+        with mock.patch.object(service, "daily", side_effect=RuntimeError("boom")), \
+                mock.patch("traceback.print_exc"):
+            status, headers, body = service.respond("/users/TestBot/daily")
+        self.assertEqual((status, json.loads(body)), (500, {"error": "Internal server error"}))
+        self.assertEqual(headers["Content-Type"], "application/json")
+        # Nothing was cached, so the next request is answered normally
+        self.assertEqual(service.respond("/users/TestBot/daily")[0], 200)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
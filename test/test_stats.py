@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stats
+
+
+class TestRollingStats(unittest.TestCase):
+
+    def test_incremental_matches_a_full_rescan(self):
+        rng = np.random.default_rng(1)
+        days = np.sort(rng.choice(np.arange(1000, 1200), size=120, replace=False))
+        days = np.concatenate([days, [1240, 1241, 1243]])  # after a gap longer than any window
+        in_cal = rng.uniform(1200, 3000, len(days)).round(1)
+        out_cal = np.where(rng.random(len(days)) < 0.6, rng.uniform(100, 700, len(days)), 0).round(1)
+
+        engine = stats.RollingStats()
+        for day, a, b in zip(days, in_cal, out_cal):
+            engine.push(int(day), 0.0, 0.0)      # an early partial total for the day...
+            engine.push(int(day), a, b)          # ...corrected later the same day
+        today = int(days[-1]) + 3
+        got = engine.snapshot(today)
+
+        span = np.arange(days[0], today + 1)
+        net = np.zeros(len(span))
+        out = np.zeros(len(span))
+        net[days - days[0]] = in_cal - out_cal
+        out[days - days[0]] = out_cal
+        self.assertAlmostEqual(got["net_avg_7"], net[-7:].mean())
+        self.assertAlmostEqual(got["net_avg_30"], net[-30:].mean())
+        self.assertAlmostEqual(got["net_week_delta"], net[-7:].sum() - net[-14:-7].sum())
+        self.assertAlmostEqual(got["burned_week"], out[-7:].sum())
+
+        ewma = net[0]
+        for value in net[1:]:
+            ewma += stats.EWMA_ALPHA * (value - ewma)
+        self.assertAlmostEqual(got["net_ewma"], ewma)
+
+        runs = "".join("1" if v > 0 else "0" for v in out)
+        self.assertEqual(got["longest_streak"], max(len(r) for r in runs.split("0")))
+        self.assertEqual(got["streak"], 0)  # nothing logged for the last three days
+
+    def test_days_must_arrive_in_order(self):
+        engine = stats.RollingStats()
+        engine.push(10, 2000, 300)
+        with self.assertRaises(ValueError):
+            engine.push(9, 2000, 300)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
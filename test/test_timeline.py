@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import timeline
+from records import RecordBatch
+
+
+def make_batch(kind, days, shuffle):
+    field = "food" if kind == "nutrition" else "exercise"
+    records = [{"date": f"2025-01-{d:02d}", field: "X"} for d in days]
+    if shuffle:
+        random.shuffle(records)
+    return RecordBatch.from_records(kind, records)
+
+
+class TestTimeline(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(551)
+        self.batches = [
+            make_batch("nutrition", sorted(random.randint(1, 28) for _ in range(40)), shuffle=False),
+            make_batch("exercise", [random.randint(1, 28) for _ in range(35)], shuffle=True),
+        ]
+        self.expected = sorted(
+            ((int(day), source, row)
+             for source, batch in enumerate(self.batches)
+             for row, day in enumerate(batch.days)),
+            reverse=True)
+
+    def test_stream_is_newest_first(self):
+        self.assertEqual(list(timeline.stream(self.batches, chunk=4)), self.expected)
+
+    def test_paging_covers_everything_once(self):
+        seen = []
+        cursor = None
+        while True:
+            items, cursor = timeline.recent(self.batches, n=7, before=cursor)
+            seen.extend(items)
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_empty_sources(self):
+        empty = RecordBatch.from_records("nutrition", [])
+        self.assertEqual(timeline.recent([empty, empty], n=5), ([], None))
+
+    def test_zero_items(self):
+        self.assertEqual(timeline.recent(self.batches, n=0), ([], None))
+        self.assertEqual(timeline.recent(self.batches, n=-1), ([], None))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+# ------------------------------------------------------------
+# Description: Newest-first activity timeline merged lazily from
+#              several record batches (k-way heap merge).
+# ------------------------------------------------------------
+
+import heapq
+from itertools import islice
+
+import numpy as np
+
+# Items and cursors are (day, source, row) tuples: `source` is the position
+# of the batch in the list passed in, `row` the row inside that batch.
+
+
+def _keys(batch):
+    """Pack (day, row) into one sortable int64 per row."""
+    rows = np.arange(len(batch), dtype=np.int64)
+    return (batch.days.astype(np.int64) << 32) | rows
+
+
+def _limit(source, before):
+    """Largest packed key (exclusive) a row of `source` may have to be older than `before`."""
+    day, cursor_source, row = before
+    if source < cursor_source:
+        return (day + 1) << 32
+    if source > cursor_source:
+        return day << 32
+    return (day << 32) | row
+
+
+def _source_stream(batch, source, before, chunk):
+    """Yield one batch's items newest-first without sorting all of it."""
+    if len(batch) == 0:
+        return
+    keys = _keys(batch)
+    candidates = np.arange(len(batch))
+    if before is not None:
+        candidates = np.flatnonzero(keys < _limit(source, before))
+
+    # Rows already in date order (the usual append-only case) can be walked backwards
+    days = batch.days
+    if np.all(days[1:] >= days[:-1]):
+        for row in candidates[::-1]:
+            yield (int(days[row]), source, int(row))
+        return
+
+    # Otherwise repeatedly pull the newest `chunk` rows with a partial sort
+    while candidates.size:
+        k = min(chunk, candidates.size)
+        split = candidates.size - k
+        part = np.argpartition(keys[candidates], split)
+        top = candidates[part[split:]]
+        top = top[np.argsort(keys[top])[::-1]]
+        for row in top:
+            yield (int(days[row]), source, int(row))
+        candidates = candidates[part[:split]]
+        chunk *= 2
+
+
+def stream(batches, before=None, chunk=64):
+    """
+    Merge all batches into one newest-first stream of (day, source, row).
+    Only items strictly older than the `before` cursor are produced.
+    """
+    streams = [_source_stream(batch, i, before, chunk) for i, batch in enumerate(batches)]
+    return heapq.merge(*streams, reverse=True)
+
+
+def recent(batches, n=20, before=None):
+    """
+    Return (items, next_cursor) for the `n` newest items older than `before`.
+    next_cursor is None when there is nothing older.
+    """
+    if n <= 0:
+        return [], None
+    items = list(islice(stream(batches, before, chunk=n), n + 1))
+    if len(items) > n:
+        return items[:n], items[n - 1]
+    return items, None
@@ -6,9 +6,17 @@
 import streamlit as st
 from datetime import date
 import storage
+import stores
+import archive
+import catalog_ids
+import datasource
+import export
+import foodsearch
+import stats
+from records import to_day, from_day
 
-NUTRI_FILE = "nutrition.json"
-EXER_FILE = "exercise.json"
+NUTRI_FILE = stores.NUTRI_FILE
+EXER_FILE = stores.EXER_FILE
 
 
 # ---------------- Utility Functions ----------------
@@ -23,6 +31,45 @@ def _save(file, obj):
     storage.save_json(file, obj)
 
 
+def _history_table(kind, user, key):
+    """
+    Show one page of the user's history, with optional date filters.
+    Without filters only the live stores are read; archived months are
+    included once the chosen date range reaches back into them.
+    """
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        start = st.date_input("From", value=None, key=f"{key}_from")
+    with col2:
+        end = st.date_input("To", value=None, key=f"{key}_to")
+    with col3:
+        size = st.selectbox("Rows per page", [10, 25, 50, 100], key=f"{key}_size")
+
+    start_day = to_day(start) if start else None
+    end_day = to_day(end) if end else None
+    if start is None and end is None:
+        batch = datasource.load_recent(kind, user)
+    else:
+        batch = datasource.current().records(kind, user, start_day, end_day)
+    window = batch.between(start_day, end_day)
+    pages = max(1, -(-len(window) // size))
+    # Narrower filters or bigger pages can leave the kept page past the end
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with col4:
+        number = st.number_input("Page", min_value=1, max_value=pages, key=page_key)
+
+    # Only the requested slice is converted and sent to the browser
+    st.dataframe(window.page(number - 1, size).to_frame(), use_container_width=True, hide_index=True)
+    first = (number - 1) * size + 1 if len(window) else 0
+    st.caption(f"Showing {first}-{min(number * size, len(window))} of {len(window)} records")
+    archived_until = archive.hot_start(kind, user)
+    if start is None and end is None and archived_until is not None:
+        st.caption(f"Entries before {from_day(archived_until)} are archived; "
+                   "choose an earlier From date to include them.")
+
+
 # ---------------- Nutrition Tracking ----------------
 
 def log_nutrition(user):
@@ -31,44 +78,57 @@ def log_nutrition(user):
 
     col1, col2 = st.columns(2)
     
-    with col1:
-        food = st.text_input("Food Name")
-        calories = st.number_input("Calories", min_value=0, step=1)
-    
     with col2:
         dt = st.date_input("Date", value=date.today())
         weight_g = st.number_input("Weight (grams)", min_value=1, step=10, value=100)
+    
+    with col1:
+        food = st.text_input("Food Name")
+        # Offer catalog matches for what was typed; picking one fills in the calories
+        food_index = foodsearch.get_index()
+        matches = food_index.search(food, k=8) if food else []
+        estimate = None
+        if matches:
+            choice = st.selectbox("Catalog matches", ["(use as typed)"] + matches, key="food_match")
+            if choice != "(use as typed)":
+                food = choice
+                estimate = food_index.estimate(choice, weight_g)
+        # The widget keeps its own state; it is refilled only when the picked food or weight changes,
+        # so a changing default never resets what was typed
+        picked = (food, weight_g) if estimate is not None else None
+        if picked is not None and picked != st.session_state.get("food_picked"):
+            st.session_state["food_calories"] = int(round(estimate))
+        st.session_state["food_picked"] = picked
+        calories = st.number_input("Calories", min_value=0, step=1, key="food_calories")
 
     if st.button("Add Nutrition Record"):
         if not food:
             st.error("Please enter a food name.")
         else:
-            raw = _load(NUTRI_FILE, {})
-            raw.setdefault(user, []).append({
+            catalog_ids.ensure_ids([food])
+            stores.insert_record(NUTRI_FILE, user, {
                 "date": dt.isoformat(),
                 "food": food,
                 "weight_g": weight_g,
                 "calories": calories
             })
-            _save(NUTRI_FILE, raw)
+            stats.update(user)
             st.success(f"✅ Added: {weight_g}g of {food} ({calories} kcal)")
 
     st.divider()
     st.subheader("📋 Nutrition History")
     
-    raw = _load(NUTRI_FILE, {})
-    user_records = raw.get(user, [])
+    batch = datasource.load_recent("nutrition", user)
+    archived = archive.summary("nutrition", user)
     
-    if user_records:
-        import pandas as pd
-        df = pd.DataFrame(user_records)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date', ascending=False)
-        
-        st.dataframe(df, use_container_width=True, hide_index=True)
+    if len(batch) or archived["rows"]:
+        _history_table("nutrition", user, "nutrition_history")
+        export.show_export_panel(user, "nutrition")
         
-        total_cals = df['calories'].sum()
-        avg_cals = df['calories'].mean()
+        # All-time figures: live rows plus the archive index totals
+        entries = len(batch) + archived["rows"]
+        total_cals = batch.total('calories') + archived["totals"]["calories"]
+        avg_cals = total_cals / entries
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -76,7 +136,7 @@ def log_nutrition(user):
         with col2:
             st.metric("Avg per Entry", f"{avg_cals:.0f} kcal")
         with col3:
-            st.metric("Total Entries", len(df))
+            st.metric("Total Entries", entries)
 
 
 # ---------------- Exercise Tracking ----------------
@@ -99,33 +159,30 @@ def log_exercise(user):
         if not ex_name:
             st.error("Please enter an exercise name.")
         else:
-            raw = _load(EXER_FILE, {})
-            raw.setdefault(user, []).append({
+            catalog_ids.ensure_ids([ex_name])
+            stores.insert_record(EXER_FILE, user, {
                 "date": dt.isoformat(),
                 "exercise": ex_name,
                 "duration_min": duration,
                 "calories_burned": burnt
             })
-            _save(EXER_FILE, raw)
+            stats.update(user)
             st.success(f"✅ Added: {ex_name} for {duration} minutes ({burnt} kcal burned)")
 
     st.divider()
     st.subheader("📋 Exercise History")
     
-    raw = _load(EXER_FILE, {})
-    user_records = raw.get(user, [])
+    batch = datasource.load_recent("exercise", user)
+    archived = archive.summary("exercise", user)
     
-    if user_records:
-        import pandas as pd
-        df = pd.DataFrame(user_records)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date', ascending=False)
-        
-        st.dataframe(df, use_container_width=True, hide_index=True)
+    if len(batch) or archived["rows"]:
+        _history_table("exercise", user, "exercise_history")
+        export.show_export_panel(user, "exercise")
         
-        total_burnt = df['calories_burned'].sum()
-        total_duration = df['duration_min'].sum()
-        avg_burnt = df['calories_burned'].mean()
+        entries = len(batch) + archived["rows"]
+        total_burnt = batch.total('calories_burned') + archived["totals"]["calories_burned"]
+        total_duration = batch.total('duration_min') + archived["totals"]["duration_min"]
+        avg_burnt = total_burnt / entries
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -3,17 +3,24 @@
 # Description: Handles visualization of fitness data including calories, exercise, and nutrition trends.
 
 import os
+import base64
 import tkinter as tk
 from tkinter import ttk
 import pandas as pd
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+import charts
+import downsample
 from utils.helpers import get_user_data_path, get_nutrition_data_path, get_exercise_data_path
 
 
+def _show_image(window, data):
+    """Show rendered PNG bytes inside a Tk window."""
+    image = tk.PhotoImage(data=base64.b64encode(data))
+    label = ttk.Label(window, image=image)
+    label.image = image  # keep a reference so Tk does not drop it
+    label.pack(fill=tk.BOTH, expand=True)
+
+
 def show_weekly_plot(username):
     # matplotlib 画摄入/消耗/目标
     """
@@ -34,40 +41,14 @@ def show_weekly_plot(username):
         return
     
     try:
-        df = pd.read_csv(user_data_path)
-        
-        df['date'] = pd.to_datetime(df['date'])
+        # Rendered off-screen and reused until the ledger changes
+        image = charts.weekly_chart(username)
         
-        # Get data for the last 7 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
-        
-        if df.empty:
+        if image is None:
             ttk.Label(plot_window, text="No data available for the past 7 days").pack(padx=20, pady=20)
             return
         
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        ax.plot(df['date'], df['calories_in'], 'b-', label='Calories In', marker='o')
-        ax.plot(df['date'], df['calories_out'], 'r-', label='Calories Out', marker='x')
-        ax.plot(df['date'], df['goal'], 'g--', label='Goal', marker='^')
-        
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.xticks(rotation=45)
-        
-        ax.set_xlabel('Date')
-        ax.set_ylabel('Calories')
-        ax.set_title('Weekly Calorie Summary')
-        ax.legend()
-        
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        plt.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=plot_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        _show_image(plot_window, image)
         
         close_button = ttk.Button(plot_window, text="Close", command=plot_window.destroy)
         close_button.pack(pady=10)
@@ -99,59 +80,22 @@ def show_exercise_plot(username):
         return
     
     try:
-        df = pd.read_csv(exercise_data_path)
-        
-        df['date'] = pd.to_datetime(df['date'])
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
+        image = charts.exercise_chart(username, days=30)
         
-        if df.empty:
+        if image is None:
             ttk.Label(plot_window, text="No exercise data available for the past 30 days").pack(padx=20, pady=20)
             return
         
-        fig = plt.figure(figsize=(10, 8))
-        
-        ax1 = fig.add_subplot(211)
-        
-        daily_calories = df.groupby('date')['calories'].sum().reset_index()
-        
-        ax1.bar(daily_calories['date'], daily_calories['calories'], color='orange', alpha=0.7)
-        ax1.set_xlabel('Date')
-        ax1.set_ylabel('Calories Burned')
-        ax1.set_title('Daily Exercise Calories')
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.xticks(rotation=45)
-        ax1.grid(True, linestyle='--', alpha=0.7)
-        
-        ax2 = fig.add_subplot(212)
-        
-        activity_data = df.groupby('activity')['duration'].sum()
-        
-        top_activities = activity_data.nlargest(10)
-        
-        ax2.pie(top_activities, labels=top_activities.index, autopct='%1.1f%%', 
-                shadow=True, startangle=90)
-        ax2.axis('equal')
-        ax2.set_title('Exercise Activity Distribution (Last 30 Days)')
-        
-        plt.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=plot_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        _show_image(plot_window, image)
         
         stats_frame = ttk.Frame(plot_window)
         stats_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        total_calories = df['calories'].sum()
-        total_duration = df['duration'].sum()
-        favorite_activity = activity_data.idxmax() if not activity_data.empty else "None"
+        summary = charts.exercise_summary(username, days=30)
         
-        stats_text = f"Total Calories Burned: {total_calories:.1f} | "
-        stats_text += f"Total Exercise Time: {total_duration:.1f} minutes | "
-        stats_text += f"Favorite Activity: {favorite_activity}"
+        stats_text = f"Total Calories Burned: {summary['total_calories']:.1f} | "
+        stats_text += f"Total Exercise Time: {summary['total_duration']:.1f} minutes | "
+        stats_text += f"Favorite Activity: {summary['favorite']}"
         
         ttk.Label(stats_frame, text=stats_text).pack(pady=5)
         
@@ -168,39 +112,65 @@ def show_dashboard(username):
     """
     import streamlit as st
     import pandas as pd
-    from datetime import datetime, timedelta
     
     st.title(f"📊 Dashboard - {username}")
     
-    # Import tracker to access data files
-    import tracker
-    
-    # Load nutrition and exercise data
-    nutrition_data = tracker._load(tracker.NUTRI_FILE, {})
-    exercise_data = tracker._load(tracker.EXER_FILE, {})
-    
-    user_nutrition = nutrition_data.get(username, [])
-    user_exercise = exercise_data.get(username, [])
+    import archive
+    import datasource
+    import stats
+    import timeline
+    from records import from_day
+    
+    # Load the live nutrition and exercise stores as columnar batches;
+    # archived months contribute through their index totals
+    user_nutrition = datasource.load_recent('nutrition', username)
+    user_exercise = datasource.load_recent('exercise', username)
+    archived_nutrition = archive.summary('nutrition', username)
+    archived_exercise = archive.summary('exercise', username)
+    nutrition_entries = len(user_nutrition) + archived_nutrition['rows']
+    exercise_entries = len(user_exercise) + archived_exercise['rows']
     
     # Calculate metrics
-    total_cals_in = sum(record['calories'] for record in user_nutrition)
-    total_cals_out = sum(record['calories_burned'] for record in user_exercise)
+    total_cals_in = user_nutrition.total('calories') + archived_nutrition['totals']['calories']
+    total_cals_out = user_exercise.total('calories_burned') + archived_exercise['totals']['calories_burned']
     net_cals = total_cals_in - total_cals_out
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.metric("🍎 Calories In", f"{total_cals_in:.0f} kcal", 
-                 delta=f"{len(user_nutrition)} entries")
+                 delta=f"{nutrition_entries} entries")
     
     with col2:
         st.metric("💪 Calories Out", f"{total_cals_out:.0f} kcal", 
-                 delta=f"{len(user_exercise)} entries")
+                 delta=f"{exercise_entries} entries")
     
     with col3:
         delta_color = "off" if net_cals == 0 else ("inverse" if net_cals > 0 else "normal")
         st.metric("⚖️ Net Calories", f"{net_cals:.0f} kcal", delta_color=delta_color)
     
+    # Rolling figures kept up to date by the ledger, read without rescanning history
+    rolling = stats.current(username)
+    col4, col5, col6, col7 = st.columns(4)
+    
+    with col4:
+        st.metric("📆 7-Day Avg Net", f"{rolling['net_avg_7']:.0f} kcal",
+                 delta=f"{rolling['net_avg_7'] - rolling['net_avg_30']:+.0f} vs 30-day avg", delta_color="inverse")
+    
+    with col5:
+        st.metric("🗓️ Net This Week", f"{rolling['net_week']:.0f} kcal",
+                 delta=f"{rolling['net_week_delta']:+.0f} vs last week", delta_color="inverse")
+    
+    with col6:
+        st.metric("🔥 Burned This Week", f"{rolling['burned_week']:.0f} kcal",
+                 delta=f"{rolling['burned_week_delta']:+.0f} vs last week")
+    
+    with col7:
+        st.metric("🏅 Workout Streak", f"{rolling['streak']} days",
+                 delta=f"best {rolling['longest_streak']}", delta_color="off")
+    
+    st.caption(f"Smoothed daily net (EWMA, {stats.EWMA_SPAN}-day span): {rolling['net_ewma']:.0f} kcal")
+    
     st.divider()
     
     # Charts section
@@ -208,69 +178,95 @@ def show_dashboard(username):
     
     with col_chart1:
         st.subheader("🥗 Top Foods")
-        if user_nutrition:
-            df_nutrition = pd.DataFrame(user_nutrition)
-            food_summary = df_nutrition.groupby('food')['calories'].sum().sort_values(ascending=False).head(10)
+        if nutrition_entries:
+            food_summary = user_nutrition.sum_by_name('calories').add(
+                pd.Series(archived_nutrition['by_name'], dtype=float), fill_value=0)
+            food_summary = food_summary.sort_values(ascending=False).head(10)
             st.bar_chart(food_summary)
         else:
             st.info("No nutrition data yet.")
     
     with col_chart2:
         st.subheader("🏃 Top Exercises")
-        if user_exercise:
-            df_exercise = pd.DataFrame(user_exercise)
-            exercise_summary = df_exercise.groupby('exercise')['calories_burned'].sum().sort_values(ascending=False).head(10)
+        if exercise_entries:
+            exercise_summary = user_exercise.sum_by_name('calories_burned').add(
+                pd.Series(archived_exercise['by_name'], dtype=float), fill_value=0)
+            exercise_summary = exercise_summary.sort_values(ascending=False).head(10)
             st.bar_chart(exercise_summary)
         else:
             st.info("No exercise data yet.")
     
     st.divider()
     
-    # Daily trends
-    st.subheader("📈 Daily Trends (Last 7 Days)")
-    
-    today = datetime.now()
-    last_7_days = [today - timedelta(days=i) for i in range(6, -1, -1)]
-    
-    daily_in = {}
-    daily_out = {}
-    
-    for day in last_7_days:
-        day_str = day.strftime("%Y-%m-%d")
-        daily_in[day_str] = sum(r['calories'] for r in user_nutrition if r['date'].startswith(day_str))
-        daily_out[day_str] = sum(r['calories_burned'] for r in user_exercise if r['date'].startswith(day_str))
-    
-    df_daily = pd.DataFrame({
-        'Date': list(daily_in.keys()),
-        'In': list(daily_in.values()),
-        'Out': list(daily_out.values())
-    })
-    
-    st.line_chart(df_daily.set_index('Date'))
+    # Daily trends, read from the ledger through a min/max pyramid so long
+    # ranges send a bounded number of points to the browser
+    st.subheader("📈 Daily Trends")
+    
+    ranges = {"7 days": 7, "30 days": 30, "90 days": 90, "1 year": 365, "All": None}
+    span = st.radio("Range", list(ranges), horizontal=True, key="trend_range", label_visibility="collapsed")
+    df_daily, daily_points = downsample.trend_frame(username, ranges[span])
+    
+    st.line_chart(df_daily)
+    if len(df_daily) < daily_points:
+        st.caption(f"Showing {len(df_daily)} of {daily_points} daily points (peaks kept)")
+    
+    # Cached images, re-rendered only when the underlying data changes
+    with st.expander("🖼️ Weekly Summary & Exercise Trends"):
+        weekly_image = charts.weekly_chart(username)
+        exercise_image = charts.exercise_chart(username, days=30)
+        if weekly_image:
+            st.image(weekly_image)
+        if exercise_image:
+            st.image(exercise_image)
+        if not weekly_image and not exercise_image:
+            st.info("No chart data for the selected period yet.")
     
     st.divider()
     
     # Recent entries
     st.subheader("⏰ Recent Activities")
     
-    all_activities = []
-    for record in user_nutrition:
-        all_activities.append({
-            'Date': record['date'],
-            'Type': '🥗 Nutrition',
-            'Details': f"{record['food']} ({record['calories']} kcal)"
-        })
-    for record in user_exercise:
-        all_activities.append({
-            'Date': record['date'],
-            'Type': '💪 Exercise',
-            'Details': f"{record['exercise']} ({record['calories_burned']} kcal)"
-        })
-    
-    if all_activities:
-        df_activities = pd.DataFrame(all_activities)
-        df_activities['Date'] = pd.to_datetime(df_activities['Date'])
-        df_activities = df_activities.sort_values('Date', ascending=False).head(20)
-        st.dataframe(df_activities, use_container_width=True, hide_index=True)
+    # Stack of cursors for "Older" paging; the last one is the current page.
+    # The first page comes from the live stores; paging further (or a live
+    # store too small to fill a page) switches to the full history.
+    # Cursors are row positions, so they are kept per user and dropped
+    # whenever a save (in any session) changes the user's data.
+    version = datasource.data_version(username)
+    paging = st.session_state.get(f"activity_cursors_{username}")
+    if paging is None or paging[0] != version:
+        paging = st.session_state[f"activity_cursors_{username}"] = (version, [None])
+    pages = paging[1]
+    has_archive = archived_nutrition['rows'] or archived_exercise['rows']
+    full_history = has_archive and (len(pages) > 1 or len(user_nutrition) + len(user_exercise) < 20)
+    if full_history:
+        user_nutrition = datasource.load_nutrition(username)
+        user_exercise = datasource.load_exercise(username)
+    sources = [(user_nutrition, '🥗 Nutrition', 'calories'),
+               (user_exercise, '💪 Exercise', 'calories_burned')]
+    recent, next_cursor = timeline.recent([s[0] for s in sources], n=20, before=pages[-1])
+    
+    if recent:
+        rows = {'Date': [], 'Type': [], 'Details': []}
+        for day, source, row in recent:
+            batch, label, field = sources[source]
+            rows['Date'].append(from_day(day))
+            rows['Type'].append(label)
+            rows['Details'].append(f"{batch.categories[batch.codes[row]]} ({batch.columns[field][row]:g} kcal)")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        
+        col_newer, col_older = st.columns(2)
+        with col_newer:
+            if len(pages) > 1 and st.button("⬅ Newer"):
+                pages.pop()
+                st.rerun()
+        with col_older:
+            if (next_cursor is not None or (has_archive and not full_history)) and st.button("Older ➡"):
+                if not full_history:
+                    # Cursors index rows, so take the first page's cursor from the full history
+                    full = [datasource.load_nutrition(username), datasource.load_exercise(username)]
+                    next_cursor = timeline.recent(full, n=20)[1]
+                if next_cursor is not None:
+                    pages.append(next_cursor)
+                st.rerun()
     else:
         st.info("No activities logged yet. Start by adding nutrition or exercise records!")
\ No newline at end of file